@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the class to connect to a Multicall3 contract."""
+
+from typing import Any, List, Optional, Tuple
+
+from aea.common import JSONLike
+from aea.configurations.base import PublicId
+from aea.contracts.base import Contract
+from aea.crypto.base import LedgerApi
+from hexbytes import HexBytes
+from web3 import Web3
+
+
+PUBLIC_ID = PublicId.from_str("valory/multicall3:0.1.0")
+
+
+class Multicall3Contract(Contract):
+    """The Multicall3 contract."""
+
+    contract_id = PUBLIC_ID
+
+    @classmethod
+    def get_raw_transaction(
+        cls, ledger_api: LedgerApi, contract_address: str, **kwargs: Any
+    ) -> Optional[JSONLike]:
+        """Get the raw transaction."""
+        raise NotImplementedError
+
+    @classmethod
+    def get_raw_message(
+        cls, ledger_api: LedgerApi, contract_address: str, **kwargs: Any
+    ) -> Optional[bytes]:
+        """Get raw message."""
+        raise NotImplementedError
+
+    @classmethod
+    def get_state(
+        cls, ledger_api: LedgerApi, contract_address: str, **kwargs: Any
+    ) -> Optional[JSONLike]:
+        """Get state."""
+        raise NotImplementedError
+
+    @classmethod
+    def try_block_and_aggregate(
+        cls,
+        ledger_api: LedgerApi,
+        contract_address: str,
+        calls: List[Tuple[str, str]],
+    ) -> JSONLike:
+        """
+        Make a batch of read calls in a single `eth_call`, allowing individual calls to fail.
+
+        :param ledger_api: the ledger API.
+        :param contract_address: the address of the Multicall3 contract.
+        :param calls: the calls, as pairs of the target address and the hex encoded call data.
+        :return: the number of the block the calls were made at, and the success and hex encoded
+            return data of every call, in order.
+        """
+        contract_instance = cls.get_instance(ledger_api, contract_address)
+        encoded_calls = [
+            (Web3.to_checksum_address(target), HexBytes(call_data))
+            for target, call_data in calls
+        ]
+        block_number, _, results = contract_instance.functions.tryBlockAndAggregate(
+            False, encoded_calls
+        ).call()
+        return {
+            "block_number": block_number,
+            "results": [
+                {"success": success, "return_data": "0x" + bytes(return_data).hex()}
+                for success, return_data in results
+            ],
+        }
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the recordings of the ABCI requests received by the skill.
+
+A recording is a compact binary log: a header with the setup of the agent, which a replay needs to
+rebuild the same application, followed by a record per ABCI request, with the time it was received
+and the request encoded with the protobuf serializer of the ABCI protocol. Every request is recorded,
+including the `info`, `init_chain` and `commit` ones, since the round sequence cannot advance
+without them. The records are encoded and written from a thread of their own, and are never
+dropped, since a gap would leave the recording unreplayable.
+"""
+
+import json
+import queue
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, cast
+
+from packages.valory.protocols.abci import AbciMessage
+
+
+MAGIC = b"LABC"
+VERSION = 1
+PREAMBLE_FORMAT = "<4sHI"
+RECORD_FORMAT = "<dI"
+JOIN_TIMEOUT = 5.0
+
+Record = Tuple[float, AbciMessage]
+
+
+class RecordingError(ValueError):
+    """Raised when a recording is corrupt or of an unsupported version."""
+
+
+def encode_header(header: Dict[str, Any]) -> bytes:
+    """Encode the header of a recording."""
+    data = json.dumps(header, sort_keys=True).encode()
+    return struct.pack(PREAMBLE_FORMAT, MAGIC, VERSION, len(data)) + data
+
+
+def encode_record(received_at: float, message: AbciMessage) -> bytes:
+    """Encode the record of an ABCI request."""
+    data = AbciMessage.serializer.encode(message)
+    return struct.pack(RECORD_FORMAT, received_at, len(data)) + data
+
+
+def read_recording(path: Path) -> Tuple[Dict[str, Any], Iterator[Record]]:
+    """Read the header of a recording and an iterator over its records."""
+    file = open(path, "rb")  # pylint: disable=consider-using-with
+    preamble = file.read(struct.calcsize(PREAMBLE_FORMAT))
+    try:
+        magic, version, size = struct.unpack(PREAMBLE_FORMAT, preamble)
+    except struct.error as e:
+        file.close()
+        raise RecordingError("The recording is truncated.") from e
+    if magic != MAGIC or version != VERSION:
+        file.close()
+        raise RecordingError(f"{path} is not a recording of version {VERSION}.")
+    header = json.loads(file.read(size))
+
+    def records() -> Iterator[Record]:
+        """Iterate over the records, stopping at a record torn by a crash."""
+        record_size = struct.calcsize(RECORD_FORMAT)
+        with file:
+            while True:
+                record_header = file.read(record_size)
+                if len(record_header) < record_size:
+                    return
+                received_at, size = struct.unpack(RECORD_FORMAT, record_header)
+                data = file.read(size)
+                if len(data) < size:
+                    return
+                message = AbciMessage.serializer.decode(data)
+                yield received_at, cast(AbciMessage, message)
+
+    return header, records()
+
+
+class AbciRecorder:
+    """Appends the received ABCI requests to a recording, from a background thread."""
+
+    def __init__(self, path: Path, header: Dict[str, Any]) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self.header = header
+        self.recorded = 0
+        self.last_error: Optional[Exception] = None
+        self._queue: "queue.SimpleQueue[Optional[Record]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the recorder's thread, writing the header of the recording."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(encode_header(self.header))
+        self._thread = threading.Thread(
+            target=self._run, name="abci-recorder", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the recorder's thread, once the queued requests are written."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(JOIN_TIMEOUT)
+        self._thread = None
+
+    def record(self, received_at: float, message: AbciMessage) -> None:
+        """Queue an ABCI request to be recorded."""
+        self._queue.put((received_at, message))
+
+    def _run(self) -> None:
+        """Write the queued requests until stopped."""
+        with open(self.path, "ab") as file:
+            while True:
+                item = self._queue.get()
+                chunks = []
+                # write the requests queued meanwhile in one go
+                while item is not None:
+                    chunks.append(encode_record(*item))
+                    if self._queue.empty():
+                        break
+                    item = self._queue.get()
+                try:
+                    file.write(b"".join(chunks))
+                    file.flush()
+                    self.recorded += len(chunks)
+                except OSError as e:
+                    self.last_error = e
+                if item is None:
+                    return
@@ -19,20 +19,76 @@
 
 """This package contains round behaviours of LearningAbciApp."""
 
+import json
+import time
 from abc import ABC
-from typing import Generator, Set, Type, cast
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
+from urllib.parse import urlparse
 
-from packages.valory.skills.abstract_round_abci.base import AbstractRound
+from packages.valory.contracts.gnosis_safe.contract import (
+    GnosisSafeContract,
+    SafeOperation,
+)
+from packages.valory.contracts.multicall3.contract import Multicall3Contract
+from packages.valory.contracts.multisend.contract import (
+    MultiSendContract,
+    MultiSendOperation,
+)
+from packages.valory.protocols.contract_api import ContractApiMessage
+from packages.valory.protocols.http import HttpMessage
+from packages.valory.skills.abstract_round_abci.base import AbstractRound, BaseTxPayload
 from packages.valory.skills.abstract_round_abci.behaviours import (
     AbstractRoundBehaviour,
     BaseBehaviour,
 )
+from packages.valory.skills.learning_abci.chains import (
+    Chain,
+    Settlement,
+    deserialize_settlements,
+    serialize_settlements,
+)
+from packages.valory.skills.learning_abci.dex_prices import pool_prices
+from packages.valory.skills.learning_abci.fee_estimator import (
+    FEE_HISTORY_METHOD,
+    FeeEstimator,
+)
+from packages.valory.skills.learning_abci.fixed_point import (
+    price_to_fixed,
+    price_to_float,
+)
+from packages.valory.skills.learning_abci.learner import (
+    decode_state,
+    observe_and_predict,
+)
+from packages.valory.skills.learning_abci.ledger_reads import (
+    LATEST_BLOCK,
+    LedgerCallError,
+    LedgerReadError,
+)
 from packages.valory.skills.learning_abci.models import Params, SharedState
 from packages.valory.skills.learning_abci.payloads import (
     APICheckPayload,
     DecisionMakingPayload,
     TxPreparationPayload,
 )
+from packages.valory.skills.learning_abci.price_filter import PriceFilter, Quotes
+from packages.valory.skills.learning_abci.rate_limiter import bucket_key
 from packages.valory.skills.learning_abci.rounds import (
     APICheckRound,
     DecisionMakingRound,
@@ -41,14 +97,41 @@ from packages.valory.skills.learning_abci.rounds import (
     SynchronizedData,
     TxPreparationRound,
 )
+from packages.valory.skills.learning_abci.simulation import (
+    SIMULATION_METHOD,
+    SimulationResult,
+    is_revert,
+    simulation_call,
+    simulation_key,
+)
+from packages.valory.skills.learning_abci.snapshot import Snapshot
+from packages.valory.skills.learning_abci.tracing import trace_id
+from packages.valory.skills.learning_abci.transfers import (
+    Transfer,
+    TransferQueue,
+    batch_size,
+)
+from packages.valory.skills.transaction_settlement_abci.payload_tools import (
+    hash_payload_to_hex,
+)
 
 
 HTTP_OK = 200
-GNOSIS_CHAIN_ID = "gnosis"
 TX_DATA = b"0x"
+EMPTY_CALL_DATA = "0x"
 SAFE_GAS = 0
 VALUE_KEY = "value"
 TO_ADDRESS_KEY = "to_address"
+ETHER_VALUE = 0
+COINGECKO_TOKEN_ID = "autonolas"
+COINGECKO_CURRENCY = "usd"
+COINGECKO_SOURCE = "coingecko"
+STREAM_SOURCE = "stream"
+EMPTY_CODE = ("0x", "0x0", None)
+# the selector of the safe's `nonce()`
+SAFE_NONCE_SELECTOR = "0xaffed0e0"
+
+ResultType = TypeVar("ResultType")
 
 
 class LearningBaseBehaviour(BaseBehaviour, ABC):  # pylint: disable=too-many-ancestors
@@ -69,6 +152,299 @@ class LearningBaseBehaviour(BaseBehaviour, ABC):  # pylint: disable=too-many-anc
         """Return the state."""
         return cast(SharedState, self.context.state)
 
+    @property
+    def default_chain(self) -> Chain:
+        """Get the default chain, whose clients are the skill's."""
+        return self.local_state.chains[self.params.default_chain_id]
+
+    @property
+    def price_filter(self) -> PriceFilter:
+        """Return the price filter."""
+        price_filter = self.local_state.price_filter
+        if price_filter is None:  # pragma: nocover
+            raise ValueError("The price filter has not been set up.")
+        return price_filter
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[None]:
+        """Trace the block as a span, the child of the active span of this behaviour, if tracing is enabled."""
+        tracer = self.local_state.tracer
+        if tracer is None:
+            yield
+            return
+        period = self.synchronized_data.period_count
+        with tracer.span(
+            self.behaviour_id,
+            trace_id(self.context.agent_address, period),
+            name,
+            attributes,
+        ):
+            yield
+
+    def async_act_wrapper(self) -> Generator:
+        """Do the act, traced as the root span of its sub-operations."""
+        with self.trace(
+            self.behaviour_id,
+            period=self.synchronized_data.period_count,
+            round=self.matching_round.auto_round_id(),
+            agent=self.context.agent_address,
+        ):
+            yield from super().async_act_wrapper()
+
+    def get_http_response(
+        self,
+        method: str,
+        url: str,
+        content: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        parameters: Optional[Dict[str, str]] = None,
+    ) -> Generator[None, None, HttpMessage]:
+        """Send an http request, queueing it until the rate limiter has a token for it."""
+        with self.trace("http", method=method, host=urlparse(url).netloc):
+            rate_limiter = self.local_state.rate_limiter
+            if rate_limiter is not None:
+                key = bucket_key(url)
+                wait = rate_limiter.reserve(url)
+                if wait > 0:
+                    stats = rate_limiter.stats[key]
+                    self.context.logger.info(
+                        f"Waiting {wait:.2f}s for a rate limit token for {urlparse(url).netloc}. "
+                        f"{stats.delayed}/{stats.requests} requests have waited, "
+                        f"{stats.mean_wait:.2f}s on average and {stats.max_wait:.2f}s at most."
+                    )
+                    with self.trace("rate_limit_wait"):
+                        yield from self.sleep(wait)
+            response = yield from super().get_http_response(
+                method, url, content, headers, parameters
+            )
+        return response
+
+    def get_contract_api_response(
+        self,
+        performative: ContractApiMessage.Performative,
+        contract_address: Optional[str],
+        contract_id: str,
+        contract_callable: str,
+        ledger_id: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Generator[None, None, ContractApiMessage]:
+        """Request the contract API, traced."""
+        with self.trace("contract_api", contract_callable=contract_callable):
+            response = yield from super().get_contract_api_response(
+                performative,
+                contract_address,
+                contract_id,
+                contract_callable,
+                ledger_id,
+                **kwargs,
+            )
+        return response
+
+    def get_signature(
+        self, message: bytes, is_deprecated_mode: bool = False
+    ) -> Generator[None, None, str]:
+        """Get the signature of a message from the decision maker, traced."""
+        with self.trace("sign"):
+            signature = yield from super().get_signature(message, is_deprecated_mode)
+        return signature
+
+    def send_a2a_transaction(
+        self, payload: BaseTxPayload, resetting: bool = False
+    ) -> Generator:
+        """Send a payload to the other agents through Tendermint, traced."""
+        with self.trace("send_a2a_transaction", payload=type(payload).__name__):
+            yield from super().send_a2a_transaction(payload, resetting)
+
+    def wait_until_round_end(
+        self, timeout: Optional[float] = None
+    ) -> Generator[None, None, None]:
+        """Wait for the other agents to end the round, traced."""
+        with self.trace("wait_until_round_end"):
+            yield from super().wait_until_round_end(timeout)
+
+    def read_ledger_futures(
+        self, reads: List[Tuple[str, List[Any]]], chain: Optional[Chain] = None
+    ) -> Generator[None, None, Optional[List["Future[Any]"]]]:
+        """Make JSON-RPC reads of the ledger of a chain, the default one if none is given, returning their futures once they are all done."""
+        chain = self.default_chain if chain is None else chain
+        ledger_reader = chain.ledger_reader
+        if ledger_reader is None:
+            return None
+        futures = [ledger_reader.read(method, params) for method, params in reads]
+        ledger_reader.flush()
+        with self.trace("ledger_read", chain=chain.chain_id, reads=len(reads)):
+            while not all(future.done() for future in futures):
+                yield
+        return futures
+
+    def read_ledger(
+        self, reads: List[Tuple[str, List[Any]]], chain: Optional[Chain] = None
+    ) -> Generator[None, None, Optional[List[Any]]]:
+        """Make JSON-RPC reads of the ledger of a chain, batched together with the other reads of this tick."""
+        futures = yield from self.read_ledger_futures(reads, chain)
+        if futures is None:
+            return None
+        try:
+            return [future.result() for future in futures]
+        except LedgerReadError as e:
+            self.context.logger.error(f"Could not read the ledger: {e}")
+            return None
+
+    def gather(
+        self, *generators: Generator[None, None, ResultType]
+    ) -> Generator[None, None, List[ResultType]]:
+        """
+        Run generators side by side, returning their results in order.
+
+        Only generators which wait on futures, e.g., on the reads of the ledger, can be gathered,
+        as the responses to the messages the behaviour waits for cannot be told apart.
+
+        :param generators: the generators to run.
+        :yield: None
+        :return: the results of the generators.
+        """
+        results: Dict[int, ResultType] = {}
+        running = dict(enumerate(generators))
+        while running:
+            for index, generator in list(running.items()):
+                try:
+                    next(generator)
+                except StopIteration as stop:
+                    results[index] = stop.value
+                    del running[index]
+            if running:
+                yield
+        return [results[index] for index in sorted(results)]
+
+    def run_in_worker(
+        self, function: Callable[..., ResultType], *args: Any
+    ) -> Generator[None, None, Optional[ResultType]]:
+        """
+        Run a pure function in the worker pool, if enabled, without blocking the main loop.
+
+        The function is cancelled if it does not return within `worker_timeout` seconds, or if the
+        behaviour is stopped because its round has ended.
+
+        :param function: the function, defined at the top level of a module.
+        :param args: the arguments of the function.
+        :yield: None
+        :return: the result of the function, or None if it has failed or timed out.
+        """
+        worker_pool = self.local_state.worker_pool
+        if worker_pool is None:
+            return function(*args)
+        future = worker_pool.submit(function, *args)
+        deadline = time.monotonic() + self.params.worker_timeout
+        try:
+            with self.trace("worker", function=function.__name__):
+                while not future.done():
+                    if time.monotonic() > deadline:
+                        self.context.logger.error(
+                            f"{function.__name__} has not returned within {self.params.worker_timeout}s"
+                        )
+                        return None
+                    yield
+            return future.result()
+        except Exception as e:  # pylint: disable=broad-except
+            self.context.logger.error(
+                f"{function.__name__} has failed in the worker pool: {type(e).__name__}: {e}"
+            )
+            return None
+        finally:
+            worker_pool.cancel(future)
+
+    def get_safe_nonce(
+        self, chain: Optional[Chain] = None
+    ) -> Generator[None, None, Optional[int]]:
+        """Get the nonce of the safe of a chain, the default one if none is given, if it can be read."""
+        chain = self.default_chain if chain is None else chain
+        safe = chain.config.safe_address
+        results = yield from self.read_ledger(
+            [("eth_call", [{"to": safe, "data": SAFE_NONCE_SELECTOR}, LATEST_BLOCK])],
+            chain,
+        )
+        if results is None:
+            return None
+        try:
+            return int(results[0], 16)
+        except (TypeError, ValueError):
+            return None
+
+    def fetch_source_price(
+        self, name: str, url: str, path: List[str]
+    ) -> Generator[None, None, Optional[float]]:
+        """Fetch the token price from a source, found under the given path of its JSON response."""
+        response = yield from self.get_http_response(method="GET", url=url)
+        if response.status_code != HTTP_OK:
+            self.context.logger.error(
+                f"Could not fetch the price from {name}. "
+                f"Received status code {response.status_code}."
+            )
+            return None
+
+        try:
+            value = json.loads(response.body)
+            for key in path:
+                value = value[key]
+            return float(value)
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            self.context.logger.error(
+                f"Could not parse the price from {name}'s response {response.body!r}: {e}"
+            )
+            return None
+
+    def fetch_quotes(self) -> Generator[None, None, Quotes]:
+        """Fetch the token price from Coingecko and from the other configured sources."""
+        url = self.params.coingecko_price_template.format(
+            api_key=self.params.coingecko_api_key or ""
+        )
+        sources = [
+            (COINGECKO_SOURCE, url, [COINGECKO_TOKEN_ID, COINGECKO_CURRENCY])
+        ] + [
+            (source["name"], source["url"], source["path"])
+            for source in self.params.price_sources
+        ]
+        quotes = {}
+        for name, url, path in sources:
+            price = yield from self.fetch_source_price(name, url, path)
+            if price is not None:
+                quotes[name] = price
+        dex_quotes = yield from self.fetch_dex_quotes()
+        quotes.update(dex_quotes)
+        return quotes
+
+    def fetch_dex_quotes(self) -> Generator[None, None, Quotes]:
+        """Read the prices of the configured AMM pools, batched into a single multicall."""
+        pools = self.params.dex_pools
+        if not pools:
+            return {}
+
+        response = yield from self.get_contract_api_response(
+            performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
+            contract_address=self.params.multicall_address,
+            contract_id=str(Multicall3Contract.contract_id),
+            contract_callable="try_block_and_aggregate",
+            calls=[list(pool.call) for pool in pools],
+            chain_id=self.params.default_chain_id,
+        )
+        if response.performative != ContractApiMessage.Performative.STATE:
+            self.context.logger.error(
+                f"Couldn't read the AMM pools. Expected response performative "
+                f"{ContractApiMessage.Performative.STATE.value}, "  # type: ignore
+                f"received {response.performative.value}."
+            )
+            return {}
+
+        body = response.state.body
+        prices = pool_prices(pools, cast(List[Dict[str, Any]], body["results"]))
+        failed = sorted(name for name, price in prices.items() if price is None)
+        if failed:
+            self.context.logger.warning(f"Couldn't read the price of pools {failed}")
+        self.context.logger.info(
+            f"Read the prices of {len(pools)} pools at block {body['block_number']}"
+        )
+        return {name: price for name, price in prices.items() if price is not None}
+
 
 class APICheckBehaviour(LearningBaseBehaviour):  # pylint: disable=too-many-ancestors
     """APICheckBehaviour"""
@@ -80,6 +456,7 @@ class APICheckBehaviour(LearningBaseBehaviour):  # pylint: disable=too-many-ance
 
         with self.context.benchmark_tool.measure(self.behaviour_id).local():
             sender = self.context.agent_address
+            yield from self.take_snapshot()
             price = yield from self.get_price()
             payload = APICheckPayload(sender=sender, price=price)
 
@@ -89,13 +466,59 @@ class APICheckBehaviour(LearningBaseBehaviour):  # pylint: disable=too-many-ance
 
         self.set_done()
 
-    def get_price(self):
-        """Get token price from Coingecko"""
-        # result = yield from self.get_http_response("coingecko.com")
-        yield
-        price = 1.0
-        self.context.logger.info(f"Price is {price}")
-        return price
+    def take_snapshot(self) -> Generator:
+        """Snapshot the state agreed on up to the previous period, every `snapshot_interval` periods."""
+        writer = self.local_state.snapshot_writer
+        period = self.synchronized_data.period_count
+        learner_state = self.synchronized_data.learner_state
+        if (
+            writer is None
+            or not learner_state
+            or period % self.params.snapshot_interval != 0
+        ):
+            return
+        # the nonce tells on restore whether the pending transfers are still pending
+        safe_nonce = yield from self.get_safe_nonce()
+        snapshot = Snapshot(
+            period=period,
+            safe_nonce=safe_nonce,
+            learner_state=learner_state,
+            pending_transfers=self.synchronized_data.pending_transfers or "",
+            deviations=self.price_filter.state(),
+        )
+        writer.submit(snapshot)
+        # the writer reports its own errors, as the snapshot is written after this returns
+        self.local_state.snapshot = snapshot
+
+    def get_price(self) -> Generator[None, None, Optional[int]]:
+        """Get the token price in fixed point, aggregated from the quotes which are not outliers."""
+        quotes = yield from self.get_quotes()
+        kept = self.price_filter.reject_outliers(quotes)
+        if len(kept) < len(quotes):
+            dropped = sorted(set(quotes) - set(kept))
+            self.context.logger.info(f"Dropped outlying quotes from {dropped}")
+        # if every quote is an outlier, there is no telling which ones are right
+        price = self.price_filter.weighted_mean(kept or quotes)
+        self.local_state.proposed_quotes = quotes
+        fixed_price = price_to_fixed(price, self.params.price_decimals)
+        self.context.logger.info(
+            f"Price is {price}, {fixed_price} in fixed point with {self.params.price_decimals} decimals"
+        )
+        return fixed_price
+
+    def get_quotes(self) -> Generator[None, None, Quotes]:
+        """Get the quotes, preferring a fresh streamed or prefetched ones over new requests."""
+        quotes = self.local_state.pop_prefetched_quotes(self.params.price_max_age)
+        stream = self.local_state.price_stream
+        streamed = None
+        if stream is not None:
+            streamed = stream.window.latest(self.params.price_max_age)
+        if quotes is None and streamed is None:
+            quotes = yield from self.fetch_quotes()
+        quotes = dict(quotes or {})
+        if streamed is not None:
+            quotes[STREAM_SOURCE] = streamed
+        return quotes
 
 
 class DecisionMakingBehaviour(
@@ -110,8 +533,25 @@ class DecisionMakingBehaviour(
 
         with self.context.benchmark_tool.measure(self.behaviour_id).local():
             sender = self.context.agent_address
-            event = self.get_event()
-            payload = DecisionMakingPayload(sender=sender, event=event)
+            self.score_sources()
+            learner_state = self.get_learner_state()
+            evaluation = yield from self.run_in_worker(
+                observe_and_predict,
+                decode_state(learner_state),
+                self.agreed_price,
+                self.params.learner_lags,
+                self.params.learner_forgetting,
+                self.params.learner_prior_variance,
+            )
+            if evaluation is None:
+                # the learner is kept as agreed, and nothing is transacted on a stale prediction
+                event = Event.DONE.value
+            else:
+                learner_state, prediction, updates = evaluation
+                event = self.get_event(prediction, updates)
+            payload = DecisionMakingPayload(
+                sender=sender, event=event, learner_state=learner_state
+            )
 
         with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
             yield from self.send_a2a_transaction(payload)
@@ -119,11 +559,42 @@ class DecisionMakingBehaviour(
 
         self.set_done()
 
-    def get_event(self):
+    @property
+    def agreed_price(self) -> Optional[float]:
+        """Get the price agreed on in this period."""
+        return price_to_float(self.synchronized_data.price, self.params.price_decimals)
+
+    def score_sources(self) -> None:
+        """Score the price sources against the price agreed on in this period."""
+        quotes, self.local_state.proposed_quotes = self.local_state.proposed_quotes, {}
+        self.price_filter.record(quotes, self.agreed_price)
+
+    def get_learner_state(self) -> Optional[str]:
+        """Get the state of the learner agreed on up to the previous period."""
+        learner_state = self.synchronized_data.learner_state
+        snapshot = self.local_state.snapshot
+        if not learner_state and snapshot is not None:
+            # the service has restarted, the snapshot is only adopted if enough agents propose it
+            self.context.logger.info(
+                f"Proposing the learner of the snapshot of period {snapshot.period}"
+            )
+            learner_state = snapshot.learner_state
+        return learner_state
+
+    def get_event(self, prediction: Optional[float], updates: int) -> str:
         """Get the next event"""
         # Using the token price from the previous round, decide whether we should make a transfer or not
-        event = Event.DONE.value
-        self.context.logger.info(f"Event is {event}")
+        if (
+            prediction is not None
+            and updates >= self.params.learner_min_updates
+            and prediction > self.params.learner_transact_threshold
+        ):
+            event = Event.TRANSACT.value
+        else:
+            event = Event.DONE.value
+        self.context.logger.info(
+            f"Predicted log return is {prediction} after {updates} updates. Event is {event}"
+        )
         return event
 
 
@@ -139,9 +610,20 @@ class TxPreparationBehaviour(
 
         with self.context.benchmark_tool.measure(self.behaviour_id).local():
             sender = self.context.agent_address
-            tx_hash = yield from self.get_tx_hash()
+            settlements = self.synchronized_data.settlements
+            if settlements is None:
+                settlements, pending_transfers = yield from self.prepare_settlements()
+            else:
+                # the settlements of the period have been agreed on, the next one is made
+                pending_transfers = self.synchronized_data.pending_transfers
+            plan = deserialize_settlements(settlements)
+            if plan:
+                self.set_gas_params(self.local_state.chains[plan[0].chain_id])
             payload = TxPreparationPayload(
-                sender=sender, tx_submitter=None, tx_hash=tx_hash
+                sender=sender,
+                tx_submitter=self.auto_behaviour_id(),
+                settlements=settlements,
+                pending_transfers=pending_transfers,
             )
 
         with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
@@ -150,14 +632,367 @@ class TxPreparationBehaviour(
 
         self.set_done()
 
-    def get_tx_hash(self):
-        """Get the tx hash"""
-        # We need to prepare a 1 wei transfer from the safe to another (configurable) account.
-        yield
-        tx_hash = None
-        self.context.logger.info(f"Transaction hash is {tx_hash}")
+    def prepare_settlements(self) -> Generator[None, None, Tuple[str, str]]:
+        """Prepare a safe transaction on every chain with pending transfers, returning the settlements and the transfers left pending."""
+        pending_transfers = yield from self.get_agreed_transfers()
+        queue = self.get_pending_transfers(pending_transfers)
+        batches = queue.pop_chain_batches(
+            batch_size(
+                self.params.transfer_gas_budget,
+                self.params.transfer_base_gas,
+                self.params.transfer_gas_per_transfer,
+            ),
+            self.params.default_chain_id,
+        )
+        if not batches:
+            self.context.logger.info("There are no pending transfers")
+        chains = []
+        for chain_id, batch in batches.items():
+            chain = self.local_state.chains.get(chain_id)
+            if chain is None:
+                self.context.logger.warning(
+                    f"Chain {chain_id} is not configured, keeping its {len(batch)} transfer(s)"
+                )
+                queue.restore(batch)
+                continue
+            chains.append(chain)
+
+        # the reads of the chains are independent, so the chains are checked side by side
+        checked = yield from self.gather(
+            *(
+                self.check_batch(chain, batches[chain.chain_id], queue)
+                for chain in chains
+            )
+        )
+        settlements = []
+        for chain, batch in zip(chains, checked):
+            # the contract calls wait on messages, so they are made one chain at a time
+            tx_hash = yield from self.get_tx_hash(chain, batch)
+            if tx_hash is None:
+                # keep the transfers for a later attempt
+                queue.restore(batch)
+                continue
+            settlements.append(
+                Settlement(chain.chain_id, chain.config.safe_address, tx_hash)
+            )
+        return serialize_settlements(settlements), queue.serialize()
+
+    def get_agreed_transfers(self) -> Generator[None, None, Optional[str]]:
+        """Get the agreed pending transfers, proposing those of the snapshot if the service has restarted."""
+        pending_transfers = self.synchronized_data.pending_transfers
+        snapshot = self.local_state.snapshot
+        if (
+            snapshot is None
+            or not snapshot.pending_transfers
+            or len(TransferQueue.deserialize(pending_transfers)) > 0
+        ):
+            return pending_transfers
+        # the snapshot's transfers are proposed once, and only if the safe has not transacted since
+        self.local_state.snapshot = replace(snapshot, pending_transfers="")
+        safe_nonce = yield from self.get_safe_nonce()
+        if safe_nonce is None or safe_nonce != snapshot.safe_nonce:
+            self.context.logger.warning(
+                f"Not restoring the pending transfers of the snapshot of period {snapshot.period}, "
+                f"the safe's nonce is {safe_nonce} instead of {snapshot.safe_nonce}"
+            )
+            return pending_transfers
+        self.context.logger.info(
+            f"Proposing the pending transfers of the snapshot of period {snapshot.period}"
+        )
+        return snapshot.pending_transfers
+
+    def get_pending_transfers(self, pending_transfers: Optional[str]) -> TransferQueue:
+        """Get the pending transfers, scheduling the transfers of this period."""
+        queue = TransferQueue.deserialize(
+            pending_transfers, self.params.transfer_queue_max_size
+        )
+        # the timestamp of the last round transition is the same for all the agents
+        now = self.round_sequence.last_round_transition_timestamp.timestamp()
+        for recipient in self.params.transfer_recipients:
+            dropped = queue.push(
+                recipient["address"],
+                recipient["amount"],
+                now + recipient["ttl"],
+                recipient["priority"],
+                recipient.get("chain_id", self.params.default_chain_id),
+            )
+            if dropped is not None:
+                self.context.logger.warning(
+                    f"Transfer queue is full, dropped {dropped}"
+                )
+        for expired in queue.drop_expired(now):
+            self.context.logger.warning(f"Dropped expired transfer {expired}")
+        return queue
+
+    def check_batch(
+        self, chain: Chain, batch: List[Transfer], queue: TransferQueue
+    ) -> Generator[None, None, List[Transfer]]:
+        """Check the transfers of a chain, keeping those its safe can fund and dropping those which would revert."""
+        batch = yield from self.get_fundable_batch(chain, batch, queue)
+        batch = yield from self.simulate_batch(chain, batch)
+        return batch
+
+    def get_fundable_batch(
+        self, chain: Chain, batch: List[Transfer], queue: TransferQueue
+    ) -> Generator[None, None, List[Transfer]]:
+        """Check that the safe is deployed and funded, putting back the transfers it cannot fund."""
+        if not batch:
+            return batch
+        safe = chain.config.safe_address
+        reads = [
+            ("eth_getCode", [safe, LATEST_BLOCK]),
+            ("eth_getBalance", [safe, LATEST_BLOCK]),
+        ]
+        fee_history_read = self.get_fee_history_read(chain)
+        if fee_history_read is not None:
+            # refresh the fee history in the same batch
+            reads.append(fee_history_read)
+        results = yield from self.read_ledger(reads, chain)
+        if results is None:
+            # the reads are a sanity check, the contract calls would fail anyway
+            return batch
+
+        if fee_history_read is not None:
+            self.update_fee_history(chain, results[-1])
+        code, balance = results[0], int(results[1], 16)
+        if code in EMPTY_CODE:
+            self.context.logger.error(
+                f"There is no contract at the safe address {safe} on {chain.chain_id}"
+            )
+            queue.restore(batch)
+            return []
+        fundable, total = [], 0
+        for transfer in batch:
+            if total + transfer.amount <= balance:
+                fundable.append(transfer)
+                total += transfer.amount
+        unfundable = [transfer for transfer in batch if transfer not in fundable]
+        if unfundable:
+            self.context.logger.warning(
+                f"The safe's balance of {balance} on {chain.chain_id} cannot fund "
+                f"{len(unfundable)} transfers, keeping them for a later attempt"
+            )
+            queue.restore(unfundable)
+        return fundable
+
+    def simulate_batch(
+        self, chain: Chain, batch: List[Transfer]
+    ) -> Generator[None, None, List[Transfer]]:
+        """Dry run the transfers of the safe, dropping those which would revert."""
+        cache = chain.simulation_cache
+        ledger_reader = chain.ledger_reader
+        if not batch or cache is None or ledger_reader is None:
+            return batch
+        safe_nonce = yield from self.get_safe_nonce(chain)
+        # the block of the nonce read, as the reads of a block are cached together
+        block = ledger_reader.block_number
+        if safe_nonce is None or block is None:
+            # the dry runs are a sanity check, the settlement would fail anyway
+            return batch
+
+        calls = [
+            simulation_call(
+                chain.config.safe_address,
+                transfer.target,
+                transfer.amount,
+                EMPTY_CALL_DATA,
+                self.params.transfer_gas_per_transfer,
+            )
+            for transfer in batch
+        ]
+        keys = [simulation_key(call, safe_nonce, block) for call in calls]
+        results = [cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            simulated = yield from self.run_simulations(
+                chain, [calls[i] for i in misses], block
+            )
+            for i, result in zip(misses, simulated):
+                results[i] = result
+                if result is not None:
+                    cache.put(keys[i], result)
+        self.context.logger.info(
+            f"Simulated {len(batch)} transfer(s) on {chain.chain_id} at block {block}, "
+            f"{len(batch) - len(misses)} from the cache"
+        )
+
+        kept = []
+        for transfer, result in zip(batch, results):
+            if result is None or result.success:
+                kept.append(transfer)
+            else:
+                self.context.logger.warning(
+                    f"Dropped transfer {transfer}, its dry run failed: {result.error}"
+                )
+        return kept
+
+    def run_simulations(
+        self, chain: Chain, calls: List[Dict[str, str]], block: int
+    ) -> Generator[None, None, List[Optional[SimulationResult]]]:
+        """Run the dry runs of calls at a block, with no result for those which could not be run."""
+        futures = yield from self.read_ledger_futures(
+            [(SIMULATION_METHOD, [call, hex(block)]) for call in calls], chain
+        )
+        if futures is None:
+            return [None] * len(calls)
+        results: List[Optional[SimulationResult]] = []
+        for future in futures:
+            try:
+                future.result()
+                results.append(SimulationResult(success=True))
+            except LedgerCallError as e:
+                if not is_revert(e.error):
+                    self.context.logger.error(f"Could not run a dry run: {e}")
+                    results.append(None)
+                    continue
+                results.append(SimulationResult(success=False, error=str(e.error)))
+            except LedgerReadError as e:
+                self.context.logger.error(f"Could not run a dry run: {e}")
+                results.append(None)
+        return results
+
+    def get_fee_history_read(self, chain: Chain) -> Optional[Tuple[str, List[Any]]]:
+        """Get the read of the fee history of a chain, if its fee estimator is due to refresh it."""
+        fee_estimator = chain.fee_estimator
+        ledger_reader = chain.ledger_reader
+        if fee_estimator is None or ledger_reader is None:
+            return None
+        block_number = ledger_reader.block_number
+        if not fee_estimator.needs_refresh(block_number):
+            return None
+        return FEE_HISTORY_METHOD, fee_estimator.read_params(block_number)
+
+    def update_fee_history(self, chain: Chain, fee_history: Dict[str, Any]) -> None:
+        """Update the fee estimator of a chain with a fee history read."""
+        fee_estimator = cast(FeeEstimator, chain.fee_estimator)
+        try:
+            fee_estimator.update(fee_history)
+        except (KeyError, ValueError, TypeError, IndexError) as e:
+            self.context.logger.error(
+                f"Could not parse the fee history {fee_history!r} of {chain.chain_id}: {e}"
+            )
+
+    def set_gas_params(self, chain: Chain) -> None:
+        """Price the transaction with the fee estimate of its chain, so that its settlement does not read the fee data."""
+        # the transaction settlement params of the chained skill
+        gas_params = getattr(self.params, "gas_params", None)
+        if gas_params is None:
+            return
+        configured = self.local_state.configured_gas_params
+        if configured is None:
+            configured = (
+                gas_params.gas_price,
+                gas_params.max_fee_per_gas,
+                gas_params.max_priority_fee_per_gas,
+            )
+            self.local_state.configured_gas_params = configured
+        fee_estimator = chain.fee_estimator
+        estimate = None if fee_estimator is None else fee_estimator.estimate()
+        if estimate is None:
+            # the estimate of another chain, or of a previous period, must not price the transaction
+            (
+                gas_params.gas_price,
+                gas_params.max_fee_per_gas,
+                gas_params.max_priority_fee_per_gas,
+            ) = configured
+            return
+        gas_params.gas_price = None
+        gas_params.max_fee_per_gas = estimate.max_fee_per_gas
+        gas_params.max_priority_fee_per_gas = estimate.max_priority_fee_per_gas
+        self.context.logger.info(
+            f"Pricing the transaction on {chain.chain_id} with {estimate}"
+        )
+
+    def get_tx_hash(
+        self, chain: Chain, batch: List[Transfer]
+    ) -> Generator[None, None, Optional[str]]:
+        """Get the hash of a safe transaction making the given transfers on a chain."""
+        if not batch:
+            self.context.logger.info(
+                f"There are no transfers left to make on {chain.chain_id}"
+            )
+            return None
+
+        if len(batch) == 1:
+            # a single transfer does not need to go through the multisend contract
+            transfer = batch[0]
+            to_address, value, data = transfer.target, transfer.amount, TX_DATA
+            operation = SafeOperation.CALL.value
+        else:
+            multisend_data = yield from self.get_multisend_data(chain, batch)
+            if multisend_data is None:
+                return None
+            to_address, value = chain.config.multisend_address, ETHER_VALUE
+            data = bytes.fromhex(multisend_data)
+            operation = SafeOperation.DELEGATE_CALL.value
+
+        response = yield from self.get_contract_api_response(
+            performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
+            contract_address=chain.config.safe_address,
+            contract_id=str(GnosisSafeContract.contract_id),
+            contract_callable="get_raw_safe_transaction_hash",
+            to_address=to_address,
+            value=value,
+            data=data,
+            safe_tx_gas=SAFE_GAS,
+            operation=operation,
+            chain_id=chain.chain_id,
+        )
+        if response.performative != ContractApiMessage.Performative.STATE:
+            self.context.logger.error(
+                f"Couldn't get the safe tx hash on {chain.chain_id}. Expected response performative "
+                f"{ContractApiMessage.Performative.STATE.value}, "  # type: ignore
+                f"received {response.performative.value}."
+            )
+            return None
+
+        # strip "0x" from the response hash
+        safe_tx_hash = cast(str, response.state.body["tx_hash"])[2:]
+        tx_hash = hash_payload_to_hex(
+            safe_tx_hash=safe_tx_hash,
+            ether_value=value,
+            safe_tx_gas=SAFE_GAS,
+            to_address=to_address,
+            data=data,
+            operation=operation,
+        )
+        self.context.logger.info(
+            f"Transaction hash for {len(batch)} transfer(s) on {chain.chain_id} is {tx_hash}"
+        )
         return tx_hash
 
+    def get_multisend_data(
+        self, chain: Chain, batch: List[Transfer]
+    ) -> Generator[None, None, Optional[str]]:
+        """Get the data of a multisend transaction making the given transfers on a chain."""
+        transactions: List[Dict] = [
+            {
+                "operation": MultiSendOperation.CALL,
+                "to": transfer.target,
+                "value": transfer.amount,
+                "data": b"",
+            }
+            for transfer in batch
+        ]
+        response = yield from self.get_contract_api_response(
+            performative=ContractApiMessage.Performative.GET_RAW_TRANSACTION,  # type: ignore
+            contract_address=chain.config.multisend_address,
+            contract_id=str(MultiSendContract.contract_id),
+            contract_callable="get_tx_data",
+            multi_send_txs=transactions,
+            chain_id=chain.chain_id,
+        )
+        if response.performative != ContractApiMessage.Performative.RAW_TRANSACTION:
+            self.context.logger.error(
+                f"Couldn't compile the multisend tx. Expected response performative "
+                f"{ContractApiMessage.Performative.RAW_TRANSACTION.value}, "  # type: ignore
+                f"received {response.performative.value}."
+            )
+            return None
+
+        # strip "0x" from the response
+        return cast(str, response.raw_transaction.body["data"])[2:]
+
 
 class LearningRoundBehaviour(AbstractRoundBehaviour):
     """LearningRoundBehaviour"""
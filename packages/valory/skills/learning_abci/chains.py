@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the chains the transfers of LearningAbciApp are settled on.
+
+Every chain has a safe of its own, and its own clients of the ledger: a reader, a fee estimator
+and a cache of the dry runs, so that the nonces, the blocks and the fees of a chain are cached
+independently of the other chains. The transfers of a period are batched per chain, and the
+agents agree on a settlement per chain, i.e., the chain, its safe and the hash of the safe
+transaction, which are then settled one after the other within the period.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from packages.valory.skills.learning_abci.fee_estimator import FeeEstimator
+from packages.valory.skills.learning_abci.ledger_reads import LedgerReader
+from packages.valory.skills.learning_abci.simulation import SimulationCache
+
+
+@dataclass(frozen=True)
+class ChainConfig:
+    """The configuration of a chain to settle transfers on."""
+
+    chain_id: str
+    safe_address: str
+    ledger_rpc_url: str
+    multisend_address: str
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], default_multisend_address: str
+    ) -> "ChainConfig":
+        """Create the configuration of a chain, using the default multisend address if none is set."""
+        return cls(
+            chain_id=config["chain_id"],
+            safe_address=config["safe_address"],
+            ledger_rpc_url=config["ledger_rpc_url"],
+            multisend_address=config.get(
+                "multisend_address", default_multisend_address
+            ),
+        )
+
+
+@dataclass
+class Chain:
+    """A chain, with the clients of its ledger."""
+
+    config: ChainConfig
+    ledger_reader: Optional[LedgerReader] = None
+    fee_estimator: Optional[FeeEstimator] = None
+    simulation_cache: Optional[SimulationCache] = None
+
+    @property
+    def chain_id(self) -> str:
+        """Get the id of the chain."""
+        return self.config.chain_id
+
+
+class Settlement(NamedTuple):
+    """A safe transaction to settle on a chain."""
+
+    chain_id: str
+    safe_address: str
+    tx_hash: str
+
+
+def serialize_settlements(settlements: List[Settlement]) -> str:
+    """Serialize the settlements to a deterministic JSON string."""
+    return json.dumps([list(settlement) for settlement in settlements])
+
+
+def deserialize_settlements(serialized: Optional[str]) -> List[Settlement]:
+    """Deserialize the settlements."""
+    if not serialized:
+        return []
+    return [Settlement(*values) for values in json.loads(serialized)]
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the derivation of prices from the state of on-chain AMM pools.
+
+Two kinds of pools are supported: constant product pools, i.e., Uniswap V2 and its forks,
+whose price is the ratio of their reserves, and concentrated liquidity pools, i.e., Uniswap V3
+and its forks, whose price is the square of the `sqrtPriceX96` of their `slot0`.
+The price of a pool is the price of its `token0` in units of its `token1`, unless inverted.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+
+WORD_SIZE = 32
+Q96 = 2**96
+
+
+class PoolKind(Enum):
+    """The kinds of AMM pools."""
+
+    V2 = "v2"
+    V3 = "v3"
+
+
+# the selectors of `getReserves()` and `slot0()`
+SELECTORS = {
+    PoolKind.V2: "0x0902f1ac",
+    PoolKind.V3: "0x3850c7bd",
+}
+
+
+@dataclass(frozen=True)
+class Pool:
+    """An AMM pool to read a price from."""
+
+    name: str
+    address: str
+    kind: PoolKind
+    token0_decimals: int
+    token1_decimals: int
+    invert: bool = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Pool":
+        """Create a pool from its configuration."""
+        return cls(
+            name=config["name"],
+            address=config["address"],
+            kind=PoolKind(config["kind"]),
+            token0_decimals=int(config["token0_decimals"]),
+            token1_decimals=int(config["token1_decimals"]),
+            invert=bool(config.get("invert", False)),
+        )
+
+    @property
+    def call(self) -> Tuple[str, str]:
+        """Get the read call of the pool, as its address and the hex encoded call data."""
+        return self.address, SELECTORS[self.kind]
+
+    def price(self, return_data: str) -> Optional[float]:
+        """Derive the price from the return data of the read call of the pool."""
+        data = bytes.fromhex(
+            return_data[2:] if return_data[:2] == "0x" else return_data
+        )
+        words = [
+            int.from_bytes(data[i : i + WORD_SIZE], "big")
+            for i in range(0, len(data) - WORD_SIZE + 1, WORD_SIZE)
+        ]
+        if self.kind == PoolKind.V2:
+            if len(words) < 2 or words[0] == 0 or words[1] == 0:
+                return None
+            raw_price = words[1] / words[0]
+        else:
+            if not words or words[0] == 0:
+                return None
+            raw_price = (words[0] / Q96) ** 2
+        price = raw_price * 10 ** (self.token0_decimals - self.token1_decimals)
+        return 1 / price if self.invert else price
+
+
+def pool_prices(
+    pools: List[Pool], results: List[Dict[str, Any]]
+) -> Dict[str, Optional[float]]:
+    """Derive the prices of the pools from the results of their batched read calls, in order."""
+    prices = {}
+    for pool, result in zip(pools, results):
+        prices[pool.name] = (
+            pool.price(result["return_data"]) if result["success"] else None
+        )
+    return prices
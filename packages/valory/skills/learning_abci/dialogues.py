@@ -17,7 +17,23 @@
 #
 # ------------------------------------------------------------------------------
 
-"""This module contains the dialogues of the LearningAbciApp."""
+"""
+This module contains the dialogues of the LearningAbciApp.
+
+The dialogues keep their terminated dialogues in a bounded store, evicting the least recently
+used ones, so that the memory of an agent which runs for long does not grow with every request.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, cast
+
+from aea.protocols.dialogue.base import (
+    BasicDialoguesStorage,
+    Dialogue,
+    DialogueLabel,
+    Dialogues,
+)
 
 from packages.valory.skills.abstract_round_abci.dialogues import (
     AbciDialogue as BaseAbciDialogue,
@@ -63,29 +79,132 @@ from packages.valory.skills.abstract_round_abci.dialogues import (
 )
 
 
+DEFAULT_MAX_TERMINAL_DIALOGUES = 100
+
+
+@dataclass(frozen=True)
+class DialogueCounters:
+    """The counters of the dialogues of a protocol."""
+
+    live: int
+    terminal: int
+    evicted: int
+
+
+class BoundedDialoguesStorage(BasicDialoguesStorage):
+    """A dialogues storage which keeps at most a number of terminal dialogues, evicting the least recently used."""
+
+    def __init__(self, dialogues: Dialogues, max_terminal_dialogues: int) -> None:
+        """Initialize the storage."""
+        super().__init__(dialogues)
+        self.max_terminal_dialogues = max_terminal_dialogues
+        self.evicted = 0
+        # the terminal dialogues, by their incomplete labels, from the least to the most recently used
+        self._terminal_lru: "OrderedDict[DialogueLabel, None]" = OrderedDict()
+
+    @property
+    def counters(self) -> DialogueCounters:
+        """Get the counters of the dialogues."""
+        # every stored dialogue has a single entry by its incomplete label
+        stored = len(self._incomplete_to_complete_dialogue_labels)
+        terminal = len(self._terminal_lru)
+        return DialogueCounters(stored - terminal, terminal, self.evicted)
+
+    def cleanup(self) -> None:
+        """Clean up the storage."""
+        super().cleanup()
+        self._terminal_lru.clear()
+
+    def dialogue_terminal_state_callback(self, dialogue: Dialogue) -> None:
+        """Keep a dialogue which has reached a terminal state, evicting the least recently used ones."""
+        label = dialogue.dialogue_label
+        self._terminal_state_dialogues_labels.add(label)
+        self._terminal_lru[label.get_incomplete_version()] = None
+        while len(self._terminal_lru) > self.max_terminal_dialogues:
+            evicted_label, _ = self._terminal_lru.popitem(last=False)
+            self.remove(evicted_label)
+            self.evicted += 1
+
+    def remove(self, dialogue_label: DialogueLabel) -> None:
+        """Remove a dialogue."""
+        # the labels are complete or not depending on the caller, the storage is keyed by both
+        label = self.get_latest_label(dialogue_label.get_incomplete_version())
+        super().remove(label)
+        self._terminal_lru.pop(dialogue_label.get_incomplete_version(), None)
+
+    def get(self, dialogue_label: DialogueLabel) -> Optional[Dialogue]:
+        """Get a dialogue, marking it as recently used if terminal."""
+        dialogue = super().get(dialogue_label)
+        incomplete_label = dialogue_label.get_incomplete_version()
+        if dialogue is not None and incomplete_label in self._terminal_lru:
+            self._terminal_lru.move_to_end(incomplete_label)
+        return dialogue
+
+
+class BoundedDialogues:  # pylint: disable=too-few-public-methods
+    """A mixin bounding the terminal dialogues kept by a dialogues model."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialize the dialogues, with the `max_terminal_dialogues` arg of their model."""
+        max_terminal_dialogues = kwargs.pop(
+            "max_terminal_dialogues", DEFAULT_MAX_TERMINAL_DIALOGUES
+        )
+        super().__init__(**kwargs)
+        self._bounded_storage = BoundedDialoguesStorage(
+            cast(Dialogues, self), max_terminal_dialogues
+        )
+        self._dialogues_storage = self._bounded_storage
+
+    @property
+    def counters(self) -> DialogueCounters:
+        """Get the counters of the dialogues."""
+        return self._bounded_storage.counters
+
+
 AbciDialogue = BaseAbciDialogue
-AbciDialogues = BaseAbciDialogues
+
+
+class AbciDialogues(BoundedDialogues, BaseAbciDialogues):
+    """The ABCI dialogues, keeping a bounded number of terminal dialogues."""
 
 
 HttpDialogue = BaseHttpDialogue
-HttpDialogues = BaseHttpDialogues
+
+
+class HttpDialogues(BoundedDialogues, BaseHttpDialogues):
+    """The HTTP dialogues, keeping a bounded number of terminal dialogues."""
 
 
 SigningDialogue = BaseSigningDialogue
-SigningDialogues = BaseSigningDialogues
+
+
+class SigningDialogues(BoundedDialogues, BaseSigningDialogues):
+    """The signing dialogues, keeping a bounded number of terminal dialogues."""
 
 
 LedgerApiDialogue = BaseLedgerApiDialogue
-LedgerApiDialogues = BaseLedgerApiDialogues
+
+
+class LedgerApiDialogues(BoundedDialogues, BaseLedgerApiDialogues):
+    """The ledger API dialogues, keeping a bounded number of terminal dialogues."""
 
 
 ContractApiDialogue = BaseContractApiDialogue
-ContractApiDialogues = BaseContractApiDialogues
+
+
+class ContractApiDialogues(BoundedDialogues, BaseContractApiDialogues):
+    """The contract API dialogues, keeping a bounded number of terminal dialogues."""
 
 
 TendermintDialogue = BaseTendermintDialogue
-TendermintDialogues = BaseTendermintDialogues
+
+
+class TendermintDialogues(BoundedDialogues, BaseTendermintDialogues):
+    """The Tendermint dialogues, keeping a bounded number of terminal dialogues."""
 
 
 IpfsDialogue = BaseIpfsDialogue
-IpfsDialogues = BaseIpfsDialogues
+
+
+class IpfsDialogues(BoundedDialogues, BaseIpfsDialogues):
+    """The IPFS dialogues, keeping a bounded number of terminal dialogues."""
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains an estimator of EIP-1559 fees from the ledger's fee history.
+
+The estimator keeps a window of the base fees and the priority fee percentiles of the latest
+blocks, which is refreshed with an `eth_feeHistory` read once every few blocks. The priority fee
+is the configured percentile of the tips of every block, smoothed exponentially over the window.
+The max fee covers the base fee of the next block grown at the maximum rate of EIP-1559, i.e.,
+12.5% per block, for a number of blocks of headroom, so that the transaction is not underpriced
+while it waits to be included.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# the percentiles of the priority fees of every block read from the fee history
+REWARD_PERCENTILES = [10, 25, 50, 75, 90]
+MAX_BASE_FEE_CHANGE = 0.125
+FEE_HISTORY_METHOD = "eth_feeHistory"
+
+
+@dataclass(frozen=True)
+class FeeEstimate:
+    """The EIP-1559 fees of a transaction, in wei."""
+
+    max_fee_per_gas: int
+    max_priority_fee_per_gas: int
+
+
+class FeeEstimator:  # pylint: disable=too-many-instance-attributes
+    """Estimates EIP-1559 fees from a window of the fee history of the latest blocks."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        window: int,
+        refresh_blocks: int,
+        confidence: float,
+        smoothing: float,
+        headroom_blocks: int,
+        min_priority_fee: int,
+    ) -> None:
+        """
+        Initialize the estimator.
+
+        :param window: the number of the latest blocks kept.
+        :param refresh_blocks: the number of blocks after which the fee history is read again.
+        :param confidence: the percentile of the tips of a block which the priority fee targets.
+        :param smoothing: the weight of the newest block in the exponential smoothing of the tips.
+        :param headroom_blocks: the number of consecutive full blocks whose base fee growth the max fee covers.
+        :param min_priority_fee: the minimum priority fee.
+        """
+        if not REWARD_PERCENTILES[0] <= confidence <= REWARD_PERCENTILES[-1]:
+            raise ValueError(
+                f"The confidence needs to be between {REWARD_PERCENTILES[0]} and {REWARD_PERCENTILES[-1]}."
+            )
+        self.window = window
+        self.refresh_blocks = refresh_blocks
+        self.confidence = confidence
+        self.smoothing = smoothing
+        self.headroom_blocks = headroom_blocks
+        self.min_priority_fee = min_priority_fee
+        self.blocks = np.full(window, -1, dtype=np.int64)
+        self.base_fees = np.zeros(window)
+        self.gas_used_ratios = np.zeros(window)
+        self.rewards = np.zeros((window, len(REWARD_PERCENTILES)))
+        self.newest_block: Optional[int] = None
+        self.next_base_fee: Optional[int] = None
+        self.refreshes = 0
+
+    def needs_refresh(self, block_number: Optional[int]) -> bool:
+        """Whether the fee history needs to be read again at the given, possibly unknown, block."""
+        return (
+            self.newest_block is None
+            or block_number is None
+            or block_number - self.newest_block >= self.refresh_blocks
+        )
+
+    def read_params(self, block_number: Optional[int]) -> List[Any]:
+        """Get the params of the `eth_feeHistory` read of the blocks not yet in the window."""
+        block_count = self.window
+        if self.newest_block is not None and block_number is not None:
+            # the given block may be behind the latest, read some more blocks to not leave a gap
+            missing = block_number - self.newest_block + self.refresh_blocks
+            block_count = max(1, min(self.window, missing))
+        return [hex(block_count), "latest", REWARD_PERCENTILES]
+
+    def update(self, fee_history: Dict[str, Any]) -> None:
+        """Add the blocks of an `eth_feeHistory` response to the window, overwriting the oldest ones."""
+        oldest_block = int(fee_history["oldestBlock"], 16)
+        base_fees = [int(fee, 16) for fee in fee_history["baseFeePerGas"]]
+        rewards = fee_history.get("reward") or []
+        gas_used_ratios = fee_history["gasUsedRatio"]
+        for i, ratio in enumerate(gas_used_ratios):
+            block = oldest_block + i
+            if self.newest_block is not None and block <= self.newest_block:
+                continue
+            slot = block % self.window
+            self.blocks[slot] = block
+            self.base_fees[slot] = base_fees[i]
+            self.gas_used_ratios[slot] = ratio
+            self.rewards[slot] = (
+                [int(reward, 16) for reward in rewards[i]] if i < len(rewards) else 0
+            )
+        newest_block = oldest_block + len(gas_used_ratios) - 1
+        if self.newest_block is None or newest_block > self.newest_block:
+            self.newest_block = newest_block
+            # the response ends with the base fee of the block after the newest one
+            self.next_base_fee = base_fees[-1]
+        self.refreshes += 1
+
+    def priority_fee(self) -> Optional[float]:
+        """Get the smoothed priority fee at the confidence percentile, if there are non-empty blocks."""
+        if self.newest_block is None:
+            return None
+        # empty blocks carry no tips, their zero rewards would drag the estimate down
+        ages = self.newest_block - self.blocks
+        kept = (self.blocks >= 0) & (ages < self.window) & (self.gas_used_ratios > 0)
+        if not kept.any():
+            return None
+        tips = np.array(
+            [
+                np.interp(self.confidence, REWARD_PERCENTILES, rewards)
+                for rewards in self.rewards[kept]
+            ]
+        )
+        weights = (1 - self.smoothing) ** ages[kept]
+        return float(np.average(tips, weights=weights))
+
+    def estimate(self) -> Optional[FeeEstimate]:
+        """Estimate the fees of a transaction, if the fee history has been read."""
+        if self.next_base_fee is None:
+            return None
+        priority_fee = max(math.ceil(self.priority_fee() or 0), self.min_priority_fee)
+        max_base_fee = self.next_base_fee * (1 + MAX_BASE_FEE_CHANGE) ** (
+            self.headroom_blocks
+        )
+        return FeeEstimate(
+            max_fee_per_gas=math.ceil(max_base_fee) + priority_fee,
+            max_priority_fee_per_gas=priority_fee,
+        )
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the fixed-point representation of the prices.
+
+The agents agree on a price as an integer, i.e., the price scaled by `10 ** decimals` and rounded
+half to even, so that the agents which aggregate the same quotes propose exactly the same value,
+and the price is compared, encoded and stored as an integer. The conversions work on arrays as
+well as on scalars, so that the prices of many sources or assets are converted at once.
+The state of the online learner is stored in signed fixed point, for the same reason.
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+
+
+MAX_DECIMALS = 18
+# the largest integer of which every smaller one is exactly representable as a float
+MAX_EXACT = 2**53
+
+ArrayLike = Union[float, int, np.ndarray]
+
+
+def _scale(decimals: int) -> int:
+    """Get the scale of a number of decimals."""
+    if not 0 <= decimals <= MAX_DECIMALS:
+        raise ValueError(f"The decimals need to be between 0 and {MAX_DECIMALS}.")
+    return 10**decimals
+
+
+def to_fixed(prices: ArrayLike, decimals: int, signed: bool = False) -> np.ndarray:
+    """
+    Convert prices to fixed point.
+
+    :param prices: the prices, which need to be finite and not negative, unless signed.
+    :param decimals: the number of decimals of the fixed point prices.
+    :param signed: whether negative values are allowed, e.g., for values which are not prices.
+    :return: the fixed point prices, as 64 bit integers.
+    """
+    scaled = np.rint(np.asarray(prices, dtype=np.float64) * _scale(decimals))
+    lowest = 1 - MAX_EXACT if signed else 0
+    if not np.all((scaled >= lowest) & (scaled < MAX_EXACT)):
+        raise ValueError(
+            f"The prices need to be finite, not below {lowest} and below {MAX_EXACT} "
+            f"once scaled by 10 ** {decimals}."
+        )
+    return scaled.astype(np.int64)
+
+
+def to_float(prices: ArrayLike, decimals: int) -> np.ndarray:
+    """Convert fixed point prices to floats."""
+    return np.asarray(prices, dtype=np.int64) / _scale(decimals)
+
+
+def price_to_fixed(price: Optional[float], decimals: int) -> Optional[int]:
+    """Convert a price to fixed point, keeping a missing or invalid price missing."""
+    if price is None:
+        return None
+    try:
+        return int(to_fixed(price, decimals))
+    except ValueError:
+        return None
+
+
+def price_to_float(price: Optional[int], decimals: int) -> Optional[float]:
+    """Convert a fixed point price to a float, keeping a missing price missing."""
+    if price is None:
+        return None
+    return float(to_float(price, decimals))
@@ -19,6 +19,17 @@
 
 """This module contains the handlers for the skill of LearningAbciApp."""
 
+import json
+import threading
+import time
+from typing import Dict, Optional, Tuple, cast
+from urllib.parse import parse_qs, urlparse
+
+from packages.valory.connections.http_server.connection import (
+    PUBLIC_ID as HTTP_SERVER_PUBLIC_ID,
+)
+from packages.valory.protocols.abci import AbciMessage
+from packages.valory.protocols.http.message import HttpMessage
 from packages.valory.skills.abstract_round_abci.handlers import (
     ABCIRoundHandler as BaseABCIRoundHandler,
 )
@@ -40,10 +51,120 @@ from packages.valory.skills.abstract_round_abci.handlers import (
 from packages.valory.skills.abstract_round_abci.handlers import (
     TendermintHandler as BaseTendermintHandler,
 )
+from packages.valory.skills.learning_abci.dialogues import HttpDialogue, HttpDialogues
+from packages.valory.skills.learning_abci.models import SharedState
+from packages.valory.skills.learning_abci.profiler import ProfilerError
+
+
+PROFILE_PATH = "/profile"
+PROFILE_START_PATH = "/profile/start"
+PROFILE_STOP_PATH = "/profile/stop"
+PROFILE_FILE_NAME = "profile.folded"
+DEFAULT_PROFILE_SECONDS = 30.0
+DEFAULT_PROFILE_RATE = 100.0
+
+
+class ABCIHandler(BaseABCIRoundHandler):
+    """The ABCI handler, which records the requests it receives if the recorder is enabled."""
+
+    def handle(self, message: AbciMessage) -> None:
+        """Handle an ABCI request."""
+        recorder = cast(SharedState, self.context.state).abci_recorder
+        if recorder is not None:
+            recorder.record(time.time(), message)
+        super().handle(message)
+
+
+class HttpHandler(BaseHttpHandler):
+    """
+    The HTTP handler.
+
+    Besides the responses to the requests of the skill, it serves the requests of the HTTP server
+    which take a profile of the agent's main loop:
+
+    - `/profile/start?seconds=<seconds>&rate=<samples per second>` starts taking a profile,
+    - `/profile/stop` stops it early,
+    - `/profile` gets the profile, in the collapsed stack format, or its status while it is taken.
+    """
+
+    def handle(self, message: HttpMessage) -> None:
+        """Handle an HTTP message."""
+        if (
+            message.performative != HttpMessage.Performative.REQUEST
+            or message.sender != str(HTTP_SERVER_PUBLIC_ID.without_hash())
+        ):
+            super().handle(message)
+            return
+
+        http_dialogues = cast(HttpDialogues, self.context.http_dialogues)
+        http_dialogue = cast(Optional[HttpDialogue], http_dialogues.update(message))
+        if http_dialogue is None:
+            self.context.logger.error(f"Could not handle the HTTP request {message}.")
+            return
+
+        url = urlparse(message.url)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        status_code, content_type, body = self._handle_profile_request(
+            url.path.rstrip("/"), query
+        )
+        status_text = "OK" if status_code < 300 else "Error"
+        headers = f"Content-Type: {content_type}\n"
+        if content_type == "text/plain":
+            headers += (
+                f"Content-Disposition: attachment; filename={PROFILE_FILE_NAME}\n"
+            )
+        response = http_dialogue.reply(
+            performative=HttpMessage.Performative.RESPONSE,
+            target_message=message,
+            version=message.version,
+            status_code=status_code,
+            status_text=status_text,
+            headers=headers,
+            body=body,
+        )
+        self.context.outbox.put_message(message=response)
+
+    def _handle_profile_request(
+        self, path: str, query: Dict[str, str]
+    ) -> Tuple[int, str, bytes]:
+        """Handle a request of the profiler, returning the status code, the content type and the body of the response."""
+        profiler = cast(SharedState, self.context.state).profiler
+        if profiler is None or path not in (
+            PROFILE_PATH,
+            PROFILE_START_PATH,
+            PROFILE_STOP_PATH,
+        ):
+            return 404, "application/json", self._json({"error": "Not found."})
+
+        if path == PROFILE_START_PATH:
+            try:
+                seconds = float(query.get("seconds", DEFAULT_PROFILE_SECONDS))
+                rate = float(query.get("rate", DEFAULT_PROFILE_RATE))
+                # the handlers run on the main loop of the agent, so this thread is the one to profile
+                profiler.start(threading.get_ident(), seconds, rate)
+            except (ValueError, ProfilerError) as e:
+                return 400, "application/json", self._json({"error": str(e)})
+            self.context.logger.info(
+                f"Taking a profile for {seconds} seconds at {rate} samples per second."
+            )
+            return 202, "application/json", self._json(profiler.status())
+
+        if path == PROFILE_STOP_PATH:
+            profiler.stop()
+            return 200, "application/json", self._json(profiler.status())
+
+        if profiler.running:
+            return 202, "application/json", self._json(profiler.status())
+        if profiler.started_at is None:
+            return 404, "application/json", self._json({"error": "No profile taken."})
+        return 200, "text/plain", profiler.collapsed().encode()
+
+    @staticmethod
+    def _json(data: Dict) -> bytes:
+        """Encode the body of a JSON response."""
+        return json.dumps(data).encode()
 
 
-ABCIHandler = BaseABCIRoundHandler
-HttpHandler = BaseHttpHandler
 SigningHandler = BaseSigningHandler
 LedgerApiHandler = BaseLedgerApiHandler
 ContractApiHandler = BaseContractApiHandler
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the online learner of the decision making of LearningAbciApp.
+
+The learner is a linear regression of the next log return of the price on its lagged
+log returns, fitted with recursive least squares. Every update is a rank-1 update of the
+inverse covariance of the features, so that it costs O(features²), regardless of the
+number of periods seen. The state of the learner is serialized compactly, so that it can
+be agreed on and persisted in the synchronized data.
+
+Every agent updates the learner on its own host, where the floating point results may differ
+in their last bits, e.g., with the order in which its BLAS sums the products. The state is
+therefore quantized to fixed point after every update, and serialized as such, so that such
+differences are rounded away, unless a value falls within them of a rounding boundary.
+"""
+
+import base64
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from packages.valory.skills.learning_abci.fixed_point import (
+    MAX_EXACT,
+    to_fixed,
+    to_float,
+)
+
+
+DTYPE = np.dtype("<f8")
+STATE_DTYPE = np.dtype("<i8")
+STATE_DECIMALS = 9
+# the largest magnitude of a value of the state, which also bounds the windup of the covariance
+MAX_STATE_VALUE = (MAX_EXACT // 2) / 10**STATE_DECIMALS
+# the lags and the number of updates, followed by the prices, the weights and the covariance
+HEADER_SIZE = 2
+
+
+@dataclass
+class OnlineLearner:  # pylint: disable=too-many-instance-attributes
+    """A recursive least squares regression of the next log return on the lagged ones."""
+
+    lags: int
+    forgetting: float
+    weights: np.ndarray
+    covariance: np.ndarray
+    prices: Tuple[float, ...] = ()
+    updates: int = 0
+
+    @property
+    def n_features(self) -> int:
+        """Get the number of features, i.e., the lagged returns and an intercept."""
+        return self.lags + 1
+
+    @classmethod
+    def new(
+        cls, lags: int, forgetting: float, prior_variance: float
+    ) -> "OnlineLearner":
+        """Create an untrained learner."""
+        if lags < 1:
+            raise ValueError("The learner needs at least one lag.")
+        if not 0 < forgetting <= 1:
+            raise ValueError("The forgetting factor needs to be in (0, 1].")
+        n_features = lags + 1
+        return cls(
+            lags=lags,
+            forgetting=forgetting,
+            weights=np.zeros(n_features, dtype=DTYPE),
+            covariance=quantize(np.eye(n_features, dtype=DTYPE) * prior_variance),
+        )
+
+    def features(self) -> Optional[np.ndarray]:
+        """Get the features of the latest prices, if enough prices have been observed."""
+        if len(self.prices) <= self.lags:
+            return None
+        log_prices = np.log(np.asarray(self.prices, dtype=DTYPE))
+        # the most recent return first
+        returns = np.diff(log_prices)[::-1]
+        return np.concatenate(([1.0], returns[: self.lags]))
+
+    def predict(self) -> Optional[float]:
+        """Predict the next log return."""
+        x = self.features()
+        if x is None:
+            return None
+        return float(x @ self.weights)
+
+    def update(self, x: np.ndarray, y: float) -> None:
+        """Update the regression with an observation, using the Sherman-Morrison formula."""
+        px = self.covariance @ x
+        gain = px / (self.forgetting + x @ px)
+        self.weights = quantize(self.weights + gain * (y - x @ self.weights))
+        covariance = (self.covariance - np.outer(gain, px)) / self.forgetting
+        # keep the covariance symmetric, as rounding errors would otherwise accumulate
+        self.covariance = quantize((covariance + covariance.T) / 2)
+        self.updates += 1
+
+    def observe(self, price: Optional[float]) -> bool:
+        """
+        Observe the agreed price of a period.
+
+        :param price: the price, which is ignored if it is missing or not positive.
+        :return: whether the regression was updated.
+        """
+        if price is None or not math.isfinite(price) or price <= 0:
+            return False
+        x = self.features()
+        updated = False
+        if x is not None:
+            self.update(x, math.log(price / self.prices[-1]))
+            updated = True
+        self.prices = (self.prices + (float(quantize(price)),))[-(self.lags + 1) :]
+        return updated
+
+    def state(self) -> np.ndarray:
+        """Get the state of the learner as a fixed point array, storing only the upper triangle of the symmetric covariance."""
+        # the missing prices are stored as zeros, as the observed prices are positive
+        prices = np.zeros(self.lags + 1, dtype=DTYPE)
+        prices[: len(self.prices)] = self.prices
+        values = np.concatenate(
+            (prices, self.weights, self.covariance[np.triu_indices(self.n_features)])
+        )
+        return np.concatenate(
+            (
+                np.array([self.lags, self.updates], dtype=STATE_DTYPE),
+                to_fixed(values, STATE_DECIMALS, signed=True),
+            )
+        )
+
+    @classmethod
+    def from_state(
+        cls,
+        state: np.ndarray,
+        lags: int,
+        forgetting: float,
+        prior_variance: float,
+    ) -> "OnlineLearner":
+        """
+        Get a learner from its state.
+
+        :param state: the state of the learner, which may be empty.
+        :param lags: the configured lags.
+        :param forgetting: the configured forgetting factor.
+        :param prior_variance: the prior variance of the weights of an untrained learner.
+        :return: the learner, or an untrained one if there is no state or it was trained with different lags.
+        """
+        n_features = lags + 1
+        expected_size = (
+            HEADER_SIZE + 2 * n_features + n_features * (n_features + 1) // 2
+        )
+        if state.size != expected_size or int(state[0]) != lags:
+            return cls.new(lags, forgetting, prior_variance)
+
+        values = to_float(state[HEADER_SIZE:], STATE_DECIMALS)
+        prices = values[:n_features]
+        weights = values[n_features : 2 * n_features]
+        covariance = np.zeros((n_features, n_features), dtype=DTYPE)
+        covariance[np.triu_indices(n_features)] = values[2 * n_features :]
+        covariance = covariance + np.triu(covariance, 1).T
+        return cls(
+            lags=lags,
+            forgetting=forgetting,
+            weights=weights,
+            covariance=covariance,
+            prices=tuple(float(price) for price in prices if price > 0),
+            updates=int(state[1]),
+        )
+
+    def serialize(self) -> str:
+        """Serialize the learner."""
+        return base64.b64encode(self.state().tobytes()).decode()
+
+    @classmethod
+    def deserialize(
+        cls,
+        serialized: Optional[str],
+        lags: int,
+        forgetting: float,
+        prior_variance: float,
+    ) -> "OnlineLearner":
+        """Deserialize a learner, or create an untrained one, see `from_state`."""
+        return cls.from_state(
+            decode_state(serialized), lags, forgetting, prior_variance
+        )
+
+
+def quantize(values: Union[float, np.ndarray]) -> np.ndarray:
+    """Round values to the fixed point of the state of a learner, clipping them to its range."""
+    clipped = np.clip(values, -MAX_STATE_VALUE, MAX_STATE_VALUE)
+    return to_float(to_fixed(clipped, STATE_DECIMALS, signed=True), STATE_DECIMALS)
+
+
+def decode_state(serialized: Optional[str]) -> np.ndarray:
+    """Decode the state of a serialized learner, which is empty if there is none."""
+    if not serialized:
+        return np.empty(0, dtype=STATE_DTYPE)
+    return np.frombuffer(base64.b64decode(serialized), dtype=STATE_DTYPE)
+
+
+def observe_and_predict(  # pylint: disable=too-many-arguments
+    state: np.ndarray,
+    price: Optional[float],
+    lags: int,
+    forgetting: float,
+    prior_variance: float,
+) -> Tuple[str, Optional[float], int]:
+    """
+    Update a learner with the agreed price and predict the next log return.
+
+    This is a pure function of the state of the learner, so that it can run in a worker process.
+
+    :param state: the state of the learner, which may be empty.
+    :param price: the agreed price.
+    :param lags: the configured lags.
+    :param forgetting: the configured forgetting factor.
+    :param prior_variance: the prior variance of the weights of an untrained learner.
+    :return: the serialized learner, its prediction and its number of updates.
+    """
+    learner = OnlineLearner.from_state(state, lags, forgetting, prior_variance)
+    learner.observe(price)
+    return learner.serialize(), learner.predict(), learner.updates
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains a batching reader of the ledger's JSON-RPC interface.
+
+Reads are queued and sent together, as a single JSON-RPC batch, when flushed, i.e., once
+per behaviour tick. The batches are sent from a thread of its own, over a pool of keep-alive
+connections, so that neither the requests nor the connection handshakes run on the agent's
+main loop. Every batch also reads the block number, and the results of the reads of the
+latest block are cached until the block number changes.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+
+JSON_RPC_VERSION = "2.0"
+BLOCK_NUMBER_METHOD = "eth_blockNumber"
+LATEST_BLOCK = "latest"
+JOIN_TIMEOUT = 5.0
+# the methods whose results only change from a block to the next, with the index of their block parameter
+BLOCK_SCOPED_METHODS: Dict[str, Optional[int]] = {
+    "eth_call": 1,
+    "eth_gasPrice": None,
+    "eth_getBalance": 1,
+    "eth_getCode": 1,
+    "eth_getStorageAt": 2,
+    "eth_getTransactionCount": 1,
+}
+
+Read = Tuple[str, List[Any], "Future[Any]"]
+
+
+class LedgerReadError(Exception):
+    """Raised when a ledger read fails."""
+
+
+class LedgerCallError(LedgerReadError):
+    """Raised when the ledger answers a read with an error, e.g., when a call reverts."""
+
+    def __init__(self, message: str, error: Any) -> None:
+        """Initialize the error, with the JSON-RPC error of the response."""
+        super().__init__(message, error)
+        self.error = error
+
+    def __str__(self) -> str:
+        """Get the message of the error."""
+        return str(self.args[0])
+
+
+def is_block_scoped(method: str, params: List[Any]) -> bool:
+    """Whether a read is of the latest block, so that its result is valid until the next block."""
+    if method not in BLOCK_SCOPED_METHODS:
+        return False
+    index = BLOCK_SCOPED_METHODS[method]
+    if index is None:
+        return True
+    # a missing block parameter defaults to the latest block
+    return len(params) <= index or params[index] == LATEST_BLOCK
+
+
+class LedgerReader:  # pylint: disable=too-many-instance-attributes
+    """Batches the JSON-RPC reads of a behaviour tick, sending them from a background thread."""
+
+    def __init__(
+        self, url: str, pool_size: int, block_ttl: float, timeout: float
+    ) -> None:
+        """
+        Initialize the reader.
+
+        :param url: the JSON-RPC endpoint of the ledger.
+        :param pool_size: the maximum number of connections kept open to the endpoint.
+        :param block_ttl: the time, in seconds, for which the latest block number is assumed
+            not to have changed, so that the cached results can be served without a request.
+        :param timeout: the timeout of a batch, in seconds.
+        """
+        self.url = url
+        self.pool_size = pool_size
+        self.block_ttl = block_ttl
+        self.timeout = timeout
+        self.block_number: Optional[int] = None
+        self.requests = 0
+        self.reads = 0
+        self.cache_hits = 0
+        self._block_read_at = 0.0
+        self._cache: Dict[Tuple[str, str], Any] = {}
+        self._pending: List[Read] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the reader's thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the reader's thread."""
+        if self.is_running:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="ledger-reader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the reader's thread, closing its connections."""
+        loop, thread = self._loop, self._thread
+        if loop is None or thread is None:
+            return
+        try:
+            if self._session is not None:
+                asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(
+                    JOIN_TIMEOUT
+                )
+        except (FutureTimeoutError, aiohttp.ClientError):
+            # the connections are dropped with the loop anyway
+            pass
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(JOIN_TIMEOUT)
+            if not thread.is_alive():
+                loop.close()
+            self._loop = self._thread = self._session = None
+
+    def read(self, method: str, params: List[Any]) -> "Future[Any]":
+        """Queue a read, serving it from the cache of the latest block if possible."""
+        future: "Future[Any]" = Future()
+        self.reads += 1
+        key = (method, json.dumps(params))
+        with self._lock:
+            block_is_fresh = time.time() - self._block_read_at < self.block_ttl
+            if block_is_fresh and key in self._cache:
+                self.cache_hits += 1
+                future.set_result(self._cache[key])
+                return future
+            self._pending.append((method, params, future))
+        return future
+
+    def flush(self) -> None:
+        """Send the queued reads as a single batch."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        if self._loop is None:
+            error = LedgerReadError("The ledger reader is not running.")
+            for _, _, future in batch:
+                future.set_exception(error)
+            return
+        self.requests += 1
+        asyncio.run_coroutine_threadsafe(self._send(batch), self._loop)
+
+    async def _send(self, batch: List[Read]) -> None:
+        """Send a batch, resolving the futures of its reads."""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        requests = [
+            {"jsonrpc": JSON_RPC_VERSION, "id": 0, "method": BLOCK_NUMBER_METHOD}
+        ] + [
+            {"jsonrpc": JSON_RPC_VERSION, "id": i, "method": method, "params": params}
+            for i, (method, params, _) in enumerate(batch, start=1)
+        ]
+        try:
+            async with self._session.post(self.url, json=requests) as response:
+                response.raise_for_status()
+                responses = await response.json(content_type=None)
+            by_id = {response["id"]: response for response in responses}
+            block_number = int(by_id[0]["result"], 16)
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            ValueError,
+            KeyError,
+            TypeError,
+        ) as e:
+            error = LedgerReadError(f"The batch of {len(batch)} reads failed: {e}")
+            for _, _, future in batch:
+                future.set_exception(error)
+            return
+
+        with self._lock:
+            if block_number != self.block_number:
+                self._cache.clear()
+                self.block_number = block_number
+            self._block_read_at = time.time()
+            for i, (method, params, future) in enumerate(batch, start=1):
+                response = by_id.get(i)
+                if response is None:
+                    future.set_exception(
+                        LedgerReadError(f"{method}{params} got no response")
+                    )
+                    continue
+                if "error" in response:
+                    error = response["error"]
+                    future.set_exception(
+                        LedgerCallError(f"{method}{params} failed: {error}", error)
+                    )
+                    continue
+                result = response.get("result")
+                if is_block_scoped(method, params):
+                    self._cache[(method, json.dumps(params))] = result
+                future.set_result(result)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains a non-blocking, queue-based logging setup for the agent."""
+
+import logging
+import queue
+from enum import Enum
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional, cast
+
+
+AEA_LOGGER_NAME = "aea"
+DEFAULT_BLOCK_TIMEOUT = 0.05
+
+
+class OverflowPolicy(Enum):
+    """What to do with a log record when the queue is full."""
+
+    BLOCK = "block"
+    DROP_NEW = "drop_new"
+    DROP_OLDEST = "drop_oldest"
+
+
+class BoundedQueueHandler(QueueHandler):
+    """A queue handler with bounded buffering, an overflow policy and debug sampling."""
+
+    def __init__(
+        self,
+        queue_: "queue.Queue[logging.LogRecord]",
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        debug_sample_rate: int = 1,
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+    ) -> None:
+        """
+        Initialize the handler.
+
+        :param queue_: the bounded queue shared with the listener.
+        :param overflow_policy: the policy to apply when the queue is full.
+        :param debug_sample_rate: keep one in every `debug_sample_rate` debug records.
+        :param block_timeout: the maximum time to block for, when the policy is `block`.
+        """
+        super().__init__(queue_)
+        self.overflow_policy = overflow_policy
+        self.debug_sample_rate = max(debug_sample_rate, 1)
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.sampled_out = 0
+        self._debug_seen = 0
+        self._unreported_drops = 0
+
+    def _sample(self, record: logging.LogRecord) -> bool:
+        """Whether the record survives the sampling of debug records."""
+        if record.levelno > logging.DEBUG or self.debug_sample_rate == 1:
+            return True
+        self._debug_seen += 1
+        if self._debug_seen % self.debug_sample_rate == 1:
+            return True
+        self.sampled_out += 1
+        return False
+
+    def _put(self, record: logging.LogRecord) -> bool:
+        """Put a record on the queue according to the overflow policy."""
+        if self.overflow_policy == OverflowPolicy.BLOCK:
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                return False
+
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return True
+            except queue.Full:
+                if self.overflow_policy == OverflowPolicy.DROP_NEW:
+                    return False
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:  # pragma: nocover
+                continue
+            self._count_drop()
+
+    def _count_drop(self) -> None:
+        """Count a dropped record."""
+        self.dropped += 1
+        self._unreported_drops += 1
+
+    def _report_drops(self, record: logging.LogRecord) -> None:
+        """Enqueue a warning about records dropped since the last report."""
+        if self._unreported_drops == 0:
+            return
+        warning = logging.makeLogRecord(
+            {
+                "name": record.name,
+                "levelno": logging.WARNING,
+                "levelname": logging.getLevelName(logging.WARNING),
+                "msg": f"Log queue overflow: dropped {self._unreported_drops} record(s).",
+            }
+        )
+        if self._put(warning):
+            self._unreported_drops = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Enqueue a record, without blocking the caller for longer than allowed."""
+        self._report_drops(record)
+        if not self._put(record):
+            self._count_drop()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Emit a record, unless it is sampled out."""
+        if not self._sample(record):
+            return
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:  # pylint: disable=broad-except  # pragma: nocover
+            self.handleError(record)
+
+
+class QueueLogging:
+    """Moves the handlers of a logger behind a queue, served by a background writer thread."""
+
+    def __init__(
+        self,
+        max_size: int,
+        overflow_policy: OverflowPolicy,
+        debug_sample_rate: int,
+        logger_name: str = AEA_LOGGER_NAME,
+    ) -> None:
+        """Initialize the queue logging setup."""
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.debug_sample_rate = debug_sample_rate
+        self.logger_name = logger_name
+        self._handler: Optional[BoundedQueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+        self._handlers: List[logging.Handler] = []
+
+    @property
+    def handler(self) -> Optional[BoundedQueueHandler]:
+        """Get the queue handler, if the setup has been started."""
+        return self._handler
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background writer is running."""
+        return self._listener is not None
+
+    def start(self) -> None:
+        """Swap the logger's handlers for a queue handler and start the writer thread."""
+        logger = logging.getLogger(self.logger_name)
+        handlers = [
+            handler
+            for handler in logger.handlers
+            if not isinstance(handler, QueueHandler)
+        ]
+        if self.is_running or not handlers or len(handlers) != len(logger.handlers):
+            # nothing to move, or the logger is already served by a queue
+            return
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(self.max_size)
+        self._handler = BoundedQueueHandler(
+            log_queue, self.overflow_policy, self.debug_sample_rate
+        )
+        # records below every handler's level would be discarded by the writer anyway
+        self._handler.setLevel(min(handler.level for handler in handlers))
+        self._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(self._handler)
+        self._handlers = handlers
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Flush the queue, stop the writer thread and restore the original handlers."""
+        if self._listener is None or self._handler is None:
+            return
+        logger = logging.getLogger(self.logger_name)
+        logger.removeHandler(self._handler)
+        self._make_room()
+        self._listener.stop()
+        for handler in self._handlers:
+            logger.addHandler(handler)
+            handler.flush()
+        self._listener = None
+        self._handler = None
+        self._handlers = []
+
+    def _make_room(self) -> None:
+        """Make room in the queue for the stop sentinel, writing its oldest records from this thread."""
+        listener = cast(QueueListener, self._listener)
+        log_queue = listener.queue
+        # the handler has been removed, so the queue can only shrink from here on
+        while log_queue.full():
+            try:
+                record = log_queue.get_nowait()
+            except queue.Empty:
+                break
+            listener.handle(record)
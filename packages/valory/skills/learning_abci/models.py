@@ -19,8 +19,14 @@
 
 """This module contains the shared state for the abci skill of LearningAbciApp."""
 
-from typing import Any
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, cast
 
+from aea.exceptions import enforce
+
+from packages.valory.skills.abstract_round_abci.base import get_name
 from packages.valory.skills.abstract_round_abci.models import BaseParams
 from packages.valory.skills.abstract_round_abci.models import (
     BenchmarkTool as BaseBenchmarkTool,
@@ -29,7 +35,45 @@ from packages.valory.skills.abstract_round_abci.models import Requests as BaseRe
 from packages.valory.skills.abstract_round_abci.models import (
     SharedState as BaseSharedState,
 )
-from packages.valory.skills.learning_abci.rounds import LearningAbciApp
+from packages.valory.skills.learning_abci.abci_recording import AbciRecorder
+from packages.valory.skills.learning_abci.chains import Chain, ChainConfig
+from packages.valory.skills.learning_abci.dex_prices import Pool
+from packages.valory.skills.learning_abci.fee_estimator import FeeEstimator
+from packages.valory.skills.learning_abci.ledger_reads import LedgerReader
+from packages.valory.skills.learning_abci.log_queue import OverflowPolicy, QueueLogging
+from packages.valory.skills.learning_abci.price_filter import PriceFilter, Quotes
+from packages.valory.skills.learning_abci.price_stream import PriceStream
+from packages.valory.skills.learning_abci.profiler import SamplingProfiler
+from packages.valory.skills.learning_abci.rate_limiter import RateLimiter
+from packages.valory.skills.learning_abci.rounds import (
+    LearningAbciApp,
+    SynchronizedData,
+)
+from packages.valory.skills.learning_abci.simulation import SimulationCache
+from packages.valory.skills.learning_abci.snapshot import (
+    Snapshot,
+    SnapshotError,
+    SnapshotWriter,
+    load_snapshot,
+)
+from packages.valory.skills.learning_abci.tracing import SpanExporter, Tracer
+from packages.valory.skills.learning_abci.transfers import TransferQueue
+from packages.valory.skills.learning_abci.worker_pool import WorkerPool
+
+
+DEFAULT_TRANSFER_AMOUNT = 1
+DEFAULT_TRANSFER_TTL = 3600
+SNAPSHOT_FILE_NAME = "learning.snapshot"
+TRACE_FILE_NAME = "traces/spans.jsonl"
+RECORDING_DIR = "abci_recordings"
+
+
+@dataclass(frozen=True)
+class PrefetchedQuotes:
+    """Price quotes fetched ahead of the round which needs them."""
+
+    quotes: Quotes
+    fetched_at: float
 
 
 class SharedState(BaseSharedState):
@@ -37,6 +81,216 @@ class SharedState(BaseSharedState):
 
     abci_app_cls = LearningAbciApp
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the state."""
+        super().__init__(*args, **kwargs)
+        self.queue_logging: Optional[QueueLogging] = None
+        self.prefetched_quotes: Optional[PrefetchedQuotes] = None
+        self.price_stream: Optional[PriceStream] = None
+        self.price_filter: Optional[PriceFilter] = None
+        self.proposed_quotes: Quotes = {}
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.ledger_reader: Optional[LedgerReader] = None
+        self.fee_estimator: Optional[FeeEstimator] = None
+        self.simulation_cache: Optional[SimulationCache] = None
+        self.chains: Dict[str, Chain] = {}
+        # the gas params of the transaction settlement, as configured, before any estimate
+        self.configured_gas_params: Optional[
+            Tuple[Optional[int], Optional[int], Optional[int]]
+        ] = None
+        self.snapshot: Optional[Snapshot] = None
+        self.snapshot_writer: Optional[SnapshotWriter] = None
+        self.tracer: Optional[Tracer] = None
+        self.profiler: Optional[SamplingProfiler] = None
+        self.abci_recorder: Optional[AbciRecorder] = None
+        self.worker_pool: Optional[WorkerPool] = None
+
+    def store_prefetched_quotes(self, quotes: Quotes) -> None:
+        """Store prefetched quotes."""
+        self.prefetched_quotes = PrefetchedQuotes(quotes, time.time())
+
+    def pop_prefetched_quotes(self, max_age: float) -> Optional[Quotes]:
+        """Get the prefetched quotes, if they are not older than `max_age` seconds, consuming them."""
+        prefetched, self.prefetched_quotes = self.prefetched_quotes, None
+        if prefetched is None or time.time() - prefetched.fetched_at > max_age:
+            return None
+        return prefetched.quotes
+
+    def setup(self) -> None:
+        """Set up."""
+        super().setup()
+        params = self.context.params
+        self.price_filter = PriceFilter(
+            params.price_quality_window,
+            params.price_outlier_threshold,
+            params.price_quality_min_samples,
+            params.price_quality_floor,
+        )
+        if params.use_snapshots:
+            self.setup_snapshots()
+        if params.use_tracing:
+            exporter = SpanExporter(
+                params.store_path / TRACE_FILE_NAME,
+                self.context.agent_name,
+                params.tracing_queue_size,
+            )
+            exporter.start()
+            self.tracer = Tracer(exporter)
+        if params.use_profiler:
+            self.profiler = SamplingProfiler(params.profiler_max_seconds)
+        if params.use_abci_recorder:
+            self.setup_abci_recorder()
+        if params.use_worker_pool:
+            # the functions run in the workers are those of this skill
+            self.worker_pool = WorkerPool(
+                params.worker_pool_size, Path(__file__).parent
+            )
+        if params.use_rate_limiter:
+            shared_dir = params.rate_limit_shared_dir
+            self.rate_limiter = RateLimiter(
+                params.rate_limit_requests_per_minute,
+                params.rate_limit_burst,
+                Path(shared_dir) if shared_dir else None,
+            )
+        if params.use_ledger_reader:
+            self.ledger_reader = LedgerReader(
+                params.ledger_rpc_url,
+                params.ledger_reader_pool_size,
+                params.ledger_reader_block_ttl,
+                params.ledger_reader_timeout,
+            )
+            self.ledger_reader.start()
+        if params.use_fee_estimator:
+            self.fee_estimator = self.make_fee_estimator()
+        if params.use_tx_simulation:
+            self.simulation_cache = SimulationCache(params.tx_simulation_cache_size)
+        self.setup_chains()
+        if params.use_log_queue:
+            self.queue_logging = QueueLogging(
+                params.log_queue_size,
+                params.log_queue_overflow_policy,
+                params.debug_log_sample_rate,
+            )
+            self.queue_logging.start()
+        if params.use_price_stream:
+            self.price_stream = PriceStream(
+                params.price_stream_url,
+                params.price_stream_window,
+                params.price_stream_queue_size,
+                params.price_stream_reconnect_min,
+                params.price_stream_reconnect_max,
+            )
+            self.price_stream.start()
+
+    def setup_chains(self) -> None:
+        """Set up the chains to settle the transfers on, each with clients of its own."""
+        params = self.context.params
+        # the default chain uses the clients of the skill
+        default_chain = ChainConfig(
+            chain_id=params.default_chain_id,
+            safe_address=params.setup_params.get("safe_contract_address", ""),
+            ledger_rpc_url=params.ledger_rpc_url,
+            multisend_address=params.multisend_address,
+        )
+        self.chains = {
+            default_chain.chain_id: Chain(
+                default_chain,
+                self.ledger_reader,
+                self.fee_estimator,
+                self.simulation_cache,
+            )
+        }
+        for config in params.transfer_chains:
+            if config.chain_id in self.chains:
+                continue
+            chain = Chain(config)
+            if params.use_ledger_reader:
+                chain.ledger_reader = LedgerReader(
+                    config.ledger_rpc_url,
+                    params.ledger_reader_pool_size,
+                    params.ledger_reader_block_ttl,
+                    params.ledger_reader_timeout,
+                )
+                chain.ledger_reader.start()
+            if params.use_fee_estimator:
+                chain.fee_estimator = self.make_fee_estimator()
+            if params.use_tx_simulation:
+                chain.simulation_cache = SimulationCache(
+                    params.tx_simulation_cache_size
+                )
+            self.chains[config.chain_id] = chain
+
+    def make_fee_estimator(self) -> FeeEstimator:
+        """Make a fee estimator."""
+        params = self.context.params
+        return FeeEstimator(
+            params.fee_history_blocks,
+            params.fee_refresh_blocks,
+            params.fee_confidence,
+            params.fee_smoothing,
+            params.fee_headroom_blocks,
+            params.fee_min_priority_fee,
+        )
+
+    def setup_snapshots(self) -> None:
+        """Load the snapshot of the previous run, restoring the local state, and start the snapshot writer."""
+        path = self.context.params.store_path / SNAPSHOT_FILE_NAME
+        try:
+            self.snapshot = load_snapshot(path)
+        except SnapshotError as e:
+            self.context.logger.error(f"Ignoring the snapshot {path}: {e}")
+        if self.snapshot is not None:
+            self.context.logger.info(
+                f"Loaded the snapshot of period {self.snapshot.period} from {path}"
+            )
+            cast(PriceFilter, self.price_filter).restore(self.snapshot.deviations)
+        self.snapshot_writer = SnapshotWriter(path)
+        self.snapshot_writer.start()
+
+    def setup_abci_recorder(self) -> None:
+        """Start recording the ABCI requests, to a new recording of this run of the agent."""
+        started_at = time.time()
+        path = (
+            self.context.params.store_path
+            / RECORDING_DIR
+            / f"{self.context.agent_address}-{int(started_at)}.abci"
+        )
+        self.abci_recorder = AbciRecorder(
+            path,
+            {
+                "agent_address": self.context.agent_address,
+                "skill_id": str(self.context.skill_id),
+                "setup": self.context.params.setup_params,
+                "started_at": started_at,
+            },
+        )
+        self.abci_recorder.start()
+        self.context.logger.info(f"Recording the ABCI requests to {path}")
+
+    def teardown(self) -> None:
+        """Tear down."""
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
+        if self.abci_recorder is not None:
+            self.abci_recorder.stop()
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.stop()
+        if self.tracer is not None:
+            self.tracer.exporter.stop()
+        if self.profiler is not None:
+            self.profiler.stop()
+        if self.price_stream is not None:
+            self.price_stream.stop()
+        for chain in self.chains.values():
+            if chain.ledger_reader is not None:
+                # the reader of the default chain is the skill's, stopping it twice is a no-op
+                chain.ledger_reader.stop()
+        if self.ledger_reader is not None:
+            self.ledger_reader.stop()
+        if self.queue_logging is not None:
+            self.queue_logging.stop()
+        super().teardown()
+
 
 Requests = BaseRequests
 BenchmarkTool = BaseBenchmarkTool
@@ -54,4 +308,135 @@ class Params(BaseParams):
         self.transfer_target_address = self._ensure(
             "transfer_target_address", kwargs, str
         )
+        self.transfer_recipients: List[Dict[str, Any]] = self._ensure(
+            "transfer_recipients", kwargs, List[Dict[str, Any]]
+        )
+        if not self.transfer_recipients:
+            self.transfer_recipients = [
+                {
+                    "address": self.transfer_target_address,
+                    "amount": DEFAULT_TRANSFER_AMOUNT,
+                    "priority": 0,
+                    "ttl": DEFAULT_TRANSFER_TTL,
+                }
+            ]
+        self.transfer_gas_budget = self._ensure("transfer_gas_budget", kwargs, int)
+        self.transfer_base_gas = self._ensure("transfer_base_gas", kwargs, int)
+        self.transfer_gas_per_transfer = self._ensure(
+            "transfer_gas_per_transfer", kwargs, int
+        )
+        self.transfer_queue_max_size = self._ensure(
+            "transfer_queue_max_size", kwargs, int
+        )
+        if not hasattr(self, "multisend_address"):
+            # the chained skill's termination params consume the same key first
+            self.multisend_address = self._ensure("multisend_address", kwargs, str)
+        self.transfer_chains = [
+            ChainConfig.from_config(config, self.multisend_address)
+            for config in self._ensure("transfer_chains", kwargs, List[Dict[str, Any]])
+        ]
+        self.learner_lags = self._ensure("learner_lags", kwargs, int)
+        self.learner_forgetting = self._ensure("learner_forgetting", kwargs, float)
+        self.learner_prior_variance = self._ensure(
+            "learner_prior_variance", kwargs, float
+        )
+        self.learner_min_updates = self._ensure("learner_min_updates", kwargs, int)
+        self.learner_transact_threshold = self._ensure(
+            "learner_transact_threshold", kwargs, float
+        )
+        self.price_sources: List[Dict[str, Any]] = self._ensure(
+            "price_sources", kwargs, List[Dict[str, Any]]
+        )
+        self.price_outlier_threshold = self._ensure(
+            "price_outlier_threshold", kwargs, float
+        )
+        self.price_quality_window = self._ensure("price_quality_window", kwargs, int)
+        self.price_quality_min_samples = self._ensure(
+            "price_quality_min_samples", kwargs, int
+        )
+        self.price_quality_floor = self._ensure("price_quality_floor", kwargs, float)
+        self.dex_pools = [
+            Pool.from_config(pool)
+            for pool in self._ensure("dex_pools", kwargs, List[Dict[str, Any]])
+        ]
+        self.multicall_address = self._ensure("multicall_address", kwargs, str)
+        self.price_max_age = self._ensure("price_max_age", kwargs, float)
+        self.price_decimals = self._ensure("price_decimals", kwargs, int)
+        self.use_ledger_reader = self._ensure("use_ledger_reader", kwargs, bool)
+        self.ledger_rpc_url = self._ensure("ledger_rpc_url", kwargs, str)
+        self.ledger_reader_pool_size = self._ensure(
+            "ledger_reader_pool_size", kwargs, int
+        )
+        self.ledger_reader_block_ttl = self._ensure(
+            "ledger_reader_block_ttl", kwargs, float
+        )
+        self.ledger_reader_timeout = self._ensure(
+            "ledger_reader_timeout", kwargs, float
+        )
+        self.use_fee_estimator = self._ensure("use_fee_estimator", kwargs, bool)
+        self.fee_history_blocks = self._ensure("fee_history_blocks", kwargs, int)
+        self.fee_refresh_blocks = self._ensure("fee_refresh_blocks", kwargs, int)
+        self.fee_confidence = self._ensure("fee_confidence", kwargs, float)
+        self.fee_smoothing = self._ensure("fee_smoothing", kwargs, float)
+        self.fee_headroom_blocks = self._ensure("fee_headroom_blocks", kwargs, int)
+        self.fee_min_priority_fee = self._ensure("fee_min_priority_fee", kwargs, int)
+        self.use_tx_simulation = self._ensure("use_tx_simulation", kwargs, bool)
+        self.tx_simulation_cache_size = self._ensure(
+            "tx_simulation_cache_size", kwargs, int
+        )
+        self.use_snapshots = self._ensure("use_snapshots", kwargs, bool)
+        self.snapshot_interval = self._ensure("snapshot_interval", kwargs, int)
+        self.use_tracing = self._ensure("use_tracing", kwargs, bool)
+        self.tracing_queue_size = self._ensure("tracing_queue_size", kwargs, int)
+        self.use_profiler = self._ensure("use_profiler", kwargs, bool)
+        self.profiler_max_seconds = self._ensure("profiler_max_seconds", kwargs, float)
+        self.use_abci_recorder = self._ensure("use_abci_recorder", kwargs, bool)
+        self.use_worker_pool = self._ensure("use_worker_pool", kwargs, bool)
+        self.worker_pool_size = self._ensure("worker_pool_size", kwargs, int)
+        self.worker_timeout = self._ensure("worker_timeout", kwargs, float)
+        self.use_rate_limiter = self._ensure("use_rate_limiter", kwargs, bool)
+        self.rate_limit_requests_per_minute = self._ensure(
+            "rate_limit_requests_per_minute", kwargs, float
+        )
+        self.rate_limit_burst = self._ensure("rate_limit_burst", kwargs, int)
+        self.rate_limit_shared_dir: Optional[str] = kwargs.get(
+            "rate_limit_shared_dir", None
+        )
+        self.use_price_stream = self._ensure("use_price_stream", kwargs, bool)
+        self.price_stream_url = self._ensure("price_stream_url", kwargs, str)
+        self.price_stream_window = self._ensure("price_stream_window", kwargs, int)
+        self.price_stream_queue_size = self._ensure(
+            "price_stream_queue_size", kwargs, int
+        )
+        self.price_stream_reconnect_min = self._ensure(
+            "price_stream_reconnect_min", kwargs, float
+        )
+        self.price_stream_reconnect_max = self._ensure(
+            "price_stream_reconnect_max", kwargs, float
+        )
+        self.store_path = Path(self._ensure("store_path", kwargs, str))
+        self.use_log_queue = self._ensure("use_log_queue", kwargs, bool)
+        self.log_queue_size = self._ensure("log_queue_size", kwargs, int)
+        self.log_queue_overflow_policy = OverflowPolicy(
+            self._ensure("log_queue_overflow_policy", kwargs, str)
+        )
+        self.debug_log_sample_rate = self._ensure("debug_log_sample_rate", kwargs, int)
         super().__init__(*args, **kwargs)
+
+        # the pending transfers are persisted across periods, so they need an initial value
+        self.setup_params.setdefault(
+            get_name(SynchronizedData.pending_transfers), TransferQueue().serialize()
+        )
+        # so does the state of the learner, which starts untrained
+        self.setup_params.setdefault(get_name(SynchronizedData.learner_state), "")
+
+        chain_ids = {self.default_chain_id}
+        chain_ids.update(chain.chain_id for chain in self.transfer_chains)
+        unknown = {
+            recipient.get("chain_id", self.default_chain_id)
+            for recipient in self.transfer_recipients
+        } - chain_ids
+        enforce(
+            not unknown,
+            f"The transfer recipients use chains which are not configured: {sorted(unknown)}",
+        )
@@ -29,7 +29,8 @@ from packages.valory.skills.abstract_round_abci.base import BaseTxPayload
 class APICheckPayload(BaseTxPayload):
     """Represent a transaction payload for the APICheckRound."""
 
-    price: Optional[float]
+    # the price in fixed point, see `fixed_point`
+    price: Optional[int]
 
 
 @dataclass(frozen=True)
@@ -37,6 +38,7 @@ class DecisionMakingPayload(BaseTxPayload):
     """Represent a transaction payload for the DecisionMakingRound."""
 
     event: str
+    learner_state: Optional[str] = None
 
 
 @dataclass(frozen=True)
@@ -44,4 +46,6 @@ class TxPreparationPayload(BaseTxPayload):
     """Represent a transaction payload for the TxPreparationRound."""
 
     tx_submitter: Optional[str] = None
-    tx_hash: Optional[str] = None
+    # the settlements left to make in the period, see `chains`
+    settlements: Optional[str] = None
+    pending_transfers: Optional[str] = None
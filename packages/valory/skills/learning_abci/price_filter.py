@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the local filtering of the price quotes of an agent.
+
+Every source is scored by how far its quotes have deviated from the prices agreed on
+in the past periods, over a rolling window. Before an agent proposes a price, quotes which
+deviate from a source's usual behaviour or from the other sources are dropped, using
+modified z-scores, i.e., z-scores based on the median absolute deviation (MAD),
+and the rest are averaged, weighted by the quality of their sources.
+"""
+
+import statistics
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+
+# makes the MAD consistent with the standard deviation of normally distributed values
+MAD_SCALE = 0.6745
+MIN_CROSS_SECTION = 3
+
+Quotes = Dict[str, float]
+
+
+def modified_z_score(value: float, samples: Iterable[float], floor: float) -> float:
+    """Get the modified z-score of a value, with the MAD of the samples bounded below by `floor`."""
+    samples = list(samples)
+    median = statistics.median(samples)
+    mad = statistics.median(abs(sample - median) for sample in samples)
+    return MAD_SCALE * (value - median) / max(mad, floor)
+
+
+def weighted_median(quotes: Quotes, weights: Dict[str, float]) -> float:
+    """Get the weighted median of the quotes."""
+    ordered = sorted(quotes.items(), key=lambda item: (item[1], item[0]))
+    half = sum(weights[source] for source in quotes) / 2
+    cumulative = 0.0
+    for source, price in ordered:
+        cumulative += weights[source]
+        if cumulative >= half:
+            return price
+    return ordered[-1][1]  # pragma: nocover
+
+
+class PriceFilter:
+    """Scores the price sources of an agent and filters its quotes."""
+
+    def __init__(
+        self, window: int, threshold: float, min_samples: int, floor: float
+    ) -> None:
+        """
+        Initialize the filter.
+
+        :param window: the number of past deviations kept per source.
+        :param threshold: the modified z-score above which a quote is an outlier.
+        :param min_samples: the number of past deviations needed to score a source.
+        :param floor: the lowest relative deviation taken into account, so that sources
+            which agree perfectly do not get infinite weights or z-scores.
+        """
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.floor = floor
+        self.deviations: Dict[str, Deque[float]] = {}
+
+    def record(self, quotes: Quotes, consensus: Optional[float]) -> None:
+        """Record the relative deviations of the quotes from the agreed price."""
+        if consensus is None or consensus <= 0:
+            return
+        for source, price in quotes.items():
+            samples = self.deviations.setdefault(source, deque(maxlen=self.window))
+            samples.append((price - consensus) / consensus)
+
+    def state(self) -> Dict[str, List[float]]:
+        """Get a copy of the deviations of the sources."""
+        return {source: list(samples) for source, samples in self.deviations.items()}
+
+    def restore(self, deviations: Dict[str, List[float]]) -> None:
+        """Restore the deviations of the sources."""
+        self.deviations = {
+            source: deque(samples, maxlen=self.window)
+            for source, samples in deviations.items()
+        }
+
+    def _scored(self, source: str) -> Optional[Deque[float]]:
+        """Get the deviations of a source, if there are enough of them to score it."""
+        samples = self.deviations.get(source)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        return samples
+
+    def quality(self, source: str) -> Optional[float]:
+        """Get the quality of a source, i.e., the inverse of its median absolute deviation."""
+        samples = self._scored(source)
+        if samples is None:
+            return None
+        return 1 / max(statistics.median(abs(sample) for sample in samples), self.floor)
+
+    def weights(self, sources: Iterable[str]) -> Dict[str, float]:
+        """Get the weights of the sources, giving unscored sources the median quality."""
+        qualities = {source: self.quality(source) for source in sources}
+        known = [quality for quality in qualities.values() if quality is not None]
+        default = statistics.median(known) if known else 1.0
+        return {
+            source: default if quality is None else quality
+            for source, quality in qualities.items()
+        }
+
+    def reject_outliers(self, quotes: Quotes) -> Quotes:
+        """
+        Drop the outlying quotes.
+
+        A quote is compared against the weighted median of the quotes twice: against the
+        usual deviations of its source, if the source has been scored, and against the
+        deviations of the other quotes, corrected for the usual biases of their sources,
+        if there are enough of them.
+
+        :param quotes: the quotes, by source.
+        :return: the quotes which are not outliers.
+        """
+        quotes = {source: price for source, price in quotes.items() if price > 0}
+        if not quotes:
+            return {}
+        reference = weighted_median(quotes, self.weights(quotes))
+        deviations = {
+            source: (price - reference) / reference for source, price in quotes.items()
+        }
+
+        kept = {}
+        for source, price in quotes.items():
+            samples = self._scored(source)
+            if samples is not None:
+                if (
+                    abs(modified_z_score(deviations[source], samples, self.floor))
+                    > self.threshold
+                ):
+                    continue
+                # a consistent bias of a source is not a sign of an outlier
+                deviations[source] -= statistics.median(samples)
+            kept[source] = price
+
+        if len(kept) >= MIN_CROSS_SECTION:
+            cross_section = [deviations[source] for source in kept]
+            kept = {
+                source: price
+                for source, price in kept.items()
+                if abs(modified_z_score(deviations[source], cross_section, self.floor))
+                <= self.threshold
+            }
+        return kept
+
+    def weighted_mean(self, quotes: Quotes) -> Optional[float]:
+        """Average the quotes, weighted by the quality of their sources."""
+        if not quotes:
+            return None
+        weights = self.weights(quotes)
+        total = sum(weights.values())
+        return sum(weights[source] * price for source, price in quotes.items()) / total
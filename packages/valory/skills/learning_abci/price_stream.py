@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains a streaming price feed consumer.
+
+The consumer keeps a WebSocket connection to a price feed open in a thread of its own,
+so that neither the connection nor the parsing of the ticks runs on the agent's main loop.
+Every tick is a JSON object with a `price` and, optionally, a `timestamp`.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+import aiohttp
+
+
+PRICE_KEY = "price"
+TIMESTAMP_KEY = "timestamp"
+HEARTBEAT = 10.0
+JOIN_TIMEOUT = 5.0
+
+Tick = Tuple[float, float]
+
+_logger = logging.getLogger("aea.packages.valory.skills.learning_abci.price_stream")
+
+
+class PriceWindow:
+    """A thread-safe rolling window of the latest ticks."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize the window."""
+        self._ticks: Deque[Tick] = deque(maxlen=size)
+        self._received_at = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, timestamp: float, price: float) -> None:
+        """Add a tick."""
+        with self._lock:
+            self._ticks.append((timestamp, price))
+            self._received_at = time.time()
+
+    def latest(self, max_age: float) -> Optional[float]:
+        """Get the latest price, if it has been received at most `max_age` seconds ago."""
+        with self._lock:
+            if not self._ticks or time.time() - self._received_at > max_age:
+                return None
+            return self._ticks[-1][1]
+
+    def ticks(self) -> List[Tick]:
+        """Get a snapshot of the window, oldest first."""
+        with self._lock:
+            return list(self._ticks)
+
+
+def parse_tick(data: str) -> Tick:
+    """Parse a tick, raising a `ValueError` if it is malformed."""
+    try:
+        tick = json.loads(data)
+        price = float(tick[PRICE_KEY])
+        timestamp = float(tick.get(TIMESTAMP_KEY, time.time()))
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Malformed tick {data!r}: {e}") from e
+    return timestamp, price
+
+
+class PriceStream:  # pylint: disable=too-many-instance-attributes
+    """Consumes a WebSocket price feed in a background thread, reconnecting automatically."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        url: str,
+        window_size: int,
+        queue_size: int,
+        reconnect_min: float,
+        reconnect_max: float,
+    ) -> None:
+        """
+        Initialize the stream.
+
+        :param url: the WebSocket url of the price feed.
+        :param window_size: the number of ticks to keep in the rolling window.
+        :param queue_size: the number of received ticks which may wait to be parsed.
+            When the parser falls behind, the oldest ticks are dropped, as only the latest price matters.
+        :param reconnect_min: the delay before the first reconnection attempt, in seconds.
+        :param reconnect_max: the maximum delay between reconnection attempts, in seconds.
+        """
+        self.url = url
+        self.window = PriceWindow(window_size)
+        self.queue_size = queue_size
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.received = 0
+        self.dropped = 0
+        self.malformed = 0
+        self.reconnections = 0
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the consumer thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start consuming the feed."""
+        if self.is_running:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._stopped = asyncio.Event()
+        self._thread = threading.Thread(
+            target=self._loop.run_until_complete,
+            args=(self._run(),),
+            name="price-stream",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop consuming the feed."""
+        loop, thread, stopped = self._loop, self._thread, self._stopped
+        if loop is None or thread is None or stopped is None:
+            return
+        loop.call_soon_threadsafe(stopped.set)
+        thread.join(JOIN_TIMEOUT)
+        if not thread.is_alive():
+            # otherwise, the loop is still running, and is left to the daemon thread
+            loop.close()
+        self._thread = self._loop = self._stopped = None
+
+    async def _run(self) -> None:
+        """Keep a connection to the feed open, until stopped."""
+        stopped = self._stopped
+        if stopped is None:  # pragma: nocover
+            return
+        delay = self.reconnect_min
+        async with aiohttp.ClientSession() as session:
+            while not stopped.is_set():
+                try:
+                    async with session.ws_connect(
+                        self.url, heartbeat=HEARTBEAT
+                    ) as websocket:
+                        _logger.info(f"Connected to the price feed at {self.url}")
+                        delay = self.reconnect_min
+                        await self._consume(websocket, stopped)
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    _logger.warning(f"Price feed connection failed: {e}")
+                if stopped.is_set():
+                    break
+                self.reconnections += 1
+                # exponential backoff with jitter, so that the agents do not reconnect in lockstep
+                await self._wait(stopped, delay * random.uniform(0.5, 1.0))  # nosec
+                delay = min(delay * 2, self.reconnect_max)
+
+    @staticmethod
+    async def _wait(stopped: asyncio.Event, delay: float) -> None:
+        """Wait for the given delay, unless stopped earlier."""
+        try:
+            await asyncio.wait_for(stopped.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _consume(
+        self, websocket: aiohttp.ClientWebSocketResponse, stopped: asyncio.Event
+    ) -> None:
+        """Receive ticks into a bounded queue and parse them in a separate task."""
+        queue: "asyncio.Queue[str]" = asyncio.Queue(self.queue_size)
+        parser = asyncio.ensure_future(self._parse(queue))
+        stop = asyncio.ensure_future(stopped.wait())
+        try:
+            while True:
+                receive = asyncio.ensure_future(websocket.receive())
+                done, _ = await asyncio.wait(
+                    {receive, stop}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if stop in done:
+                    receive.cancel()
+                    return
+                message = receive.result()
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    # closed, closing or errored, let the caller reconnect
+                    return
+                self.received += 1
+                if queue.full():
+                    queue.get_nowait()
+                    self.dropped += 1
+                queue.put_nowait(message.data)
+        finally:
+            stop.cancel()
+            parser.cancel()
+
+    async def _parse(self, queue: "asyncio.Queue[str]") -> None:
+        """Parse the queued ticks into the window."""
+        while True:
+            data = await queue.get()
+            try:
+                timestamp, price = parse_tick(data)
+            except ValueError as e:
+                self.malformed += 1
+                _logger.debug(str(e))
+                continue
+            self.window.add(timestamp, price)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains a statistical profiler of a thread of the agent.
+
+While a profile is taken, a background thread samples the stack of the profiled thread at a fixed
+rate, and counts the samples of every stack. The profile is rendered in the collapsed stack format,
+i.e., a line per stack with its frames from the outermost to the innermost separated by semicolons,
+followed by its number of samples, which `flamegraph.pl` and speedscope read. No thread runs
+while no profile is taken.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+MAX_RATE = 1000.0
+JOIN_TIMEOUT = 5.0
+
+
+class ProfilerError(ValueError):
+    """Raised when a profile cannot be taken."""
+
+
+class SamplingProfiler:  # pylint: disable=too-many-instance-attributes
+    """Samples the stacks of a thread, for a number of seconds at a time."""
+
+    def __init__(self, max_seconds: float) -> None:
+        """Initialize the profiler."""
+        self.max_seconds = max_seconds
+        self.thread_id: Optional[int] = None
+        self.seconds = 0.0
+        self.rate = 0.0
+        self.started_at: Optional[float] = None
+        self.samples = 0
+        self._stacks: "Counter[str]" = Counter()
+        self._locations: Dict[str, str] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is being taken."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, thread_id: int, seconds: float, rate: float) -> None:
+        """
+        Start taking a profile, discarding the previous one.
+
+        :param thread_id: the id of the thread to profile.
+        :param seconds: the duration of the profile.
+        :param rate: the number of samples per second.
+        """
+        if self.running:
+            raise ProfilerError("A profile is already being taken.")
+        if not 0 < seconds <= self.max_seconds:
+            raise ProfilerError(
+                f"The duration needs to be positive and at most {self.max_seconds} seconds."
+            )
+        if not 0 < rate <= MAX_RATE:
+            raise ProfilerError(
+                f"The rate needs to be positive and at most {MAX_RATE} samples per second."
+            )
+        self.thread_id = thread_id
+        self.seconds = seconds
+        self.rate = rate
+        self.started_at = time.time()
+        self.samples = 0
+        self._stacks.clear()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop taking the profile, keeping the samples taken so far."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join(JOIN_TIMEOUT)
+        self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        """Get the status of the profiler."""
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "rate": self.rate,
+            "samples": self.samples,
+        }
+
+    def collapsed(self) -> str:
+        """Get the profile in the collapsed stack format, the most sampled stacks first."""
+        # the thread appends to the counter while profiling, take a copy of its items
+        stacks = list(self._stacks.items())
+        stacks.sort(key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def _location(self, filename: str) -> str:
+        """Get the location of a file, relative to the entry of the import path which contains it."""
+        location = self._locations.get(filename)
+        if location is None:
+            prefixes = [path for path in sys.path if path and filename.startswith(path)]
+            location = filename[len(max(prefixes, key=len)) :] if prefixes else filename
+            location = self._locations[filename] = location.lstrip("/")
+        return location
+
+    def _sample(self) -> bool:
+        """Sample the stack of the thread, returning whether the thread is still alive."""
+        frame = sys._current_frames().get(  # pylint: disable=protected-access
+            self.thread_id  # type: ignore
+        )
+        if frame is None:
+            return False
+        frames: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{self._location(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        frames.reverse()
+        self._stacks[";".join(frames)] += 1
+        self.samples += 1
+        return True
+
+    def _run(self) -> None:
+        """Sample the thread until the end of the profile."""
+        interval = 1 / self.rate
+        deadline = time.monotonic() + self.seconds
+        next_sample = time.monotonic()
+        while next_sample < deadline and self._sample():
+            next_sample += interval
+            # a late sample is not made up for, so that the rate does not burst
+            next_sample = max(next_sample, time.monotonic())
+            if self._stopped.wait(next_sample - time.monotonic()):
+                return
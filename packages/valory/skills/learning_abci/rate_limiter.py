@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the rate limiting of the outbound requests of an agent.
+
+Requests are rate limited with a token bucket per API key and host. Instead of failing,
+a request reserves the next token, which may drive the bucket into debt, and waits until
+the token is due, so that the requests are served in the order in which they were made.
+The buckets can be kept in files, locked on every reservation, so that the agents running
+on the same machine share them.
+"""
+
+import fcntl
+import hashlib
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+
+BUCKET_FORMAT = "<dd"
+BUCKET_SIZE = struct.calcsize(BUCKET_FORMAT)
+BUCKET_FILE_NAME = "{key}.bucket"
+KEY_PARAMETER_MARKER = "key"
+KEY_DIGEST_LENGTH = 12
+
+
+def bucket_key(url: str) -> str:
+    """Get the key of the bucket of a url, i.e., its host and a digest of any API key in its query."""
+    parsed = urlparse(url)
+    api_keys = sorted(
+        value
+        for name, value in parse_qsl(parsed.query)
+        if KEY_PARAMETER_MARKER in name.lower() and value
+    )
+    if not api_keys:
+        return parsed.netloc
+    digest = hashlib.sha256("&".join(api_keys).encode()).hexdigest()
+    return f"{parsed.netloc}-{digest[:KEY_DIGEST_LENGTH]}"
+
+
+def reserve(
+    tokens: float, updated_at: float, now: float, rate: float, capacity: float
+) -> Tuple[float, float]:
+    """
+    Reserve a token from a bucket.
+
+    :param tokens: the tokens in the bucket, negative if tokens have been reserved ahead.
+    :param updated_at: the time at which the tokens were counted.
+    :param now: the current time.
+    :param rate: the tokens added to the bucket per second.
+    :param capacity: the maximum number of tokens in the bucket.
+    :return: the tokens left in the bucket, and the time to wait for the reserved token.
+    """
+    tokens = min(capacity, tokens + max(now - updated_at, 0) * rate) - 1
+    return tokens, max(-tokens / rate, 0.0)
+
+
+class TokenBucket:
+    """A token bucket, kept in memory."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize the bucket, full."""
+        if rate <= 0 or capacity < 1:
+            raise ValueError(
+                "The rate needs to be positive and the capacity at least 1."
+            )
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserve a token, returning the time to wait for it."""
+        with self._lock:
+            now = time.time()
+            self._tokens, wait = reserve(
+                self._tokens, self._updated_at, now, self.rate, self.capacity
+            )
+            self._updated_at = now
+        return wait
+
+
+class SharedTokenBucket(TokenBucket):
+    """A token bucket, kept in a file shared by the processes of the same machine."""
+
+    def __init__(self, rate: float, capacity: float, path: Path) -> None:
+        """Initialize the bucket."""
+        super().__init__(rate, capacity)
+        self.path = path
+
+    def reserve(self) -> float:
+        """Reserve a token under an exclusive lock of the file, returning the time to wait for it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.pread(fd, BUCKET_SIZE, 0)
+            now = time.time()
+            if len(data) == BUCKET_SIZE:
+                tokens, updated_at = struct.unpack(BUCKET_FORMAT, data)
+            else:
+                tokens, updated_at = self.capacity, now
+            tokens, wait = reserve(tokens, updated_at, now, self.rate, self.capacity)
+            os.pwrite(fd, struct.pack(BUCKET_FORMAT, tokens, now), 0)
+        finally:
+            # closing the file releases the lock
+            os.close(fd)
+        return wait
+
+
+@dataclass
+class WaitStats:
+    """The time the requests of a bucket have waited for tokens."""
+
+    requests: int = 0
+    delayed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def add(self, wait: float) -> None:
+        """Record the wait of a request."""
+        self.requests += 1
+        if wait > 0:
+            self.delayed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    @property
+    def mean_wait(self) -> float:
+        """Get the mean wait of a request."""
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+class RateLimiter:
+    """Keeps a token bucket per API key and host, and the wait statistics of each bucket."""
+
+    def __init__(
+        self, requests_per_minute: float, burst: int, shared_dir: Optional[Path]
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        :param requests_per_minute: the sustained rate of the requests of a bucket.
+        :param burst: the number of requests of a bucket which may be made at once.
+        :param shared_dir: the directory of the buckets shared with the other agents of the machine,
+            or `None` to keep the buckets in memory.
+        """
+        self.rate = requests_per_minute / 60
+        self.burst = burst
+        self.shared_dir = shared_dir
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.stats: Dict[str, WaitStats] = {}
+
+    def _bucket(self, key: str) -> TokenBucket:
+        """Get the bucket of a key, creating it if needed."""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if self.shared_dir is None:
+                bucket = TokenBucket(self.rate, self.burst)
+            else:
+                path = self.shared_dir / BUCKET_FILE_NAME.format(key=key)
+                bucket = SharedTokenBucket(self.rate, self.burst, path)
+            self.buckets[key] = bucket
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Reserve a token for a request to a url, returning the time to wait before making it."""
+        key = bucket_key(url)
+        wait = self._bucket(key).reserve()
+        self.stats.setdefault(key, WaitStats()).add(wait)
+        return wait
@@ -34,6 +34,10 @@ from packages.valory.skills.abstract_round_abci.base import (
     EventToTimeout,
     get_name,
 )
+from packages.valory.skills.learning_abci.chains import (
+    deserialize_settlements,
+    serialize_settlements,
+)
 from packages.valory.skills.learning_abci.payloads import (
     APICheckPayload,
     DecisionMakingPayload,
@@ -47,6 +51,7 @@ class Event(Enum):
     DONE = "done"
     ERROR = "error"
     TRANSACT = "transact"
+    NONE = "none"
     NO_MAJORITY = "no_majority"
     ROUND_TIMEOUT = "round_timeout"
 
@@ -64,8 +69,8 @@ class SynchronizedData(BaseSynchronizedData):
         return CollectionRound.deserialize_collection(serialized)
 
     @property
-    def price(self) -> Optional[float]:
-        """Get the token price."""
+    def price(self) -> Optional[int]:
+        """Get the token price, in fixed point."""
         return self.db.get("price", None)
 
     @property
@@ -73,6 +78,16 @@ class SynchronizedData(BaseSynchronizedData):
         """Get the participants to the price round."""
         return self._get_deserialized("participant_to_price_round")
 
+    @property
+    def learner_state(self) -> Optional[str]:
+        """Get the serialized state of the online learner."""
+        return self.db.get("learner_state", None)
+
+    @property
+    def participant_to_decision_round(self) -> DeserializedCollection:
+        """Get the participants to the decision round."""
+        return self._get_deserialized("participant_to_decision_round")
+
     @property
     def most_voted_tx_hash(self) -> Optional[float]:
         """Get the token most_voted_tx_hash."""
@@ -83,6 +98,21 @@ class SynchronizedData(BaseSynchronizedData):
         """Get the participants to the tx round."""
         return self._get_deserialized("participant_to_tx_round")
 
+    @property
+    def pending_transfers(self) -> Optional[str]:
+        """Get the serialized queue of the pending transfers."""
+        return self.db.get("pending_transfers", None)
+
+    @property
+    def settlements(self) -> Optional[str]:
+        """Get the serialized settlements left to make in the period, if they have been prepared."""
+        return self.db.get("settlements", None)
+
+    @property
+    def chain_id(self) -> Optional[str]:
+        """Get the chain of the settlement being made."""
+        return self.db.get("chain_id", None)
+
     @property
     def tx_submitter(self) -> str:
         """Get the round that submitted a tx to transaction_settlement_abci."""
@@ -107,13 +137,21 @@ class DecisionMakingRound(CollectSameUntilThresholdRound):
 
     payload_class = DecisionMakingPayload
     synchronized_data_class = SynchronizedData
+    collection_key = get_name(SynchronizedData.participant_to_decision_round)
 
     def end_block(self) -> Optional[Tuple[BaseSynchronizedData, Event]]:
         """Process the end of the block."""
 
         if self.threshold_reached:
-            event = Event(self.most_voted_payload)
-            return self.synchronized_data, event
+            event_value, learner_state = self.most_voted_payload_values
+            synchronized_data = self.synchronized_data.update(
+                synchronized_data_class=SynchronizedData,
+                **{
+                    self.collection_key: self.serialized_collection,
+                    get_name(SynchronizedData.learner_state): learner_state,
+                },
+            )
+            return synchronized_data, Event(event_value)
 
         if not self.is_majority_possible(
             self.collection, self.synchronized_data.nb_participants
@@ -130,13 +168,62 @@ class TxPreparationRound(CollectSameUntilThresholdRound):
 
     payload_class = TxPreparationPayload
     synchronized_data_class = SynchronizedData
-    done_event = Event.DONE
-    no_majority_event = Event.NO_MAJORITY
     collection_key = get_name(SynchronizedData.participant_to_tx_round)
-    selection_key = (
-        get_name(SynchronizedData.tx_submitter),
-        get_name(SynchronizedData.most_voted_tx_hash),
-    )
+
+    def end_block(self) -> Optional[Tuple[BaseSynchronizedData, Event]]:
+        """Process the end of the block, moving on to the settlement of the next chain, if any."""
+
+        if self.threshold_reached:
+            (
+                tx_submitter,
+                settlements,
+                pending_transfers,
+            ) = self.most_voted_payload_values
+            data = {
+                self.collection_key: self.serialized_collection,
+                get_name(SynchronizedData.tx_submitter): tx_submitter,
+                get_name(SynchronizedData.pending_transfers): pending_transfers,
+            }
+            remaining = deserialize_settlements(settlements)
+            if not remaining:
+                data[get_name(SynchronizedData.settlements)] = serialize_settlements([])
+                # the next periods start from the safe of the default chain
+                setup_safe = self.synchronized_data.db.setup_data.get(
+                    get_name(SynchronizedData.safe_contract_address)
+                )
+                if setup_safe:
+                    data[get_name(SynchronizedData.safe_contract_address)] = setup_safe[
+                        -1
+                    ]
+                synchronized_data = self.synchronized_data.update(
+                    synchronized_data_class=SynchronizedData, **data
+                )
+                return synchronized_data, Event.NONE
+
+            settlement, *remaining = remaining
+            data.update(
+                {
+                    get_name(SynchronizedData.most_voted_tx_hash): settlement.tx_hash,
+                    get_name(SynchronizedData.chain_id): settlement.chain_id,
+                    get_name(
+                        SynchronizedData.safe_contract_address
+                    ): settlement.safe_address,
+                    get_name(SynchronizedData.settlements): serialize_settlements(
+                        remaining
+                    ),
+                }
+            )
+            synchronized_data = self.synchronized_data.update(
+                synchronized_data_class=SynchronizedData, **data
+            )
+            return synchronized_data, Event.DONE
+
+        if not self.is_majority_possible(
+            self.collection, self.synchronized_data.nb_participants
+        ):
+            return self.synchronized_data, Event.NO_MAJORITY
+
+        return None
 
     # Event.ROUND_TIMEOUT  # this needs to be referenced for static checkers
 
@@ -149,12 +236,17 @@ class FinishedTxPreparationRound(DegenerateRound):
     """FinishedLearningRound"""
 
 
+class FinishedSettlementsRound(DegenerateRound):
+    """FinishedSettlementsRound"""
+
+
 class LearningAbciApp(AbciApp[Event]):
     """LearningAbciApp"""
 
     initial_round_cls: AppState = APICheckRound
     initial_states: Set[AppState] = {
         APICheckRound,
+        TxPreparationRound,
     }
     transition_function: AbciAppTransitionFunction = {
         APICheckRound: {
@@ -173,20 +265,41 @@ class LearningAbciApp(AbciApp[Event]):
             Event.NO_MAJORITY: TxPreparationRound,
             Event.ROUND_TIMEOUT: TxPreparationRound,
             Event.DONE: FinishedTxPreparationRound,
+            Event.NONE: FinishedSettlementsRound,
         },
         FinishedDecisionMakingRound: {},
         FinishedTxPreparationRound: {},
+        FinishedSettlementsRound: {},
     }
     final_states: Set[AppState] = {
         FinishedDecisionMakingRound,
         FinishedTxPreparationRound,
+        FinishedSettlementsRound,
     }
     event_to_timeout: EventToTimeout = {}
-    cross_period_persisted_keys: FrozenSet[str] = frozenset()
+    cross_period_persisted_keys: FrozenSet[str] = frozenset(
+        {
+            get_name(SynchronizedData.pending_transfers),
+            get_name(SynchronizedData.learner_state),
+        }
+    )
     db_pre_conditions: Dict[AppState, Set[str]] = {
         APICheckRound: set(),
+        TxPreparationRound: set(),
     }
     db_post_conditions: Dict[AppState, Set[str]] = {
-        FinishedDecisionMakingRound: set(),
-        FinishedTxPreparationRound: {get_name(SynchronizedData.most_voted_tx_hash)},
+        FinishedDecisionMakingRound: {
+            get_name(SynchronizedData.learner_state),
+        },
+        FinishedTxPreparationRound: {
+            get_name(SynchronizedData.most_voted_tx_hash),
+            get_name(SynchronizedData.chain_id),
+            get_name(SynchronizedData.settlements),
+            get_name(SynchronizedData.pending_transfers),
+            get_name(SynchronizedData.learner_state),
+        },
+        FinishedSettlementsRound: {
+            get_name(SynchronizedData.pending_transfers),
+            get_name(SynchronizedData.learner_state),
+        },
     }
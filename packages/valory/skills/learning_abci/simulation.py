@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the cache of the dry runs of the transfers of the safe.
+
+Before a transaction is proposed, every transfer it makes is simulated with an `eth_call` from
+the safe, at the block at which the safe's nonce was read, so that a transfer which would revert
+is dropped instead of failing the settlement of the whole transaction. The outcome of a call only
+depends on the call, the state of the safe, i.e., its nonce, and the block, so it is cached under
+those, and the transfers which are retried, e.g., when the round is repeated, are not simulated
+again.
+"""
+
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+SIMULATION_METHOD = "eth_call"
+REVERT_MARKER = "revert"
+# the JSON-RPC error code of a reverted execution
+REVERT_ERROR_CODE = 3
+
+SimulationKey = Tuple[str, int, int]
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """The outcome of a dry run."""
+
+    success: bool
+    error: Optional[str] = None
+
+
+def simulation_call(
+    safe: str, target: str, value: int, data: str, gas: int
+) -> Dict[str, str]:
+    """Get the call which simulates a transfer made by the safe."""
+    return {
+        "from": safe,
+        "to": target,
+        "value": hex(value),
+        "data": data,
+        "gas": hex(gas),
+    }
+
+
+def simulation_key(call: Dict[str, str], nonce: int, block: int) -> SimulationKey:
+    """Get the key of the dry run of a call, with the nonce of the safe, at a block."""
+    return json.dumps(call, sort_keys=True), nonce, block
+
+
+def is_revert(error: Any) -> bool:
+    """Whether a JSON-RPC error is a reverted execution, rather than a failure of the node."""
+    if isinstance(error, dict) and error.get("code") == REVERT_ERROR_CODE:
+        return True
+    # the nodes which do not use the code mention the revert in the message or in the data
+    return REVERT_MARKER in json.dumps(error).lower()
+
+
+class SimulationCache:
+    """A bounded cache of the results of the dry runs, evicting the least recently used."""
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize the cache."""
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._results: "OrderedDict[SimulationKey, SimulationResult]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of cached results."""
+        return len(self._results)
+
+    def get(self, key: SimulationKey) -> Optional[SimulationResult]:
+        """Get the cached result of a dry run, if any."""
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def put(self, key: SimulationKey, result: SimulationResult) -> None:
+        """Cache the result of a dry run."""
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
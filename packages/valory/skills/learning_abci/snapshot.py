@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the snapshots of the cross-period state of the skill, for warm restarts.
+
+A snapshot holds the learner and the pending transfers agreed on in a period, and the local
+deviations of the price sources. It is stored in a compact binary file: a header with the period,
+the nonce of the safe at the time of the snapshot and a checksum, followed by a section per part
+of the state, each with its length and checksum. Snapshots are written from a thread of their own,
+to a temporary file which atomically replaces the previous snapshot once synced to the disk,
+so that a crash leaves either the previous or the new snapshot, but never a torn one.
+"""
+
+import logging
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+MAGIC = b"LSNP"
+VERSION = 1
+HEADER_FORMAT = "<4sHqq"
+SECTION_FORMAT = "<II"
+CHECKSUM_FORMAT = "<I"
+SOURCE_FORMAT = "<HI"
+SECTIONS = 3
+NO_NONCE = -1
+TEMPORARY_SUFFIX = ".tmp"
+JOIN_TIMEOUT = 5.0
+
+Deviations = Dict[str, List[float]]
+
+_logger = logging.getLogger("aea.packages.valory.skills.learning_abci.snapshot")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is corrupt or of an unsupported version."""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """The cross-period state of the skill at the start of a period."""
+
+    period: int
+    safe_nonce: Optional[int]
+    learner_state: str
+    pending_transfers: str
+    deviations: Deviations = field(default_factory=dict)
+
+
+def _encode_deviations(deviations: Deviations) -> bytes:
+    """Encode the deviations of the price sources."""
+    chunks = []
+    for source, samples in sorted(deviations.items()):
+        name = source.encode()
+        chunks.append(struct.pack(SOURCE_FORMAT, len(name), len(samples)))
+        chunks.append(name)
+        chunks.append(struct.pack(f"<{len(samples)}d", *samples))
+    return b"".join(chunks)
+
+
+def _decode_deviations(data: bytes) -> Deviations:
+    """Decode the deviations of the price sources."""
+    deviations, offset = {}, 0
+    while offset < len(data):
+        name_size, count = struct.unpack_from(SOURCE_FORMAT, data, offset)
+        offset += struct.calcsize(SOURCE_FORMAT)
+        source = data[offset : offset + name_size].decode()
+        offset += name_size
+        deviations[source] = list(struct.unpack_from(f"<{count}d", data, offset))
+        offset += count * struct.calcsize("<d")
+    return deviations
+
+
+def encode(snapshot: Snapshot) -> bytes:
+    """Encode a snapshot."""
+    safe_nonce = NO_NONCE if snapshot.safe_nonce is None else snapshot.safe_nonce
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, snapshot.period, safe_nonce)
+    chunks = [header, struct.pack(CHECKSUM_FORMAT, zlib.crc32(header))]
+    for section in (
+        snapshot.learner_state.encode(),
+        snapshot.pending_transfers.encode(),
+        _encode_deviations(snapshot.deviations),
+    ):
+        chunks.append(struct.pack(SECTION_FORMAT, len(section), zlib.crc32(section)))
+        chunks.append(section)
+    return b"".join(chunks)
+
+
+def _read(data: bytes, offset: int, size: int) -> Tuple[bytes, int]:
+    """Read a number of bytes, raising if the data is truncated."""
+    if offset + size > len(data):
+        raise SnapshotError("The snapshot is truncated.")
+    return data[offset : offset + size], offset + size
+
+
+def decode(data: bytes) -> Snapshot:
+    """Decode a snapshot, verifying its checksums."""
+    header, offset = _read(data, 0, struct.calcsize(HEADER_FORMAT))
+    magic, version, period, safe_nonce = struct.unpack(HEADER_FORMAT, header)
+    checksum_bytes, offset = _read(data, offset, struct.calcsize(CHECKSUM_FORMAT))
+    (checksum,) = struct.unpack(CHECKSUM_FORMAT, checksum_bytes)
+    if magic != MAGIC or checksum != zlib.crc32(header):
+        raise SnapshotError("The header of the snapshot is corrupt.")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}.")
+
+    sections = []
+    while offset < len(data):
+        section_header, offset = _read(data, offset, struct.calcsize(SECTION_FORMAT))
+        size, checksum = struct.unpack(SECTION_FORMAT, section_header)
+        section, offset = _read(data, offset, size)
+        if zlib.crc32(section) != checksum:
+            raise SnapshotError(f"Section {len(sections)} of the snapshot is corrupt.")
+        sections.append(section)
+    if len(sections) != SECTIONS:
+        raise SnapshotError(
+            f"Expected {SECTIONS} sections in the snapshot, found {len(sections)}."
+        )
+
+    learner_state, pending_transfers, deviations = sections
+    try:
+        return Snapshot(
+            period=period,
+            safe_nonce=None if safe_nonce == NO_NONCE else safe_nonce,
+            learner_state=learner_state.decode(),
+            pending_transfers=pending_transfers.decode(),
+            deviations=_decode_deviations(deviations),
+        )
+    except (UnicodeDecodeError, struct.error) as e:
+        raise SnapshotError(f"The snapshot is malformed: {e}") from e
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    """Write a file, replacing the previous one only once the new one is synced to the disk."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + TEMPORARY_SUFFIX)
+    with open(temporary, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    # sync the directory, so that the replacement survives a crash too
+    directory = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def load_snapshot(path: Path) -> Optional[Snapshot]:
+    """Load the snapshot of a file, if there is one, raising a `SnapshotError` if it is corrupt."""
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return decode(data)
+
+
+class SnapshotWriter:
+    """Writes the latest submitted snapshot from a background thread, skipping the superseded ones."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the writer."""
+        self.path = path
+        self.written = 0
+        self.skipped = 0
+        self.last_error: Optional[Exception] = None
+        self._pending: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the writer's thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="snapshot-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer's thread, writing the pending snapshot first."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._wake_up.set()
+        self._thread.join(JOIN_TIMEOUT)
+        self._thread = None
+
+    def submit(self, snapshot: Snapshot) -> None:
+        """Submit a snapshot to be written, superseding any pending one."""
+        with self._lock:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = snapshot
+        self._wake_up.set()
+
+    def _run(self) -> None:
+        """Write the submitted snapshots until stopped."""
+        while True:
+            self._wake_up.wait()
+            self._wake_up.clear()
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+            if snapshot is not None:
+                try:
+                    write_atomically(self.path, encode(snapshot))
+                    self.written += 1
+                except OSError as e:
+                    self.last_error = e
+                    _logger.error(
+                        f"Could not write the snapshot of period {snapshot.period}: {e}"
+                    )
+            if self._stopped.is_set():
+                return
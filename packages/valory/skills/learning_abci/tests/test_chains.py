@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the chains the transfers are settled on."""
+
+from typing import Optional
+
+import pytest
+
+from packages.valory.skills.learning_abci.chains import (
+    Chain,
+    ChainConfig,
+    Settlement,
+    deserialize_settlements,
+    serialize_settlements,
+)
+
+
+DEFAULT_MULTISEND = "0x" + "00" * 20
+SETTLEMENTS = [
+    Settlement("gnosis", "0x" + "01" * 20, "0x" + "aa" * 32),
+    Settlement("ethereum", "0x" + "02" * 20, "0x" + "bb" * 32),
+]
+
+
+def test_settlements_round_trip() -> None:
+    """The settlements deserialize to themselves, in order."""
+    serialized = serialize_settlements(SETTLEMENTS)
+    assert deserialize_settlements(serialized) == SETTLEMENTS
+    assert deserialize_settlements(serialize_settlements([])) == []
+    reversed_ = serialize_settlements(SETTLEMENTS[::-1])
+    assert deserialize_settlements(reversed_) == SETTLEMENTS[::-1]
+
+
+def test_settlements_deterministic() -> None:
+    """Equal settlements serialize to the same string, so that the agents can agree on it."""
+    copies = [Settlement(*settlement) for settlement in SETTLEMENTS]
+    assert serialize_settlements(copies) == serialize_settlements(SETTLEMENTS)
+    assert serialize_settlements(SETTLEMENTS) != serialize_settlements(
+        SETTLEMENTS[::-1]
+    )
+
+
+@pytest.mark.parametrize("serialized", [None, ""])
+def test_no_settlements(serialized: Optional[str]) -> None:
+    """No serialized settlements are no settlements."""
+    assert deserialize_settlements(serialized) == []
+
+
+def test_chain_config() -> None:
+    """A chain uses the default multisend address, unless it sets its own."""
+    config = {
+        "chain_id": "gnosis",
+        "safe_address": "0x" + "01" * 20,
+        "ledger_rpc_url": "http://localhost:8545",
+    }
+    chain = Chain(ChainConfig.from_config(config, DEFAULT_MULTISEND))
+    assert chain.chain_id == "gnosis"
+    assert chain.config.multisend_address == DEFAULT_MULTISEND
+    multisend = "0x" + "03" * 20
+    own = ChainConfig.from_config({**config, "multisend_address": multisend}, "")
+    assert own.multisend_address == multisend
+    assert chain.ledger_reader is None and chain.simulation_cache is None
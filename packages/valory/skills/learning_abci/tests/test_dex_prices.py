@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the prices of the on-chain AMM pools."""
+
+import math
+from typing import Tuple
+
+import pytest
+
+from packages.valory.skills.learning_abci.dex_prices import (
+    Pool,
+    PoolKind,
+    Q96,
+    SELECTORS,
+    WORD_SIZE,
+    pool_prices,
+)
+
+
+ADDRESS = "0x" + "ab" * 20
+# 2000 USDC per ETH, in a pool of 2M USDC and 1000 ETH
+USDC_DECIMALS, WETH_DECIMALS = 6, 18
+USDC_RESERVE, WETH_RESERVE = 2_000_000 * 10**USDC_DECIMALS, 1000 * 10**WETH_DECIMALS
+
+
+def encode(*words: int) -> str:
+    """Encode the return data of a call, as hex encoded 32 byte words."""
+    return (
+        "0x"
+        + b"".join(
+            (word % 2 ** (8 * WORD_SIZE)).to_bytes(WORD_SIZE, "big") for word in words
+        ).hex()
+    )
+
+
+def make_pool(kind: PoolKind, decimals: Tuple[int, int], invert: bool = False) -> Pool:
+    """Make a pool of the given kind and token decimals."""
+    return Pool("pool", ADDRESS, kind, decimals[0], decimals[1], invert)
+
+
+def sqrt_price_x96(price: float) -> int:
+    """Get the `sqrtPriceX96` of a raw price."""
+    return int(math.sqrt(price) * Q96)
+
+
+def test_from_config() -> None:
+    """A pool is created from its configuration, not inverted by default."""
+    config = {
+        "name": "uniswap_v3",
+        "address": ADDRESS,
+        "kind": "v3",
+        "token0_decimals": "18",
+        "token1_decimals": 6,
+    }
+    pool = Pool.from_config(config)
+    assert pool == Pool("uniswap_v3", ADDRESS, PoolKind.V3, 18, 6)
+    assert pool.call == (ADDRESS, SELECTORS[PoolKind.V3])
+    assert Pool.from_config({**config, "invert": True}).invert
+
+
+def test_v2() -> None:
+    """The price of a V2 pool is the ratio of its reserves, adjusted by the decimals."""
+    # `getReserves` returns the reserves and the timestamp of the last block
+    return_data = encode(USDC_RESERVE, WETH_RESERVE, 1700000000)
+    pool = make_pool(PoolKind.V2, (USDC_DECIMALS, WETH_DECIMALS))
+    assert pool.price(return_data) == pytest.approx(1 / 2000)
+    inverted = make_pool(PoolKind.V2, (USDC_DECIMALS, WETH_DECIMALS), invert=True)
+    assert inverted.price(return_data) == pytest.approx(2000)
+    # the prefix of the return data is optional
+    assert inverted.price(return_data[2:]) == inverted.price(return_data)
+
+
+def test_v3() -> None:
+    """The price of a V3 pool is the square of its `sqrtPriceX96`, adjusted by the decimals."""
+    raw_price = 2000 * 10**USDC_DECIMALS / 10**WETH_DECIMALS
+    # `slot0` returns the price, the tick and the oracle and fee state, the tick may be negative
+    return_data = encode(sqrt_price_x96(raw_price), -200000, 1, 2, 2, 0, 1)
+    pool = make_pool(PoolKind.V3, (WETH_DECIMALS, USDC_DECIMALS))
+    assert pool.price(return_data) == pytest.approx(2000, rel=1e-9)
+    inverted = make_pool(PoolKind.V3, (WETH_DECIMALS, USDC_DECIMALS), invert=True)
+    assert inverted.price(return_data) == pytest.approx(1 / 2000, rel=1e-9)
+    assert make_pool(PoolKind.V3, (0, 0)).price(encode(2 * Q96)) == 4
+
+
+@pytest.mark.parametrize(
+    "kind, return_data",
+    [
+        (PoolKind.V2, "0x"),
+        (PoolKind.V2, encode(USDC_RESERVE)),
+        (PoolKind.V2, encode(0, WETH_RESERVE, 0)),
+        (PoolKind.V2, encode(USDC_RESERVE, 0, 0)),
+        (PoolKind.V2, encode(USDC_RESERVE, WETH_RESERVE)[:-2]),
+        (PoolKind.V3, "0x"),
+        (PoolKind.V3, encode(0, 0, 0)),
+    ],
+)
+def test_no_price(kind: PoolKind, return_data: str) -> None:
+    """Empty pools and truncated return data have no price."""
+    assert make_pool(kind, (18, 18)).price(return_data) is None
+
+
+def test_pool_prices() -> None:
+    """The prices are derived in the order of the pools, and failed calls have no price."""
+    pools = [
+        Pool("v2", ADDRESS, PoolKind.V2, 18, 18),
+        Pool("v3", ADDRESS, PoolKind.V3, 18, 18),
+    ]
+    results = [
+        {"success": True, "return_data": encode(1, 3)},
+        {"success": False, "return_data": "0x"},
+    ]
+    assert pool_prices(pools, results) == {"v2": 3.0, "v3": None}
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the estimator of the EIP-1559 fees."""
+
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from packages.valory.skills.learning_abci.fee_estimator import (
+    FeeEstimate,
+    FeeEstimator,
+    REWARD_PERCENTILES,
+)
+
+
+WINDOW = 4
+
+
+def make_estimator(
+    smoothing: float = 0.0,
+    confidence: float = 50,
+    headroom_blocks: int = 0,
+    min_priority_fee: int = 1,
+) -> FeeEstimator:
+    """Make an estimator with a small window."""
+    return FeeEstimator(
+        WINDOW, 2, confidence, smoothing, headroom_blocks, min_priority_fee
+    )
+
+
+def fee_history(
+    oldest_block: int,
+    gas_used_ratios: List[float],
+    tips: Optional[List[int]] = None,
+    base_fee: int = 1000,
+) -> Dict[str, Any]:
+    """Make an `eth_feeHistory` response, with the same tip at every percentile of a block."""
+    tips = tips if tips is not None else [0] * len(gas_used_ratios)
+    return {
+        "oldestBlock": hex(oldest_block),
+        "baseFeePerGas": [hex(base_fee + i) for i in range(len(gas_used_ratios) + 1)],
+        "gasUsedRatio": gas_used_ratios,
+        "reward": [[hex(tip)] * len(REWARD_PERCENTILES) for tip in tips],
+    }
+
+
+def test_confidence_bounds() -> None:
+    """The confidence needs to be within the percentiles read."""
+    for confidence in (REWARD_PERCENTILES[0] - 1, REWARD_PERCENTILES[-1] + 1):
+        with pytest.raises(ValueError, match="confidence"):
+            make_estimator(confidence=confidence)
+
+
+def test_refresh() -> None:
+    """The fee history is read every few blocks, and only the blocks missing from the window."""
+    estimator = make_estimator()
+    assert estimator.needs_refresh(10)
+    assert estimator.read_params(10) == [hex(WINDOW), "latest", REWARD_PERCENTILES]
+    estimator.update(fee_history(7, [0.5] * 4))
+    assert not estimator.needs_refresh(11)
+    assert estimator.needs_refresh(12)
+    assert estimator.needs_refresh(None)
+    assert estimator.read_params(11) == [hex(3), "latest", REWARD_PERCENTILES]
+    assert estimator.read_params(100) == [hex(WINDOW), "latest", REWARD_PERCENTILES]
+
+
+def test_ring_buffer_overwrite() -> None:
+    """The newest blocks overwrite the oldest ones, and the blocks already kept are not rewritten."""
+    estimator = make_estimator()
+    estimator.update(fee_history(10, [0.5] * 4, [1, 2, 3, 4]))
+    assert sorted(estimator.blocks.tolist()) == [10, 11, 12, 13]
+
+    # block 13 is read again with another tip, which is ignored
+    estimator.update(fee_history(13, [0.5] * 3, [99, 5, 6], base_fee=2000))
+    assert sorted(estimator.blocks.tolist()) == [12, 13, 14, 15]
+    assert estimator.newest_block == 15
+    assert estimator.next_base_fee == 2003
+    tips = {
+        block: estimator.rewards[block % WINDOW][0]
+        for block in estimator.blocks.tolist()
+    }
+    assert tips == {12: 3, 13: 4, 14: 5, 15: 6}
+    assert estimator.refreshes == 2
+
+
+def test_stale_response() -> None:
+    """A response older than the window does not move the newest block back."""
+    estimator = make_estimator()
+    estimator.update(fee_history(10, [0.5] * 4, [1, 2, 3, 4]))
+    estimator.update(fee_history(8, [0.5] * 2, [7, 8], base_fee=5000))
+    assert estimator.newest_block == 13
+    assert estimator.next_base_fee == 1004
+    assert estimator.priority_fee() == 2.5
+
+
+def test_empty_block_exclusion() -> None:
+    """Empty blocks are left out of the priority fee, which is unknown if all blocks are empty."""
+    estimator = make_estimator()
+    estimator.update(fee_history(10, [0.5, 0.0, 0.5, 0.0], [10, 0, 20, 0]))
+    assert estimator.priority_fee() == 15
+
+    estimator = make_estimator(min_priority_fee=7)
+    estimator.update(fee_history(10, [0.0] * 4))
+    assert estimator.priority_fee() is None
+    assert estimator.estimate() == FeeEstimate(1004 + 7, 7)
+
+
+def test_smoothing() -> None:
+    """The tips of the older blocks weigh exponentially less."""
+    estimator = make_estimator(smoothing=0.5)
+    estimator.update(fee_history(10, [0.5, 0.5], [100, 200]))
+    assert estimator.priority_fee() == pytest.approx((0.5 * 100 + 200) / 1.5)
+
+
+def test_confidence_interpolation() -> None:
+    """The tip at the confidence is interpolated between the percentiles read."""
+    estimator = make_estimator(confidence=60)
+    history = fee_history(10, [0.5])
+    history["reward"] = [[hex(tip) for tip in (10, 20, 30, 80, 90)]]
+    estimator.update(history)
+    assert estimator.priority_fee() == pytest.approx(30 + (80 - 30) * 10 / 25)
+
+
+@pytest.mark.parametrize(
+    "headroom_blocks, max_base_fee",
+    [(0, 1000), (1, 1125), (2, 1266), (3, 1424)],
+)
+def test_headroom(headroom_blocks: int, max_base_fee: int) -> None:
+    """The max fee covers the base fee growing by 12.5% for every block of headroom, rounded up."""
+    estimator = make_estimator(headroom_blocks=headroom_blocks)
+    assert estimator.estimate() is None
+    history = fee_history(10, [1.0], [40])
+    history["baseFeePerGas"] = [hex(900), hex(1000)]
+    estimator.update(history)
+    assert estimator.estimate() == FeeEstimate(max_base_fee + 40, 40)
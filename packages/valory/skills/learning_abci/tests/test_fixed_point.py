@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the fixed-point representation of the prices."""
+
+import math
+
+import numpy as np
+import pytest
+
+from packages.valory.skills.learning_abci.fixed_point import (
+    MAX_DECIMALS,
+    MAX_EXACT,
+    price_to_fixed,
+    price_to_float,
+    to_fixed,
+    to_float,
+)
+
+
+@pytest.mark.parametrize("decimals", [0, 2, 8, MAX_DECIMALS])
+def test_round_trip(decimals: int) -> None:
+    """A fixed point price converts back to itself, and to the nearest float of its price."""
+    for fixed in (0, 1, 123456789, MAX_EXACT - 1):
+        price = price_to_float(fixed, decimals)
+        assert price is not None
+        assert price_to_fixed(price, decimals) == fixed
+
+
+def test_rounding() -> None:
+    """Prices are rounded half to even, so that the agents agree on the same integer."""
+    assert to_fixed([0.5, 1.5, 2.5, 1.234], 0).tolist() == [0, 2, 2, 1]
+    assert price_to_fixed(12.3456, 2) == 1235
+
+
+def test_arrays() -> None:
+    """Arrays are converted element by element, to 64 bit integers."""
+    prices = np.array([1.0, 2.25, 1234.5678])
+    fixed = to_fixed(prices, 4)
+    assert fixed.dtype == np.int64
+    assert fixed.tolist() == [10000, 22500, 12345678]
+    np.testing.assert_array_equal(to_float(fixed, 4), prices)
+
+
+@pytest.mark.parametrize("price", [-1.0, math.nan, math.inf, MAX_EXACT])
+def test_invalid_prices(price: float) -> None:
+    """Negative, not finite or too large prices are rejected, and missing from the scalar conversion."""
+    with pytest.raises(ValueError):
+        to_fixed(price, 0)
+    assert price_to_fixed(price, 0) is None
+
+
+def test_invalid_decimals() -> None:
+    """The decimals need to be within bounds."""
+    for decimals in (-1, MAX_DECIMALS + 1):
+        with pytest.raises(ValueError):
+            to_fixed(1.0, decimals)
+        with pytest.raises(ValueError):
+            to_float(1, decimals)
+
+
+def test_missing_price() -> None:
+    """A missing price stays missing."""
+    assert price_to_fixed(None, 2) is None
+    assert price_to_float(None, 2) is None
+
+
+def test_signed() -> None:
+    """Negative values are converted if signed, within the same bounds."""
+    assert to_fixed([-1.5, 2.25], 2, signed=True).tolist() == [-150, 225]
+    with pytest.raises(ValueError):
+        to_fixed(-MAX_EXACT, 0, signed=True)
+    with pytest.raises(ValueError):
+        to_fixed(math.nan, 0, signed=True)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the online learner of the decision making."""
+
+import base64
+import copy
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from packages.valory.skills.learning_abci.learner import (
+    MAX_STATE_VALUE,
+    OnlineLearner,
+    decode_state,
+    observe_and_predict,
+    quantize,
+)
+
+
+LAGS = 3
+FORGETTING = 0.99
+PRIOR_VARIANCE = 1000.0
+
+
+def train(periods: int = 50, seed: int = 1) -> OnlineLearner:
+    """Train a learner on a random walk of the price."""
+    rng = np.random.default_rng(seed)
+    learner = OnlineLearner.new(LAGS, FORGETTING, PRIOR_VARIANCE)
+    for price in 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods))):
+        learner.observe(float(price))
+    return learner
+
+
+def reordered_update(
+    learner: OnlineLearner, x: np.ndarray, y: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute the update of a learner in another order, as another host may, without quantizing it."""
+    covariance, weights, forgetting = (
+        learner.covariance,
+        learner.weights,
+        learner.forgetting,
+    )
+    n = len(x)
+    px = np.array(
+        [sum(covariance[i, j] * x[j] for j in reversed(range(n))) for i in range(n)]
+    )
+    gain = px * (1 / (forgetting + sum(x * px)))
+    updated = weights + gain * y - gain * (x @ weights)
+    covariance = covariance / forgetting - np.outer(gain, px) / forgetting
+    return updated, (covariance + covariance.T) / 2
+
+
+def test_equivalent_updates_serialize_identically() -> None:
+    """Updates which differ in their last bits, with the order of their operations, are agreed on."""
+    learner = train()
+    x = learner.features()
+    assert x is not None
+    y = 0.004
+
+    updated = copy.deepcopy(learner)
+    updated.update(x, y)
+
+    weights, covariance = reordered_update(learner, x, y)
+    px = learner.covariance @ x
+    gain = px / (learner.forgetting + x @ px)
+    # the premise: the floating point results differ
+    assert not np.array_equal(
+        weights, learner.weights + gain * (y - x @ learner.weights)
+    )
+
+    reordered = copy.deepcopy(learner)
+    reordered.weights, reordered.covariance = quantize(weights), quantize(covariance)
+    reordered.updates += 1
+    assert reordered.serialize() == updated.serialize()
+
+
+def test_perturbed_state_serializes_identically() -> None:
+    """A state which differs in its last bits converges to the same serialized state."""
+    learner = train()
+    perturbed = copy.deepcopy(learner)
+    perturbed.weights = np.nextafter(perturbed.weights, np.inf)
+    perturbed.covariance = np.nextafter(perturbed.covariance, -np.inf)
+    for agent in (learner, perturbed):
+        agent.observe(101.0)
+    assert perturbed.serialize() == learner.serialize()
+
+
+def test_serialization() -> None:
+    """A learner survives a round trip through its serialization, which is stable."""
+    learner = train()
+    serialized = learner.serialize()
+    restored = OnlineLearner.deserialize(serialized, LAGS, FORGETTING, PRIOR_VARIANCE)
+    assert restored.serialize() == serialized
+    assert restored.prices == learner.prices
+    assert restored.updates == learner.updates
+    np.testing.assert_array_equal(restored.weights, learner.weights)
+    np.testing.assert_array_equal(restored.covariance, learner.covariance)
+
+    # and so does the prediction of the worker process
+    state, prediction, updates = observe_and_predict(
+        decode_state(serialized), 102.0, LAGS, FORGETTING, PRIOR_VARIANCE
+    )
+    learner.observe(102.0)
+    assert (state, prediction, updates) == (
+        learner.serialize(),
+        learner.predict(),
+        learner.updates,
+    )
+
+
+def test_untrained_learner() -> None:
+    """A missing, differently configured or floating point state gives an untrained learner."""
+    untrained = OnlineLearner.new(LAGS, FORGETTING, PRIOR_VARIANCE).serialize()
+    learner = train()
+    legacy = base64.b64encode(learner.state().astype("<f8").tobytes()).decode()
+    for serialized in (None, "", legacy):
+        restored = OnlineLearner.deserialize(
+            serialized, LAGS, FORGETTING, PRIOR_VARIANCE
+        )
+        assert restored.serialize() == untrained
+    restored = OnlineLearner.deserialize(
+        learner.serialize(), LAGS + 1, FORGETTING, PRIOR_VARIANCE
+    )
+    assert restored.updates == 0
+
+
+def test_observe() -> None:
+    """Invalid prices are ignored, and the regression is updated once enough prices are seen."""
+    learner = OnlineLearner.new(LAGS, FORGETTING, PRIOR_VARIANCE)
+    for price in (None, 0.0, -1.0, float("nan"), float("inf")):
+        assert not learner.observe(price)
+    assert learner.prices == ()
+    updated = [learner.observe(100.0 + i) for i in range(LAGS + 3)]
+    assert updated == [False] * (LAGS + 1) + [True] * 2
+    assert learner.updates == 2
+    assert learner.predict() is not None
+
+
+def test_quantize() -> None:
+    """Values are rounded to the fixed point of the state, and clipped to its range."""
+    assert quantize(np.array([0.1234567891234, -2.0])).tolist() == [
+        0.123456789,
+        -2.0,
+    ]
+    assert quantize(np.array([1e300, -1e300])).tolist() == [
+        pytest.approx(MAX_STATE_VALUE),
+        pytest.approx(-MAX_STATE_VALUE),
+    ]
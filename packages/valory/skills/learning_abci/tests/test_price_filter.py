@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the filtering of the price quotes."""
+
+from typing import Dict, List
+
+import pytest
+
+from packages.valory.skills.learning_abci.price_filter import (
+    MAD_SCALE,
+    PriceFilter,
+    modified_z_score,
+    weighted_median,
+)
+
+
+WINDOW = 5
+THRESHOLD = 3.5
+MIN_SAMPLES = 3
+FLOOR = 0.001
+
+
+def make_filter(deviations: Dict[str, List[float]]) -> PriceFilter:
+    """Make a filter with the given past deviations of the sources."""
+    price_filter = PriceFilter(WINDOW, THRESHOLD, MIN_SAMPLES, FLOOR)
+    price_filter.restore(deviations)
+    return price_filter
+
+
+def test_modified_z_score() -> None:
+    """The z-score is scaled by the MAD of the samples, bounded below by the floor."""
+    assert modified_z_score(4, [1, 2, 3, 4, 5], FLOOR) == pytest.approx(MAD_SCALE)
+    assert modified_z_score(1.1, [1, 1, 1], FLOOR) == pytest.approx(
+        MAD_SCALE * 0.1 / FLOOR
+    )
+
+
+def test_weighted_median() -> None:
+    """The weighted median is the first price at which half of the weight is reached."""
+    quotes = {"a": 1.0, "b": 2.0, "c": 3.0}
+    assert weighted_median(quotes, {"a": 1, "b": 1, "c": 1}) == 2.0
+    assert weighted_median(quotes, {"a": 1, "b": 1, "c": 10}) == 3.0
+    assert weighted_median(quotes, {"a": 2, "b": 1, "c": 1}) == 1.0
+
+
+def test_record() -> None:
+    """The relative deviations are recorded over a rolling window, if there is a consensus."""
+    price_filter = make_filter({})
+    price_filter.record({"a": 110.0}, None)
+    price_filter.record({"a": 110.0}, 0)
+    assert price_filter.state() == {}
+    for _ in range(WINDOW + 2):
+        price_filter.record({"a": 110.0, "b": 90.0}, 100.0)
+    state = price_filter.state()
+    assert state["a"] == pytest.approx([0.1] * WINDOW)
+    assert state["b"] == pytest.approx([-0.1] * WINDOW)
+    assert make_filter(state).state() == state
+
+
+def test_weights() -> None:
+    """The sources are weighted by their quality, and unscored ones by the median quality."""
+    price_filter = make_filter(
+        {"a": [0.01] * 3, "b": [-0.1] * 3, "c": [0.0] * 3, "d": [0.5] * 2}
+    )
+    assert price_filter.weights(["a", "b", "c", "d"]) == pytest.approx(
+        {"a": 100, "b": 10, "c": 1 / FLOOR, "d": 100}
+    )
+    assert make_filter({}).weights(["a", "b"]) == {"a": 1.0, "b": 1.0}
+
+
+def test_reject_cross_section_outlier() -> None:
+    """A quote far from the others is dropped, even if its source has not been scored."""
+    price_filter = make_filter({})
+    quotes = {"a": 99.0, "b": 100.0, "c": 101.0, "d": 150.0}
+    assert price_filter.reject_outliers(quotes) == {"a": 99.0, "b": 100.0, "c": 101.0}
+    # too few quotes to tell which one is the outlier
+    assert price_filter.reject_outliers({"a": 100.0, "d": 150.0}) == {
+        "a": 100.0,
+        "d": 150.0,
+    }
+
+
+def test_reject_source_outlier() -> None:
+    """A quote far from the usual deviations of its source is dropped, and a usual bias is not."""
+    quotes = {"a": 100.0, "b": 100.0, "c": 100.0, "biased": 110.0}
+    assert "biased" not in make_filter({}).reject_outliers(quotes)
+    biased = make_filter({"biased": [0.1] * 3})
+    assert biased.reject_outliers(quotes) == quotes
+    erratic = make_filter({"biased": [-0.1] * 3})
+    assert erratic.reject_outliers({"a": 100.0, "biased": 110.0}) == {"a": 100.0}
+
+
+def test_reject_non_positive() -> None:
+    """Quotes which are not positive are dropped."""
+    price_filter = make_filter({})
+    assert price_filter.reject_outliers({"a": 0.0, "b": -1.0, "c": 1.0}) == {"c": 1.0}
+    assert price_filter.reject_outliers({"a": 0.0}) == {}
+    assert price_filter.reject_outliers({}) == {}
+
+
+def test_reject_all() -> None:
+    """Every quote is dropped if each one deviates from the usual behaviour of its source."""
+    price_filter = make_filter({"a": [0.1] * 3, "b": [-0.1] * 3})
+    assert price_filter.reject_outliers({"a": 100.0, "b": 100.0}) == {}
+    assert price_filter.weighted_mean({}) is None
+
+
+def test_weighted_mean() -> None:
+    """The quotes are averaged, weighted by the quality of their sources."""
+    price_filter = make_filter({"a": [0.001] * 3, "b": [0.1] * 3})
+    assert price_filter.weighted_mean({"a": 100.0, "b": 200.0}) == pytest.approx(
+        (1000 * 100 + 10 * 200) / 1010
+    )
+    assert price_filter.weighted_mean({"c": 100.0, "d": 200.0}) == 150.0
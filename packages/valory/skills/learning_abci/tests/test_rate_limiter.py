@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the rate limiting of the outbound requests."""
+
+import multiprocessing
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from packages.valory.skills.learning_abci import rate_limiter
+from packages.valory.skills.learning_abci.rate_limiter import (
+    BUCKET_FILE_NAME,
+    RateLimiter,
+    SharedTokenBucket,
+    TokenBucket,
+    bucket_key,
+    reserve,
+)
+
+
+# a token every ten days, so that the buckets do not refill while the processes run
+SLOW_RATE = 1e-6
+PROCESSES = 4
+RESERVATIONS = 5
+
+
+class Clock:
+    """A clock which only moves when told to."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now = 1000.0
+
+    def time(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    """Replace the clock of the rate limiter."""
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+def reserve_shared(path: Path) -> List[float]:
+    """Reserve some tokens of a shared bucket, from a process of its own."""
+    bucket = SharedTokenBucket(SLOW_RATE, 1, path)
+    return [bucket.reserve() for _ in range(RESERVATIONS)]
+
+
+def test_reserve() -> None:
+    """A reservation takes a token, refilled at the rate up to the capacity, and waits for it if in debt."""
+    assert reserve(2, 0, 0, 1, 2) == (1, 0)
+    assert reserve(0, 0, 0, 2, 2) == (-1, 0.5)
+    assert reserve(-1, 0, 0, 2, 2) == (-2, 1)
+    assert reserve(-1, 0, 10, 2, 2) == (1, 0)
+    # a clock going back does not take tokens away
+    assert reserve(1, 10, 0, 2, 2) == (0, 0)
+
+
+def test_invalid_bucket() -> None:
+    """The rate needs to be positive and the capacity at least one token."""
+    for rate, capacity in ((0, 1), (-1, 1), (1, 0.5)):
+        with pytest.raises(ValueError):
+            TokenBucket(rate, capacity)
+
+
+def test_debt_and_ordering(clock: Clock) -> None:
+    """The burst is served at once, and the next requests wait in the order they were made."""
+    bucket = TokenBucket(2, 2)
+    assert [bucket.reserve() for _ in range(5)] == [0, 0, 0.5, 1, 1.5]
+    # the debt is paid back before the bucket refills
+    clock.now += 1
+    assert bucket.reserve() == 1
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0.5]
+
+
+def test_shared_bucket(tmp_path: Path, clock: Clock) -> None:
+    """The buckets of the same file share their tokens, and a missing or short file is a full bucket."""
+    path = tmp_path / "buckets" / "host.bucket"
+    first, second = SharedTokenBucket(1, 2, path), SharedTokenBucket(1, 2, path)
+    assert [first.reserve(), second.reserve(), first.reserve()] == [0, 0, 1]
+    assert second.reserve() == 2
+    path.write_bytes(b"\0")
+    assert second.reserve() == 0
+    clock.now += 2
+    assert first.reserve() == 0
+
+
+def test_shared_bucket_across_processes(tmp_path: Path) -> None:
+    """The processes reserve distinct tokens of a shared bucket, in the order they are served."""
+    path = tmp_path / "host.bucket"
+    with multiprocessing.Pool(PROCESSES) as pool:
+        results = pool.map(reserve_shared, [path] * PROCESSES)
+    for waits in results:
+        assert waits == sorted(waits)
+    waits = sorted(wait for result in results for wait in result)
+    tokens = [round(wait * SLOW_RATE) for wait in waits]
+    assert tokens == list(range(PROCESSES * RESERVATIONS))
+
+
+def test_bucket_key() -> None:
+    """Requests share a bucket by host and by API key, whatever the order of the parameters."""
+    assert bucket_key("https://api.example.com/price?ids=olas") == "api.example.com"
+    keyed = bucket_key("https://api.example.com/price?x_api_key=secret&apiKey=other")
+    assert keyed.startswith("api.example.com-")
+    assert "secret" not in keyed
+    assert keyed == bucket_key(
+        "https://api.example.com/other?apiKey=other&x_api_key=secret"
+    )
+    assert keyed != bucket_key("https://api.example.com/price?apiKey=secret")
+
+
+def test_rate_limiter(tmp_path: Path, clock: Clock) -> None:
+    """The limiter keeps a bucket and the wait statistics per key, shared through files if configured."""
+    limiter = RateLimiter(60, 1, None)
+    waits = [limiter.reserve("https://a.com/price") for _ in range(3)]
+    assert waits == [0, 1, 2]
+    assert limiter.reserve("https://b.com/price") == 0
+    stats = limiter.stats["a.com"]
+    assert (stats.requests, stats.delayed, stats.max_wait) == (3, 2, 2)
+    assert stats.mean_wait == 1
+    assert limiter.stats["b.com"].mean_wait == 0
+
+    shared = RateLimiter(60, 1, tmp_path)
+    assert shared.reserve("https://a.com/price") == 0
+    assert isinstance(shared.buckets["a.com"], SharedTokenBucket)
+    assert (tmp_path / BUCKET_FILE_NAME.format(key="a.com")).exists()
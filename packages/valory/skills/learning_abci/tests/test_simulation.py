@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the cache of the dry runs of the transfers."""
+
+from typing import Any
+
+import pytest
+
+from packages.valory.skills.learning_abci.simulation import (
+    REVERT_ERROR_CODE,
+    SimulationCache,
+    SimulationResult,
+    is_revert,
+    simulation_call,
+    simulation_key,
+)
+
+
+SAFE = "0x" + "5a" * 20
+TARGET = "0x" + "7a" * 20
+CALL = simulation_call(SAFE, TARGET, 10**18, "0x", 21000)
+SUCCESS = SimulationResult(success=True)
+REVERT = SimulationResult(success=False, error="execution reverted")
+
+
+def test_simulation_call() -> None:
+    """The call is made from the safe, with the value and the gas hex encoded."""
+    assert CALL == {
+        "from": SAFE,
+        "to": TARGET,
+        "value": "0xde0b6b3a7640000",
+        "data": "0x",
+        "gas": "0x5208",
+    }
+
+
+def test_simulation_key() -> None:
+    """The key of a call does not depend on the order of its fields, but on the nonce and the block."""
+    key = simulation_key(CALL, 1, 100)
+    assert key == simulation_key(dict(reversed(list(CALL.items()))), 1, 100)
+    assert key != simulation_key(CALL, 2, 100)
+    assert key != simulation_key(CALL, 1, 101)
+    assert key != simulation_key({**CALL, "value": hex(1)}, 1, 100)
+
+
+def test_cache() -> None:
+    """The results are cached, counting the hits and the misses."""
+    cache = SimulationCache(2)
+    key = simulation_key(CALL, 1, 100)
+    assert cache.get(key) is None
+    cache.put(key, REVERT)
+    assert cache.get(key) == REVERT
+    assert cache.get(simulation_key(CALL, 2, 100)) is None
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 1)
+
+
+def test_cache_eviction() -> None:
+    """The least recently used result is evicted once the cache is full."""
+    cache = SimulationCache(2)
+    first, second, third = (simulation_key(CALL, 1, block) for block in range(3))
+    cache.put(first, SUCCESS)
+    cache.put(second, REVERT)
+    assert cache.get(first) == SUCCESS
+    cache.put(third, SUCCESS)
+    assert len(cache) == 2
+    assert cache.get(second) is None
+    assert cache.get(first) == SUCCESS
+    assert cache.get(third) == SUCCESS
+
+
+@pytest.mark.parametrize(
+    "error, reverted",
+    [
+        ({"code": REVERT_ERROR_CODE, "message": "execution reverted"}, True),
+        ({"code": REVERT_ERROR_CODE, "message": "", "data": "0x08c379a0"}, True),
+        ({"code": -32000, "message": "execution reverted: ERC20: low balance"}, True),
+        (
+            {"code": -32015, "message": "VM execution error.", "data": "Reverted 0x"},
+            True,
+        ),
+        ("Execution Reverted", True),
+        ({"code": -32000, "message": "header not found"}, False),
+        ({"code": -32005, "message": "rate limit exceeded"}, False),
+        ("connection refused", False),
+        (None, False),
+    ],
+)
+def test_is_revert(error: Any, reverted: bool) -> None:
+    """Reverted executions are told apart from the failures of the node, by code or by message."""
+    assert is_revert(error) is reverted
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the snapshots of the cross-period state."""
+
+import logging
+import struct
+import zlib
+from pathlib import Path
+
+import pytest
+
+from packages.valory.skills.learning_abci.snapshot import (
+    CHECKSUM_FORMAT,
+    HEADER_FORMAT,
+    MAGIC,
+    Snapshot,
+    SnapshotError,
+    SnapshotWriter,
+    TEMPORARY_SUFFIX,
+    VERSION,
+    decode,
+    encode,
+    load_snapshot,
+    write_atomically,
+)
+
+
+SNAPSHOT = Snapshot(
+    period=42,
+    safe_nonce=7,
+    learner_state="learner-state",
+    pending_transfers='[{"to": "0x0", "value": 1}]',
+    deviations={"coingecko": [0.5, -1.25], "uniswap": [], "ünicode": [1e-9]},
+)
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT) + struct.calcsize(CHECKSUM_FORMAT)
+
+
+@pytest.mark.parametrize(
+    "snapshot",
+    [
+        SNAPSHOT,
+        Snapshot(period=0, safe_nonce=None, learner_state="", pending_transfers=""),
+    ],
+)
+def test_round_trip(snapshot: Snapshot) -> None:
+    """A snapshot decodes to itself."""
+    assert decode(encode(snapshot)) == snapshot
+
+
+def test_file_round_trip(tmp_path: Path) -> None:
+    """A written snapshot loads to itself, and a missing one to `None`."""
+    path = tmp_path / "state" / "snapshot.bin"
+    assert load_snapshot(path) is None
+    write_atomically(path, encode(SNAPSHOT))
+    assert load_snapshot(path) == SNAPSHOT
+    assert [file.name for file in path.parent.iterdir()] == [path.name]
+    assert not path.with_name(path.name + TEMPORARY_SUFFIX).exists()
+
+
+def test_truncated() -> None:
+    """A snapshot cut short anywhere is rejected."""
+    data = encode(SNAPSHOT)
+    for size in range(len(data)):
+        with pytest.raises(SnapshotError):
+            decode(data[:size])
+
+
+@pytest.mark.parametrize("position", [0, HEADER_SIZE - 1, HEADER_SIZE + 8, -1])
+def test_corrupted_checksum(position: int) -> None:
+    """A flipped bit in the header or in a section is rejected."""
+    data = bytearray(encode(SNAPSHOT))
+    data[position] ^= 1
+    with pytest.raises(SnapshotError, match="corrupt"):
+        decode(bytes(data))
+
+
+def test_wrong_version() -> None:
+    """A snapshot of another version is rejected, even with a valid checksum."""
+    data = encode(SNAPSHOT)
+    header = struct.pack(
+        HEADER_FORMAT, MAGIC, VERSION + 1, SNAPSHOT.period, SNAPSHOT.safe_nonce
+    )
+    checksum = struct.pack(CHECKSUM_FORMAT, zlib.crc32(header))
+    with pytest.raises(SnapshotError, match=f"version {VERSION + 1}"):
+        decode(header + checksum + data[HEADER_SIZE:])
+
+
+def test_missing_section() -> None:
+    """A snapshot without all of its sections is rejected."""
+    data = encode(Snapshot(1, 1, "", "", {}))
+    with pytest.raises(SnapshotError, match="Expected 3 sections"):
+        decode(data[: -struct.calcsize("<II")])
+
+
+def test_writer(tmp_path: Path) -> None:
+    """The writer writes the latest submitted snapshot, at the latest when stopped."""
+    path = tmp_path / "snapshot.bin"
+    writer = SnapshotWriter(path)
+    writer.start()
+    for period in range(3):
+        writer.submit(Snapshot(period, None, "", ""))
+    writer.submit(SNAPSHOT)
+    writer.stop()
+    assert load_snapshot(path) == SNAPSHOT
+    assert writer.written + writer.skipped == 4
+    assert writer.last_error is None
+
+
+def test_writer_error(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """The writer reports the snapshots it could not write."""
+    blocker = tmp_path / "file"
+    blocker.write_bytes(b"")
+    writer = SnapshotWriter(blocker / "snapshot.bin")
+    writer.start()
+    with caplog.at_level(logging.ERROR):
+        writer.submit(SNAPSHOT)
+        writer.stop()
+    assert isinstance(writer.last_error, OSError)
+    assert writer.written == 0
+    assert f"Could not write the snapshot of period {SNAPSHOT.period}" in caplog.text
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the priority queue of the pending transfers."""
+
+from typing import List
+
+import pytest
+
+from packages.valory.skills.learning_abci.transfers import TransferQueue, batch_size
+
+
+def targets(queue: TransferQueue, max_transfers: int) -> List[str]:
+    """Pop a batch from the queue, returning the targets of its transfers."""
+    return [transfer.target for transfer in queue.pop_batch(max_transfers)]
+
+
+def test_order() -> None:
+    """Transfers are popped by priority, then by deadline, then in the order they were pushed."""
+    queue = TransferQueue()
+    queue.push("late", 1, deadline=20.0)
+    queue.push("early", 1, deadline=10.0)
+    queue.push("urgent", 1, deadline=30.0, priority=1)
+    queue.push("early_again", 1, deadline=10.0)
+    assert targets(queue, 10) == ["urgent", "early", "early_again", "late"]
+    assert len(queue) == 0
+
+
+def test_bounds() -> None:
+    """A full queue drops its least important transfer, which may be the one pushed."""
+    queue = TransferQueue(max_size=2)
+    assert queue.push("a", 1, deadline=10.0) is None
+    assert queue.push("b", 1, deadline=20.0) is None
+
+    dropped = queue.push("c", 1, deadline=5.0)
+    assert dropped is not None and dropped.target == "b"
+    dropped = queue.push("d", 1, deadline=30.0)
+    assert dropped is not None and dropped.target == "d"
+    assert targets(queue, 10) == ["c", "a"]
+
+
+def test_pop_batch_limits() -> None:
+    """A batch holds at most the requested number of transfers, and none if it is negative."""
+    queue = TransferQueue()
+    for i in range(3):
+        queue.push(str(i), 1, deadline=float(i))
+    assert queue.pop_batch(-1) == []
+    assert targets(queue, 2) == ["0", "1"]
+    assert targets(queue, 2) == ["2"]
+
+
+def test_drop_expired_and_restore() -> None:
+    """Expired transfers are dropped, and restored transfers keep their place in the order."""
+    queue = TransferQueue()
+    queue.push("expired", 1, deadline=1.0)
+    queue.push("first", 1, deadline=5.0)
+    queue.push("second", 1, deadline=6.0)
+
+    assert [transfer.target for transfer in queue.drop_expired(now=2.0)] == ["expired"]
+    batch = queue.pop_batch(1)
+    queue.restore(batch)
+    assert targets(queue, 10) == ["first", "second"]
+
+
+def test_pop_chain_batches() -> None:
+    """Transfers are batched per chain, in order, and the ones which do not fit are kept."""
+    queue = TransferQueue()
+    queue.push("g1", 1, deadline=1.0)
+    queue.push("e1", 1, deadline=2.0, chain_id="ethereum")
+    queue.push("g2", 1, deadline=3.0, chain_id="gnosis")
+    queue.push("g3", 1, deadline=4.0)
+    queue.push("e2", 1, deadline=5.0, chain_id="ethereum", priority=1)
+
+    batches = queue.pop_chain_batches(2, default_chain_id="gnosis")
+    assert list(batches) == ["ethereum", "gnosis"]
+    assert [transfer.target for transfer in batches["ethereum"]] == ["e2", "e1"]
+    assert [transfer.target for transfer in batches["gnosis"]] == ["g1", "g2"]
+    assert targets(queue, 10) == ["g3"]
+    assert queue.pop_chain_batches(2, default_chain_id="gnosis") == {}
+
+
+def test_serialization() -> None:
+    """A queue survives a round trip through its serialization, which is deterministic."""
+    queue = TransferQueue(max_size=3)
+    queue.push("a", 10, deadline=2.0, chain_id="ethereum")
+    queue.push("b", 20, deadline=1.0, priority=2)
+    queue.pop_batch(1)
+    queue.push("c", 30, deadline=3.0)
+
+    serialized = queue.serialize()
+    restored = TransferQueue.deserialize(serialized, max_size=3)
+    assert restored.serialize() == serialized
+    assert restored.next_sequence == queue.next_sequence == 3
+    assert restored.pop_batch(10) == queue.pop_batch(10)
+    assert len(TransferQueue.deserialize(None)) == 0
+
+
+def test_batch_size() -> None:
+    """The batch size is the number of transfers which fit in the gas budget."""
+    assert batch_size(1000, 100, 300) == 3
+    assert batch_size(50, 100, 300) == 0
+    with pytest.raises(ValueError):
+        batch_size(1000, 100, 0)
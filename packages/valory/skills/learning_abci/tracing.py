@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the span tracing of the behaviours.
+
+The behaviours are generators which are interleaved on the agent's main loop, so the active
+spans are kept in a stack per behaviour, rather than per thread. A span is opened around a
+`yield from` of a sub-operation and is closed when the sub-operation returns, so that it measures
+the wall time of the sub-operation, including the time it has been suspended for.
+The spans of the act of a behaviour are exported once its root span ends, as a line of
+OTLP/JSON, i.e., the JSON encoding of the OpenTelemetry protocol, which the file receiver of
+the OpenTelemetry collector reads. The exporting happens on a thread of its own.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+SCOPE_NAME = "learning_abci"
+SPAN_KIND_INTERNAL = 1
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+TRACE_ID_SIZE = 16
+SPAN_ID_SIZE = 8
+JOIN_TIMEOUT = 5.0
+
+Attributes = Dict[str, Any]
+
+
+@dataclass
+class Span:  # pylint: disable=too-many-instance-attributes
+    """A timed operation, which may be the child of another."""
+
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Attributes = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Get the OTLP/JSON encoding of the span."""
+        encoded: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            # the 64 bit integers are encoded as strings in OTLP/JSON
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": STATUS_ERROR, "message": self.error}
+                if self.error is not None
+                else {"code": STATUS_UNSET}
+            ),
+        }
+        if self.parent_id is not None:
+            encoded["parentSpanId"] = self.parent_id
+        return encoded
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Get the OTLP/JSON encoding of an attribute value."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def trace_id(agent_address: str, period: int) -> str:
+    """Get the id of the trace of a period of an agent."""
+    digest = hashlib.sha256(f"{agent_address}:{period}".encode()).hexdigest()
+    return digest[: 2 * TRACE_ID_SIZE]
+
+
+class SpanExporter:
+    """Appends batches of spans to a file, as OTLP/JSON lines, from a background thread."""
+
+    def __init__(self, path: Path, service_name: str, queue_size: int) -> None:
+        """Initialize the exporter."""
+        self.path = path
+        self.service_name = service_name
+        self.exported = 0
+        self.dropped = 0
+        self.last_error: Optional[Exception] = None
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the exporter's thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the exporter's thread, once the queued spans are exported."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(JOIN_TIMEOUT)
+        self._thread = None
+
+    def export(self, spans: List[Span]) -> None:
+        """Queue spans to be exported, dropping them if the queue is full."""
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += len(spans)
+
+    def encode(self, spans: List[Span]) -> str:
+        """Encode spans as an OTLP/JSON line."""
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": _otlp_value(self.service_name),
+                            },
+                            {"key": "process.pid", "value": _otlp_value(os.getpid())},
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": SCOPE_NAME},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        return json.dumps(request, separators=(",", ":"))
+
+    def _run(self) -> None:
+        """Export the queued spans until stopped."""
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(self.encode(spans) + "\n")
+                self.exported += len(spans)
+            except OSError as e:
+                self.last_error = e
+
+
+class Tracer:
+    """Keeps the active spans of every behaviour, exporting them once the root span ends."""
+
+    def __init__(self, exporter: SpanExporter) -> None:
+        """Initialize the tracer."""
+        self.exporter = exporter
+        self._active: Dict[str, List[Span]] = {}
+        self._finished: Dict[str, List[Span]] = {}
+
+    @contextmanager
+    def span(
+        self, owner: str, trace: str, name: str, attributes: Attributes
+    ) -> Iterator[Span]:
+        """
+        Open a span for the duration of the block, as a child of the owner's active span.
+
+        :param owner: the id of the behaviour which owns the span.
+        :param trace: the id of the trace of the span, used if it is a root span.
+        :param name: the name of the span.
+        :param attributes: the attributes of the span.
+        :yield: the span.
+        """
+        active = self._active.setdefault(owner, [])
+        parent = active[-1] if active else None
+        span = Span(
+            trace_id=parent.trace_id if parent is not None else trace,
+            span_id=os.urandom(SPAN_ID_SIZE).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            name=name,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        active.append(span)
+        try:
+            yield span
+        except GeneratorExit:
+            # the behaviour has been stopped, e.g., because its round has ended
+            span.attributes["cancelled"] = True
+            raise
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            active.remove(span)
+            finished = self._finished.setdefault(owner, [])
+            finished.append(span)
+            if parent is None:
+                self.exporter.export(finished)
+                del self._finished[owner]
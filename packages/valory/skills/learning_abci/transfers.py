@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the priority queue of the pending transfers of LearningAbciApp."""
+
+import heapq
+import json
+from dataclasses import astuple, dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True, order=True)
+class Transfer:
+    """
+    A pending transfer.
+
+    Transfers are ordered by priority, highest first, then by deadline and then by
+    the order in which they were scheduled, which makes the order total and deterministic.
+    A transfer without a chain is made on the default chain of the service.
+    """
+
+    sort_priority: int
+    deadline: float
+    sequence: int
+    target: str = field(compare=False)
+    amount: int = field(compare=False)
+    chain_id: Optional[str] = field(compare=False, default=None)
+
+    @property
+    def priority(self) -> int:
+        """Get the priority of the transfer."""
+        return -self.sort_priority
+
+
+class TransferQueue:
+    """A bounded, heap-based priority queue of pending transfers."""
+
+    def __init__(
+        self,
+        transfers: Optional[List[Transfer]] = None,
+        next_sequence: int = 0,
+        max_size: Optional[int] = None,
+    ) -> None:
+        """Initialize the queue."""
+        self._heap: List[Transfer] = list(transfers or [])
+        heapq.heapify(self._heap)
+        self.next_sequence = next_sequence
+        self.max_size = max_size
+
+    def __len__(self) -> int:
+        """Get the number of pending transfers."""
+        return len(self._heap)
+
+    def push(  # pylint: disable=too-many-arguments
+        self,
+        target: str,
+        amount: int,
+        deadline: float,
+        priority: int = 0,
+        chain_id: Optional[str] = None,
+    ) -> Optional[Transfer]:
+        """
+        Schedule a transfer.
+
+        :param target: the address to transfer to.
+        :param amount: the amount to transfer, in wei.
+        :param deadline: the timestamp after which the transfer is not worth making anymore.
+        :param priority: the priority of the transfer, the higher the sooner.
+        :param chain_id: the chain to make the transfer on, the default chain if None.
+        :return: the transfer dropped to keep the queue within its bounds, if any.
+        """
+        transfer = Transfer(
+            -priority, deadline, self.next_sequence, target, amount, chain_id
+        )
+        self.next_sequence += 1
+        heapq.heappush(self._heap, transfer)
+        if self.max_size is None or len(self._heap) <= self.max_size:
+            return None
+        dropped = max(self._heap)
+        self._heap.remove(dropped)
+        heapq.heapify(self._heap)
+        return dropped
+
+    def drop_expired(self, now: float) -> List[Transfer]:
+        """Drop the transfers whose deadline has passed."""
+        expired = [transfer for transfer in self._heap if transfer.deadline < now]
+        if expired:
+            self._heap = [
+                transfer for transfer in self._heap if transfer.deadline >= now
+            ]
+            heapq.heapify(self._heap)
+        return expired
+
+    def restore(self, batch: List[Transfer]) -> None:
+        """Put back transfers which could not be made."""
+        for transfer in batch:
+            heapq.heappush(self._heap, transfer)
+
+    def pop_batch(self, max_transfers: int) -> List[Transfer]:
+        """Pop the next transfers to make, in order."""
+        batch_size = min(max(max_transfers, 0), len(self._heap))
+        return [heapq.heappop(self._heap) for _ in range(batch_size)]
+
+    def pop_chain_batches(
+        self, max_transfers: int, default_chain_id: str
+    ) -> Dict[str, List[Transfer]]:
+        """Pop the next transfers to make on every chain, in order, at most `max_transfers` per chain."""
+        batches: Dict[str, List[Transfer]] = {}
+        kept = []
+        while self._heap:
+            transfer = heapq.heappop(self._heap)
+            batch = batches.setdefault(transfer.chain_id or default_chain_id, [])
+            if len(batch) < max_transfers:
+                batch.append(transfer)
+            else:
+                kept.append(transfer)
+        self.restore(kept)
+        return {chain_id: batch for chain_id, batch in sorted(batches.items()) if batch}
+
+    def serialize(self) -> str:
+        """Serialize the queue to a deterministic JSON string."""
+        return json.dumps(
+            {
+                "next_sequence": self.next_sequence,
+                "transfers": [astuple(transfer) for transfer in sorted(self._heap)],
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def deserialize(
+        cls, serialized: Optional[str], max_size: Optional[int] = None
+    ) -> "TransferQueue":
+        """Deserialize a queue."""
+        if not serialized:
+            return cls(max_size=max_size)
+        data = json.loads(serialized)
+        transfers = [Transfer(*values) for values in data["transfers"]]
+        return cls(transfers, data["next_sequence"], max_size)
+
+
+def batch_size(gas_budget: int, base_gas: int, gas_per_transfer: int) -> int:
+    """Get the number of transfers which fit in a transaction with the given gas budget."""
+    if gas_per_transfer <= 0:
+        raise ValueError("The gas per transfer needs to be positive.")
+    return max((gas_budget - base_gas) // gas_per_transfer, 0)
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the pool of worker processes of the CPU-heavy computations of the behaviours.
+
+The behaviours run on the main loop of the agent, which also handles the ABCI requests, so a
+computation which holds it for long makes the agent miss rounds. Such a computation is submitted
+to the pool as a pure function, i.e., a function of its arguments only, defined at the top level
+of a module so that the workers can import it. Like the agent, the workers load the AEA package
+of the functions by hand, as it is not importable otherwise. The numpy arrays among its arguments are passed
+through shared memory rather than pickled, and the shared memory is released once the result is
+in. The workers are spawned rather than forked, as the agent runs threads.
+
+A task which is not running yet is cancelled by removing it from the queue. A running one cannot
+be interrupted, so the workers are terminated instead, and new ones are spawned on the next
+submission.
+"""
+
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+from aea.components.base import perform_load_aea_package
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """A numpy array in shared memory, as passed to a worker."""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _attach(arg: Any, segments: List[SharedMemory]) -> Any:
+    """Attach an argument to its shared memory, if it is a shared array."""
+    if not isinstance(arg, SharedArray):
+        return arg
+    segment = SharedMemory(name=arg.name)
+    segments.append(segment)
+    return np.ndarray(arg.shape, dtype=arg.dtype, buffer=segment.buf)
+
+
+def _call(function: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+    """Call a function in a worker, with its shared arrays attached."""
+    segments: List[SharedMemory] = []
+    try:
+        result = function(*[_attach(arg, segments) for arg in args])
+        # a view of an argument would keep the shared memory referenced
+        return result.copy() if isinstance(result, np.ndarray) else result
+    finally:
+        for segment in segments:
+            try:
+                segment.close()
+            except BufferError:
+                # the traceback of a failed call still references the arrays
+                pass
+
+
+class WorkerPool:
+    """Runs pure functions in worker processes."""
+
+    def __init__(self, workers: int, package_dir: Path) -> None:
+        """
+        Initialize the pool.
+
+        :param workers: the number of worker processes.
+        :param package_dir: the directory of the AEA package of the functions to run.
+        """
+        self.workers = workers
+        self.package_dir = package_dir
+        self.submitted = 0
+        self.cancelled = 0
+        self.restarts = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> "Future[Any]":
+        """Submit a pure function, passing its array arguments through shared memory."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                # the initializer needs to be importable before the package is loaded
+                initializer=perform_load_aea_package,
+                initargs=(self.package_dir, *self.package_dir.parts[-3:]),
+            )
+        segments: List[SharedMemory] = []
+        shared_args = []
+        try:
+            for arg in args:
+                if isinstance(arg, np.ndarray):
+                    segment = SharedMemory(create=True, size=max(arg.nbytes, 1))
+                    segments.append(segment)
+                    shared = np.ndarray(arg.shape, dtype=arg.dtype, buffer=segment.buf)
+                    shared[...] = arg
+                    del shared
+                    arg = SharedArray(segment.name, arg.shape, arg.dtype.str)
+                shared_args.append(arg)
+            future = self._executor.submit(_call, function, tuple(shared_args))
+        except BaseException:
+            self._release(segments)
+            raise
+        future.add_done_callback(lambda _: self._release(segments))
+        self.submitted += 1
+        return future
+
+    def cancel(self, future: "Future[Any]") -> None:
+        """Cancel a task, terminating the workers if it is already running."""
+        if future.done():
+            return
+        self.cancelled += 1
+        if future.cancel():
+            return
+        self.restart()
+
+    def restart(self) -> None:
+        """Terminate the workers, failing their tasks, so that new ones are spawned when needed."""
+        if self._executor is None:
+            return
+        self.restarts += 1
+        self.stop()
+
+    def stop(self) -> None:
+        """Stop the workers, without waiting for their tasks."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # the executor has no public way to interrupt the running tasks
+        processes = list(
+            (executor._processes or {}).values()  # pylint: disable=protected-access
+        )
+        for process in processes:
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _release(segments: List[SharedMemory]) -> None:
+        """Release the shared memory of the arguments of a task."""
+        for segment in segments:
+            segment.close()
+            segment.unlink()
@@ -19,23 +19,36 @@
 
 """This package contains round behaviours of LearningChainedSkillAbci."""
 
-from typing import Set, Type
+import time
+from typing import Any, Callable, Generator, Set, Type, cast
 
+from aea.protocols.base import Message
+
+from packages.valory.skills.abstract_round_abci.behaviour_utils import AsyncBehaviour
 from packages.valory.skills.abstract_round_abci.behaviours import (
     AbstractRoundBehaviour,
     BaseBehaviour,
 )
-from packages.valory.skills.learning_abci.behaviours import LearningRoundBehaviour
+from packages.valory.skills.learning_abci.behaviours import (
+    LearningBaseBehaviour,
+    LearningRoundBehaviour,
+)
+from packages.valory.skills.learning_abci.fixed_point import price_to_float
+from packages.valory.skills.learning_abci.rounds import DecisionMakingRound
 from packages.valory.skills.learning_chained_abci.composition import (
     LearningChainedSkillAbciApp,
 )
+from packages.valory.skills.learning_chained_abci.models import Params, SharedState
 from packages.valory.skills.registration_abci.behaviours import (
     AgentRegistrationRoundBehaviour,
     RegistrationStartupBehaviour,
 )
 from packages.valory.skills.reset_pause_abci.behaviours import (
+    ResetAndPauseBehaviour,
     ResetPauseABCIConsensusBehaviour,
 )
+from packages.valory.skills.reset_pause_abci.payloads import ResetPausePayload
+from packages.valory.skills.reset_pause_abci.rounds import ResetAndPauseRound
 from packages.valory.skills.termination_abci.behaviours import (
     BackgroundBehaviour,
     TerminationAbciBehaviours,
@@ -45,6 +58,146 @@ from packages.valory.skills.transaction_settlement_abci.behaviours import (
 )
 
 
+class LearningResetAndPauseBehaviour(ResetAndPauseBehaviour):
+    """Reset and pause behaviour, which also writes the period log and follows the app on when to reset Tendermint."""
+
+    behaviour_id = ResetAndPauseBehaviour.auto_behaviour_id()
+
+    @property
+    def local_state(self) -> SharedState:
+        """Return the state."""
+        return cast(SharedState, self.context.state)
+
+    @property
+    def abci_app(self) -> LearningChainedSkillAbciApp:
+        """Return the chained AbciApp."""
+        return cast(LearningChainedSkillAbciApp, self.round_sequence.abci_app)
+
+    def async_act(self) -> Generator:
+        """Do the action, resetting Tendermint when the app has decided to."""
+        self.write_period_record()
+        reset_tm_nodes = self.is_reset_due()
+        if reset_tm_nodes:
+            tendermint_reset = yield from self.reset_tendermint_with_wait()
+            if not tendermint_reset:
+                return
+        else:
+            yield from self.wait_from_last_timestamp(self.params.reset_pause_duration)
+        self.context.logger.info("Period end.")
+        self.context.benchmark_tool.save(self.synchronized_data.period_count)
+
+        payload = ResetPausePayload(
+            self.context.agent_address, self.synchronized_data.period_count
+        )
+        yield from self.send_a2a_transaction(payload, reset_tm_nodes)
+        yield from self.wait_until_round_end()
+        self.set_done()
+
+    def is_reset_due(self) -> bool:
+        """Whether to reset Tendermint at the end of the current period."""
+        if self.abci_app.reset_policy is None:
+            # + 1 because `period_count` starts from 0
+            n_periods_done = self.synchronized_data.period_count + 1
+            return n_periods_done % self.params.reset_tendermint_after == 0
+        reason = self.abci_app.reset_reason
+        if reason is not None:
+            self.context.logger.info(f"Resetting Tendermint, as {reason}.")
+        return reason is not None
+
+    def write_period_record(self) -> None:
+        """Write the record of the current period once, before the benchmarks get reset."""
+        period = self.synchronized_data.period_count
+        if period == self.local_state.last_logged_period:
+            return
+        self.local_state.last_logged_period = period
+        ended_rounds = self.abci_app.period_stats.pop(period)
+        period_log = self.local_state.period_log
+        if period_log is None:
+            return
+
+        db = self.synchronized_data.db
+        params = cast(Params, self.params)
+        record = period_log.schema.encode(
+            period=period,
+            timestamp=self.round_sequence.last_round_transition_timestamp.timestamp(),
+            # the period log keeps the price as a float, whatever the precision it is agreed on
+            price=price_to_float(db.get("price", None), params.price_decimals),
+            tx_hash=db.get("final_tx_hash", None),
+            ended_rounds=ended_rounds,
+            benchmarks=self.context.benchmark_tool.data,
+            decision_round_id=DecisionMakingRound.auto_round_id(),
+        )
+        try:
+            period_log.append(record)
+        except OSError as e:
+            self.context.logger.error(f"Could not write the period log: {e}")
+
+
+class PricePrefetchBehaviour(
+    LearningBaseBehaviour
+):  # pylint: disable=too-many-ancestors
+    """Background behaviour which fetches the price shortly before the pause between periods ends."""
+
+    matching_round = ResetAndPauseRound
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialize the behaviour."""
+        super().__init__(**kwargs)
+        self._last_attempt = 0.0
+
+    @property
+    def params(self) -> Params:
+        """Return the params."""
+        return cast(Params, self.context.params)
+
+    def async_act(self) -> Generator:
+        """Do the action."""
+        if not self.params.use_price_prefetch or not self.is_prefetch_due():
+            yield
+            return
+
+        self._last_attempt = time.time()
+        quotes = yield from self.fetch_quotes()
+        if quotes:
+            self.local_state.store_prefetched_quotes(quotes)
+            self.context.logger.info(f"Prefetched quotes {quotes}")
+
+    def is_prefetch_due(self) -> bool:
+        """Whether the pause between periods is about to end."""
+        if self.round_sequence.current_round_id != ResetAndPauseRound.auto_round_id():
+            return False
+        stream = self.local_state.price_stream
+        if stream is not None and stream.is_running:
+            # the streamed price is fresher than anything a request could return
+            return False
+        pause_start = self.round_sequence.last_round_transition_timestamp.timestamp()
+        if self._last_attempt >= pause_start:
+            # fetch at most once per pause, even if the attempt failed
+            return False
+        pause_end = pause_start + self.params.reset_pause_duration
+        return time.time() >= pause_end - self.params.price_prefetch_lead
+
+    def get_callback_request(self) -> Callable[[Message, BaseBehaviour], None]:
+        """Wrapper for callback_request(), overridden to avoid mix-ups with normal (non-background) behaviours."""
+
+        def callback_request(
+            message: Message, _current_behaviour: BaseBehaviour
+        ) -> None:
+            """Pass the response to this behaviour, regardless of the current behaviour."""
+            if self.is_stopped:
+                self.context.logger.debug(
+                    "Dropping message as behaviour has stopped: %s", message
+                )
+            elif self.state == AsyncBehaviour.AsyncState.WAITING_MESSAGE:
+                self.try_send(message)
+            else:
+                self.context.logger.warning(
+                    f"Could not send message {message} to {self.behaviour_id}"
+                )
+
+        return callback_request
+
+
 class LearningChainedConsensusBehaviour(AbstractRoundBehaviour):
     """Class to define the behaviours this AbciApp has."""
 
@@ -52,9 +205,13 @@ class LearningChainedConsensusBehaviour(AbstractRoundBehaviour):
     abci_app_cls = LearningChainedSkillAbciApp
     behaviours: Set[Type[BaseBehaviour]] = {
         *AgentRegistrationRoundBehaviour.behaviours,
-        *ResetPauseABCIConsensusBehaviour.behaviours,
+        *(
+            ResetPauseABCIConsensusBehaviour.behaviours
+            - {ResetAndPauseBehaviour}  # type: ignore
+        ),
+        LearningResetAndPauseBehaviour,  # type: ignore
         *TransactionSettlementRoundBehaviour.behaviours,
         *TerminationAbciBehaviours.behaviours,
         *LearningRoundBehaviour.behaviours,
     }
-    background_behaviours_cls = {BackgroundBehaviour}
+    background_behaviours_cls = {BackgroundBehaviour, PricePrefetchBehaviour}
@@ -19,6 +19,10 @@
 
 """This package contains round behaviours of LearningChainedSkillAbciApp."""
 
+import datetime
+from enum import Enum
+from typing import Any, FrozenSet, Optional, Type
+
 import packages.valory.skills.learning_abci.rounds as LearningAbci
 import packages.valory.skills.registration_abci.rounds as RegistrationAbci
 import packages.valory.skills.reset_pause_abci.rounds as ResetAndPauseAbci
@@ -27,7 +31,19 @@ from packages.valory.skills.abstract_round_abci.abci_app_chain import (
     AbciAppTransitionMapping,
     chain,
 )
-from packages.valory.skills.abstract_round_abci.base import BackgroundAppConfig
+from packages.valory.skills.abstract_round_abci.base import (
+    AbstractRound,
+    BackgroundAppConfig,
+    BaseSynchronizedData,
+    Transaction,
+)
+from packages.valory.skills.learning_chained_abci.fsm_table import TransitionTable
+from packages.valory.skills.learning_chained_abci.period_log import PeriodStats
+from packages.valory.skills.learning_chained_abci.reset_policy import ResetPolicy
+from packages.valory.skills.learning_chained_abci.timeouts import (
+    ROUND_DURATIONS_KEY,
+    TimeoutAutotuner,
+)
 from packages.valory.skills.termination_abci.rounds import (
     BackgroundRound,
     Event,
@@ -39,7 +55,8 @@ abci_app_transition_mapping: AbciAppTransitionMapping = {
     RegistrationAbci.FinishedRegistrationRound: LearningAbci.APICheckRound,
     LearningAbci.FinishedDecisionMakingRound: ResetAndPauseAbci.ResetAndPauseRound,
     LearningAbci.FinishedTxPreparationRound: TxSettlementAbci.RandomnessTransactionSubmissionRound,
-    TxSettlementAbci.FinishedTransactionSubmissionRound: ResetAndPauseAbci.ResetAndPauseRound,
+    TxSettlementAbci.FinishedTransactionSubmissionRound: LearningAbci.TxPreparationRound,
+    LearningAbci.FinishedSettlementsRound: ResetAndPauseAbci.ResetAndPauseRound,
     TxSettlementAbci.FailedRound: TxSettlementAbci.RandomnessTransactionSubmissionRound,
     ResetAndPauseAbci.FinishedResetAndPauseRound: LearningAbci.APICheckRound,
     ResetAndPauseAbci.FinishedResetAndPauseErrorRound: RegistrationAbci.RegistrationRound,
@@ -51,7 +68,7 @@ termination_config = BackgroundAppConfig(
     abci_app=TerminationAbciApp,
 )
 
-LearningChainedSkillAbciApp = chain(
+ChainedAbciApp = chain(
     (
         RegistrationAbci.AgentRegistrationAbciApp,
         LearningAbci.LearningAbciApp,
@@ -60,3 +77,153 @@ LearningChainedSkillAbciApp = chain(
     ),
     abci_app_transition_mapping,
 ).add_background_app(termination_config)
+
+
+class LearningChainedSkillAbciApp(ChainedAbciApp):  # type: ignore
+    """The chained AbciApp, keeping track of the rounds ended in every period and deciding when to reset."""
+
+    transition_table: Optional[TransitionTable] = None
+    timeout_autotuner: Optional[TimeoutAutotuner] = None
+    reset_policy: Optional[ResetPolicy] = None
+    cross_period_persisted_keys: FrozenSet[
+        str
+    ] = ChainedAbciApp.cross_period_persisted_keys.union({ROUND_DURATIONS_KEY})
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the AbciApp."""
+        super().__init__(*args, **kwargs)
+        self.period_stats = PeriodStats()
+        self._round_start: Optional[datetime.datetime] = None
+        self._tuned_period: Optional[int] = None
+        self._stored_durations: Optional[str] = None
+        self._period_start: Optional[datetime.datetime] = None
+        self.reset_reason: Optional[str] = None
+
+    def update_time(self, timestamp: datetime.datetime) -> None:
+        """Update the time of the app, on every block."""
+        super().update_time(timestamp)
+        if self.reset_policy is not None:
+            self.reset_policy.record_block()
+
+    def process_transaction(self, transaction: Transaction, dry: bool = False) -> None:
+        """Process a transaction, recording its size as it is stored in the block."""
+        if not dry and self.reset_policy is not None:
+            self.reset_policy.record_transaction(len(transaction.encode()))
+        super().process_transaction(transaction, dry)
+
+    def schedule_round(self, round_cls: Type[AbstractRound]) -> None:
+        """Schedule a round class, keeping track of the block time it started at."""
+        self._round_start = self._last_timestamp
+        if round_cls is LearningAbci.APICheckRound:
+            self._period_start = self._last_timestamp
+            self._load_durations()
+        elif round_cls is ResetAndPauseAbci.ResetAndPauseRound:
+            self._decide_reset()
+        super().schedule_round(round_cls)
+
+    def process_event(
+        self, event: Enum, result: Optional[BaseSynchronizedData] = None
+    ) -> None:
+        """Process a round event, recording the end of the current round."""
+        round_id = self.current_round_id
+        if round_id is not None:
+            self.period_stats.add(self.synchronized_data.period_count, round_id, event)
+            self._record_duration(event)
+            if self.reset_policy is not None:
+                self.reset_policy.record_round()
+        if (
+            result is not None
+            and self._current_round_cls is ResetAndPauseAbci.ResetAndPauseRound
+            and event == ResetAndPauseAbci.Event.DONE
+        ):
+            result = self._store_durations(result)
+        super().process_event(event, result)
+        self._tune_timeouts()
+
+    def _record_duration(self, event: Enum) -> None:
+        """Record the duration of the current round, in block time."""
+        autotuner = self.timeout_autotuner
+        if (
+            autotuner is None
+            or self._round_start is None
+            or self._last_timestamp is None
+        ):
+            return
+        duration = (self._last_timestamp - self._round_start).total_seconds()
+        autotuner.record(type(self.current_round), event, duration)
+
+    def _load_durations(self) -> None:
+        """Load the durations of the synchronized data, unless they are the ones stored by this agent."""
+        autotuner = self.timeout_autotuner
+        if autotuner is None:
+            return
+        stored = self.synchronized_data.db.get(ROUND_DURATIONS_KEY, None)
+        if stored is None or stored == self._stored_durations:
+            return
+        # e.g., the agent has restarted
+        autotuner.load_durations(stored, type(self).transition_function)
+        self._stored_durations = stored
+
+    def _store_durations(self, result: BaseSynchronizedData) -> BaseSynchronizedData:
+        """Store the durations in the data of the next period, as part of the update of the reset round."""
+        autotuner = self.timeout_autotuner
+        if autotuner is None:
+            return result
+        serialized = autotuner.serialize_durations()
+        if serialized == self._stored_durations:
+            return result
+        self._stored_durations = serialized
+        return result.update(**{ROUND_DURATIONS_KEY: serialized})
+
+    def _tune_timeouts(self) -> None:
+        """Tune the timeouts once per period, so that every agent switches at the same round."""
+        autotuner = self.timeout_autotuner
+        period = self.synchronized_data.period_count
+        if autotuner is None or period == self._tuned_period:
+            return
+        self._tuned_period = period
+        changes = autotuner.tune(type(self).transition_function, self.event_to_timeout)
+        if changes is None:
+            return
+        verb = "Applied" if autotuner.apply else "Proposed"
+        self.logger.info(
+            f"{verb} timeouts for period {period}: "
+            + ", ".join(f"{event}={timeout}s" for event, timeout in changes.items())
+        )
+
+    def _decide_reset(self) -> None:
+        """Decide whether to reset Tendermint at the end of the period, which has just ended."""
+        policy = self.reset_policy
+        self.reset_reason = None
+        if policy is None:
+            return
+        if self._period_start is not None and self._last_timestamp is not None:
+            duration = (self._last_timestamp - self._period_start).total_seconds()
+            policy.record_period(duration)
+        self._period_start = None
+        self.reset_reason = policy.decide()
+
+    def cleanup(
+        self,
+        cleanup_history_depth: int,
+        cleanup_history_depth_current: Optional[int] = None,
+    ) -> None:
+        """Clear the data, once Tendermint has been reset."""
+        super().cleanup(cleanup_history_depth, cleanup_history_depth_current)
+        # the round spans the reset, which an agent restarting on the new chain cannot measure
+        self._round_start = None
+        if self.reset_policy is not None:
+            self.reset_policy.reset()
+
+    def _resolve_transition(self, event: Enum) -> Optional[Type[AbstractRound]]:
+        """Resolve the transitioning using the precompiled transition table, if loaded."""
+        table = self.transition_table
+        if (
+            table is None
+            or self._current_round_cls is None
+            or event.name in table.background_start_events
+            or self._transition_backup.transition_function is not None
+        ):
+            # background apps switch the transition function, let the base class handle them
+            return super()._resolve_transition(event)
+        return table.next_round(self._current_round_cls, event)
@@ -19,46 +19,46 @@
 
 """This module contains the classes required for dialogue management."""
 
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     AbciDialogue as BaseAbciDialogue,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     AbciDialogues as BaseAbciDialogues,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     ContractApiDialogue as BaseContractApiDialogue,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     ContractApiDialogues as BaseContractApiDialogues,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     HttpDialogue as BaseHttpDialogue,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     HttpDialogues as BaseHttpDialogues,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     IpfsDialogue as BaseIpfsDialogue,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     IpfsDialogues as BaseIpfsDialogues,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     LedgerApiDialogue as BaseLedgerApiDialogue,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     LedgerApiDialogues as BaseLedgerApiDialogues,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     SigningDialogue as BaseSigningDialogue,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     SigningDialogues as BaseSigningDialogues,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     TendermintDialogue as BaseTendermintDialogue,
 )
-from packages.valory.skills.abstract_round_abci.dialogues import (
+from packages.valory.skills.learning_abci.dialogues import (
     TendermintDialogues as BaseTendermintDialogues,
 )
 
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the precompiled transition table of LearningChainedSkillAbciApp.
+
+The transition function of the chained app and those of its background apps are compiled
+into a dense table, indexed by the mode of the FSM, i.e., the main app or one of the
+background apps, and by the integer codes of the rounds and of the events.
+The table is validated against `fsm_specification.yaml` once, and cached on disk,
+keyed by a hash of the sources of the apps and of the specification.
+"""
+
+import hashlib
+import inspect
+import json
+import sys
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+from aea.helpers.yaml_utils import yaml_load
+
+from packages.valory.skills.abstract_round_abci.base import AbstractRound
+
+
+NO_TRANSITION = -1
+MAIN_MODE = 0
+TABLE_FILE_NAME = "fsm-table-{digest}.json"
+TABLE_FILE_GLOB = "fsm-table-*.json"
+FSM_SPECIFICATION_PATH = Path(__file__).parent / "fsm_specification.yaml"
+
+Table = Tuple[Tuple[Tuple[int, ...], ...], ...]
+
+
+class TransitionTableError(ValueError):
+    """Raised when a transition table is not consistent with its sources."""
+
+
+@dataclass
+class TransitionTable:
+    """A dense transition table, indexed by mode, round code and event code."""
+
+    digest: str
+    round_names: Tuple[str, ...]
+    events: Tuple[str, ...]
+    table: Table
+    background_start_events: Tuple[str, ...]
+    _round_codes: Dict[str, int] = field(init=False, repr=False)
+    _event_codes: Dict[str, int] = field(init=False, repr=False)
+    _round_classes: List[Optional[Type[AbstractRound]]] = field(init=False, repr=False)
+    _bound_codes: Dict[Type[AbstractRound], int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Build the code lookups."""
+        self._round_codes = {
+            round_name: i for i, round_name in enumerate(self.round_names)
+        }
+        self._event_codes = {event: i for i, event in enumerate(self.events)}
+        self._round_classes = [None] * len(self.round_names)
+        self._bound_codes = {}
+
+    def bind(self, round_classes: Set[Type[AbstractRound]]) -> None:
+        """Bind the round codes to the round classes of the app."""
+        for round_cls in round_classes:
+            code = self._round_codes.get(round_cls.__name__)
+            if code is not None:
+                self._round_classes[code] = round_cls
+                self._bound_codes[round_cls] = code
+        unbound = [
+            round_name
+            for round_name, round_cls in zip(self.round_names, self._round_classes)
+            if round_cls is None
+        ]
+        if unbound:
+            raise TransitionTableError(f"Rounds {unbound} are not rounds of the app.")
+
+    def next_round(
+        self, round_cls: Type[AbstractRound], event: Enum, mode: int = MAIN_MODE
+    ) -> Optional[Type[AbstractRound]]:
+        """Get the round following the given round on the given event."""
+        round_code = self._bound_codes.get(round_cls)
+        event_code = self._event_codes.get(event.name)
+        if round_code is None or event_code is None:
+            return None
+        next_code = self.table[mode][round_code][event_code]
+        if next_code == NO_TRANSITION:
+            return None
+        return self._round_classes[next_code]
+
+    def transitions(self, mode: int = MAIN_MODE) -> Dict[Tuple[str, str], str]:
+        """Get the transitions of a mode, as `(round name, event) -> round name`."""
+        transitions = {}
+        for round_code, row in enumerate(self.table[mode]):
+            for event_code, next_code in enumerate(row):
+                if next_code != NO_TRANSITION:
+                    key = (self.round_names[round_code], self.events[event_code])
+                    transitions[key] = self.round_names[next_code]
+        return transitions
+
+    def to_json(self) -> Dict[str, Any]:
+        """Get the JSON representation of the table."""
+        return {
+            "digest": self.digest,
+            "round_names": list(self.round_names),
+            "events": list(self.events),
+            "table": self.table,
+            "background_start_events": list(self.background_start_events),
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "TransitionTable":
+        """Load the table from its JSON representation."""
+        return cls(
+            digest=data["digest"],
+            round_names=tuple(data["round_names"]),
+            events=tuple(data["events"]),
+            table=tuple(
+                tuple(tuple(row) for row in mode_table) for mode_table in data["table"]
+            ),
+            background_start_events=tuple(data["background_start_events"]),
+        )
+
+
+def _round_classes(abci_app_cls: Type[Any]) -> Set[Type[AbstractRound]]:
+    """Get the round classes of an app, including those of its background apps."""
+    bg_round_classes = {app.round_cls for app in abci_app_cls.background_apps}
+    return abci_app_cls.get_all_round_classes(bg_round_classes, True) | bg_round_classes
+
+
+def _round_names(transition_function: Dict[Any, Dict[Any, Any]]) -> Set[str]:
+    """Get the names of the rounds of a transition function."""
+    names = set()
+    for round_cls, transitions in transition_function.items():
+        names.add(round_cls.__name__)
+        names.update(next_round_cls.__name__ for next_round_cls in transitions.values())
+    return names
+
+
+def source_digest(abci_app_cls: Type[Any], specification: Path) -> str:
+    """Hash the sources of an app and of its specification."""
+    modules = {abci_app_cls.__module__} | {
+        round_cls.__module__ for round_cls in _round_classes(abci_app_cls)
+    }
+    digest = hashlib.sha256()
+    for module in sorted(modules):
+        digest.update(module.encode())
+        digest.update(Path(inspect.getfile(sys.modules[module])).read_bytes())
+    digest.update(specification.read_bytes())
+    return digest.hexdigest()
+
+
+def compile_transition_table(abci_app_cls: Type[Any], digest: str) -> TransitionTable:
+    """
+    Compile the transition functions of an app into a dense table.
+
+    In the first mode, i.e., the main app, the start events of the background apps are compiled
+    as transitions from every round, as they are resolved regardless of the current round.
+    Every background app with a transition function gets a mode of its own.
+
+    :param abci_app_cls: the app to compile.
+    :param digest: the hash of the sources of the app.
+    :return: the transition table.
+    """
+    bg_apps = [app for app in abci_app_cls.background_apps if app.transition_function]
+    transition_functions = [abci_app_cls.transition_function] + [
+        app.transition_function for app in bg_apps
+    ]
+    start_events = {
+        app.start_event: app for app in bg_apps if app.start_event is not None
+    }
+    main_rounds = _round_names(abci_app_cls.transition_function)
+    round_names = tuple(sorted(set().union(*map(_round_names, transition_functions))))
+    events = tuple(
+        sorted(
+            {
+                event.name
+                for transition_function in transition_functions
+                for transitions in transition_function.values()
+                for event in transitions
+            }
+        )
+    )
+
+    round_codes = {round_name: i for i, round_name in enumerate(round_names)}
+    event_codes = {event: i for i, event in enumerate(events)}
+    table = []
+    for transition_function in transition_functions:
+        mode_table = [[NO_TRANSITION] * len(events) for _ in round_names]
+        for round_cls, transitions in transition_function.items():
+            row = mode_table[round_codes[round_cls.__name__]]
+            for event, next_round_cls in transitions.items():
+                row[event_codes[event.name]] = round_codes[next_round_cls.__name__]
+        table.append(mode_table)
+
+    for start_event, app in start_events.items():
+        next_round_cls = app.transition_function[app.round_cls].get(start_event)
+        if next_round_cls is None:  # pragma: nocover
+            continue
+        for round_name in main_rounds:
+            table[MAIN_MODE][round_codes[round_name]][
+                event_codes[start_event.name]
+            ] = round_codes[next_round_cls.__name__]
+
+    return TransitionTable(
+        digest=digest,
+        round_names=round_names,
+        events=events,
+        table=tuple(tuple(map(tuple, mode_table)) for mode_table in table),
+        background_start_events=tuple(sorted(event.name for event in start_events)),
+    )
+
+
+def validate(table: TransitionTable, specification: Path) -> None:
+    """
+    Cross-check the main mode of a table against an FSM specification.
+
+    :param table: the transition table.
+    :param specification: the path to the `fsm_specification.yaml`.
+    """
+    with specification.open(encoding="utf-8") as file:
+        spec = yaml_load(file)
+
+    expected = {}
+    for key, next_state in spec["transition_func"].items():
+        state, event = (part.strip() for part in key.strip("()").split(","))
+        expected[(state, event)] = next_state
+    actual = {
+        key: next_state
+        for key, next_state in table.transitions(MAIN_MODE).items()
+        if key[1] not in table.background_start_events
+    }
+
+    missing = sorted(set(expected) - set(actual))
+    unexpected = sorted(set(actual) - set(expected))
+    different = sorted(
+        key for key in set(expected) & set(actual) if expected[key] != actual[key]
+    )
+    if missing or unexpected or different:
+        raise TransitionTableError(
+            "The transition table does not match the FSM specification: "
+            f"missing={missing}, unexpected={unexpected}, different={different}."
+        )
+
+    states = {state for state, _ in actual} | set(actual.values())
+    if states != set(spec["states"]):
+        raise TransitionTableError(
+            "The rounds of the transition table do not match the FSM specification: "
+            f"{sorted(states ^ set(spec['states']))}."
+        )
+
+
+def load_transition_table(
+    abci_app_cls: Type[Any],
+    cache_dir: Path,
+    specification: Path = FSM_SPECIFICATION_PATH,
+) -> TransitionTable:
+    """
+    Load the cached transition table of an app, compiling and validating it on a cache miss.
+
+    :param abci_app_cls: the app.
+    :param cache_dir: the directory of the cache.
+    :param specification: the path to the `fsm_specification.yaml` of the app.
+    :return: the transition table, bound to the round classes of the app.
+    """
+    digest = source_digest(abci_app_cls, specification)
+    cached = cache_dir / TABLE_FILE_NAME.format(digest=digest)
+
+    table: Optional[TransitionTable] = None
+    if cached.exists():
+        try:
+            table = TransitionTable.from_json(json.loads(cached.read_text()))
+        except (ValueError, KeyError, TypeError):
+            table = None
+    if table is None or table.digest != digest:
+        table = compile_transition_table(abci_app_cls, digest)
+        validate(table, specification)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(TABLE_FILE_GLOB):
+            stale.unlink()
+        cached.write_text(json.dumps(table.to_json()))
+
+    table.bind(_round_classes(abci_app_cls))
+    return table
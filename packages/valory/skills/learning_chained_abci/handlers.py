@@ -19,9 +19,6 @@
 
 """This module contains the handlers for the skill of LearningChainedAbciApp."""
 
-from packages.valory.skills.abstract_round_abci.handlers import (
-    ABCIRoundHandler as BaseABCIRoundHandler,
-)
 from packages.valory.skills.abstract_round_abci.handlers import (
     ContractApiHandler as BaseContractApiHandler,
 )
@@ -37,10 +34,11 @@ from packages.valory.skills.abstract_round_abci.handlers import (
 from packages.valory.skills.abstract_round_abci.handlers import (
     TendermintHandler as BaseTendermintHandler,
 )
+from packages.valory.skills.learning_abci.handlers import ABCIHandler as BaseABCIHandler
 from packages.valory.skills.learning_abci.handlers import HttpHandler as BaseHttpHandler
 
 
-ABCIHandler = BaseABCIRoundHandler
+ABCIHandler = BaseABCIHandler
 HttpHandler = BaseHttpHandler
 SigningHandler = BaseSigningHandler
 LedgerApiHandler = BaseLedgerApiHandler
@@ -19,6 +19,8 @@
 
 """This module contains the shared state for the abci skill of LearningChainedSkillAbciApp."""
 
+from typing import Any, List, Optional
+
 from packages.valory.skills.abstract_round_abci.models import (
     BenchmarkTool as BaseBenchmarkTool,
 )
@@ -32,6 +34,16 @@ from packages.valory.skills.learning_abci.rounds import Event as LearningEvent
 from packages.valory.skills.learning_chained_abci.composition import (
     LearningChainedSkillAbciApp,
 )
+from packages.valory.skills.learning_chained_abci.fsm_table import load_transition_table
+from packages.valory.skills.learning_chained_abci.period_log import (
+    PeriodLogSchema,
+    PeriodLogWriter,
+)
+from packages.valory.skills.learning_chained_abci.reset_policy import ResetPolicy
+from packages.valory.skills.learning_chained_abci.timeouts import (
+    ROUND_DURATIONS_KEY,
+    TimeoutAutotuner,
+)
 from packages.valory.skills.reset_pause_abci.rounds import Event as ResetPauseEvent
 from packages.valory.skills.termination_abci.models import TerminationParams
 
@@ -43,6 +55,8 @@ RandomnessApi = BaseRandomnessApi
 
 MARGIN = 5
 MULTIPLIER = 10
+PERIOD_LOG_DIR = "period_log"
+FSM_TABLE_DIR = "fsm"
 
 
 class SharedState(BaseSharedState):
@@ -50,6 +64,13 @@ class SharedState(BaseSharedState):
 
     abci_app_cls = LearningChainedSkillAbciApp  # type: ignore
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the state."""
+        super().__init__(*args, **kwargs)
+        self.period_log: Optional[PeriodLogWriter] = None
+        # the behaviour is re-entered when resetting Tendermint is retried
+        self.last_logged_period: Optional[int] = None
+
     def setup(self) -> None:
         """Set up."""
         super().setup()
@@ -66,9 +87,98 @@ class SharedState(BaseSharedState):
             self.context.params.round_timeout_seconds * MULTIPLIER
         )
 
+        params = self.context.params
+        if params.use_timeout_autotune:
+            LearningChainedSkillAbciApp.timeout_autotuner = TimeoutAutotuner(
+                events=tuple(params.timeout_autotune_events),
+                percentile=params.timeout_autotune_percentile,
+                margin=params.timeout_autotune_margin,
+                min_timeout=params.timeout_autotune_min_timeout,
+                min_samples=params.timeout_autotune_min_samples,
+                window=params.timeout_autotune_window,
+                apply=params.timeout_autotune_apply,
+            )
+
+        if params.use_adaptive_reset:
+            LearningChainedSkillAbciApp.reset_policy = ResetPolicy(
+                reset_cost=params.reset_cost_seconds,
+                baseline_periods=params.reset_baseline_periods,
+                max_block_store_bytes=params.reset_max_block_store_bytes,
+                block_overhead_bytes=params.reset_block_overhead_bytes,
+                max_history_rounds=params.reset_max_history_rounds,
+            )
+
+        LearningChainedSkillAbciApp.transition_table = load_transition_table(
+            LearningChainedSkillAbciApp,
+            self.context.params.store_path / FSM_TABLE_DIR,
+        )
+
+        if self.context.params.use_period_log:
+            self.setup_period_log()
+
+    def setup_period_log(self) -> None:
+        """Set up the writer of the period log."""
+        behaviours = type(self.context.behaviours.main).behaviours
+        schema = PeriodLogSchema.from_app(
+            LearningChainedSkillAbciApp,
+            (behaviour.auto_behaviour_id() for behaviour in behaviours),
+        )
+        self.period_log = PeriodLogWriter(
+            self.context.params.store_path / PERIOD_LOG_DIR,
+            schema,
+            self.context.params.period_log_max_bytes,
+        )
+
 
 class Params(  # pylint: disable=too-many-ancestors
     TerminationParams,
     LearningParams,
 ):
     """A model to represent params for multiple abci apps."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the parameters object."""
+        self.use_period_log = self._ensure("use_period_log", kwargs, bool)
+        self.period_log_max_bytes = self._ensure("period_log_max_bytes", kwargs, int)
+        self.use_timeout_autotune = self._ensure("use_timeout_autotune", kwargs, bool)
+        self.timeout_autotune_apply = self._ensure(
+            "timeout_autotune_apply", kwargs, bool
+        )
+        self.timeout_autotune_events = self._ensure(
+            "timeout_autotune_events", kwargs, List[str]
+        )
+        self.timeout_autotune_percentile = self._ensure(
+            "timeout_autotune_percentile", kwargs, float
+        )
+        self.timeout_autotune_margin = self._ensure(
+            "timeout_autotune_margin", kwargs, float
+        )
+        self.timeout_autotune_min_timeout = self._ensure(
+            "timeout_autotune_min_timeout", kwargs, float
+        )
+        self.timeout_autotune_min_samples = self._ensure(
+            "timeout_autotune_min_samples", kwargs, int
+        )
+        self.timeout_autotune_window = self._ensure(
+            "timeout_autotune_window", kwargs, int
+        )
+        self.use_price_prefetch = self._ensure("use_price_prefetch", kwargs, bool)
+        self.price_prefetch_lead = self._ensure("price_prefetch_lead", kwargs, float)
+        self.use_adaptive_reset = self._ensure("use_adaptive_reset", kwargs, bool)
+        self.reset_cost_seconds = self._ensure("reset_cost_seconds", kwargs, float)
+        self.reset_baseline_periods = self._ensure(
+            "reset_baseline_periods", kwargs, int
+        )
+        self.reset_max_block_store_bytes = self._ensure(
+            "reset_max_block_store_bytes", kwargs, int
+        )
+        self.reset_block_overhead_bytes = self._ensure(
+            "reset_block_overhead_bytes", kwargs, int
+        )
+        self.reset_max_history_rounds = self._ensure(
+            "reset_max_history_rounds", kwargs, int
+        )
+        super().__init__(*args, **kwargs)
+
+        # the durations of the rounds are persisted across periods, so they need an initial value
+        self.setup_params.setdefault(ROUND_DURATIONS_KEY, "")
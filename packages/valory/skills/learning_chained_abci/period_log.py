@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the columnar event log of the periods of LearningChainedSkillAbciApp.
+
+Every period is stored as one fixed-size binary record. A log is a directory of segments;
+each segment starts with a JSON header, describing the record layout and the code tables
+used to encode rounds, events and behaviours, followed by the raw records.
+Segments are append-only and rotated once they reach a configured size,
+so that the history can be memory mapped into NumPy arrays for offline analysis.
+A new segment is started whenever the schema changes, e.g., with the FSM of the app, and the
+segments of a log with several schemas are loaded re-encoded with the union of their schemas.
+"""
+
+import json
+import math
+import struct
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+import numpy as np
+
+
+MAGIC = b"LPLOG\x01"
+HEADER_LEN_FORMAT = "<I"
+SEGMENT_GLOB = "periods-*.bin"
+SEGMENT_NAME = "periods-{index:06d}.bin"
+MAX_ROUNDS = 64
+NO_CODE = 255
+TX_HASH_BYTES = 32
+NO_MAJORITY_EVENT = "NO_MAJORITY"
+TIMEOUT_EVENT_SUFFIX = "TIMEOUT"
+# the fields of a record which do not depend on the code tables of its schema
+REMAPPED_AS_IS = (
+    "period",
+    "timestamp",
+    "price",
+    "tx_hash",
+    "no_majority",
+    "timeouts",
+    "n_rounds",
+)
+
+
+class TruncatedSegmentError(ValueError):
+    """The header of a segment has been truncated, e.g., by a crash while the segment was started."""
+
+
+@dataclass
+class RoundEnd:
+    """A round which has ended, with the event it ended with."""
+
+    round_id: str
+    event: str
+
+
+@dataclass
+class PeriodStats:
+    """Keeps track of the rounds which have ended, grouped by period."""
+
+    rounds: Dict[int, List[RoundEnd]] = field(default_factory=dict)
+
+    def add(self, period: int, round_id: str, event: Enum) -> None:
+        """Record the end of a round."""
+        self.rounds.setdefault(period, []).append(RoundEnd(round_id, event.name))
+
+    def pop(self, period: int) -> List[RoundEnd]:
+        """Get the ended rounds of the given period, discarding any older periods."""
+        ended = self.rounds.pop(period, [])
+        for stale in [stale for stale in self.rounds if stale < period]:
+            del self.rounds[stale]
+        return ended
+
+
+@dataclass(frozen=True)
+class PeriodLogSchema:
+    """The code tables used to encode the records of a period log."""
+
+    round_ids: Tuple[str, ...]
+    events: Tuple[str, ...]
+    behaviour_ids: Tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        """Check that every code table fits the record's code type."""
+        for table in (self.round_ids, self.events):
+            if len(table) >= NO_CODE:
+                raise ValueError(f"Too many entries to encode: {len(table)}.")
+
+    @classmethod
+    def from_app(
+        cls, abci_app_cls: Type[Any], behaviour_ids: Iterable[str]
+    ) -> "PeriodLogSchema":
+        """Build the schema of an abci app, including its background apps."""
+        transition_functions = [abci_app_cls.transition_function] + [
+            app.transition_function or {} for app in abci_app_cls.background_apps
+        ]
+        rounds, events = set(), set()
+        for transition_function in transition_functions:
+            for round_cls, transitions in transition_function.items():
+                rounds.add(round_cls.auto_round_id())
+                rounds.update(next_.auto_round_id() for next_ in transitions.values())
+                events.update(event.name for event in transitions)
+        return cls(
+            tuple(sorted(rounds)), tuple(sorted(events)), tuple(sorted(behaviour_ids))
+        )
+
+    @classmethod
+    def union(cls, schemas: Iterable["PeriodLogSchema"]) -> "PeriodLogSchema":
+        """Build the schema encoding the entries of all the given schemas."""
+        schemas = list(schemas)
+        return cls(
+            tuple(sorted({round_id for s in schemas for round_id in s.round_ids})),
+            tuple(sorted({event for s in schemas for event in s.events})),
+            tuple(
+                sorted({behaviour for s in schemas for behaviour in s.behaviour_ids})
+            ),
+        )
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Get the record layout."""
+        n_behaviours = len(self.behaviour_ids)
+        return np.dtype(
+            [
+                ("period", "<u4"),
+                ("timestamp", "<f8"),
+                ("price", "<f8"),
+                ("decision", "u1"),
+                ("tx_hash", f"S{TX_HASH_BYTES}"),
+                ("no_majority", "<u2"),
+                ("timeouts", "<u2"),
+                ("n_rounds", "u1"),
+                ("rounds", "u1", (MAX_ROUNDS,)),
+                ("events", "u1", (MAX_ROUNDS,)),
+                ("local_time", "<f4", (n_behaviours,)),
+                ("consensus_time", "<f4", (n_behaviours,)),
+            ]
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        """Get the JSON representation of the schema."""
+        return {
+            "round_ids": list(self.round_ids),
+            "events": list(self.events),
+            "behaviour_ids": list(self.behaviour_ids),
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "PeriodLogSchema":
+        """Load the schema from its JSON representation."""
+        return cls(
+            tuple(data["round_ids"]),
+            tuple(data["events"]),
+            tuple(data["behaviour_ids"]),
+        )
+
+    def header(self) -> bytes:
+        """Get the header of a segment using this schema."""
+        encoded = json.dumps(self.to_json(), sort_keys=True).encode()
+        return MAGIC + struct.pack(HEADER_LEN_FORMAT, len(encoded)) + encoded
+
+    def encode(  # pylint: disable=too-many-arguments
+        self,
+        period: int,
+        timestamp: float,
+        price: Optional[float],
+        tx_hash: Optional[str],
+        ended_rounds: List[RoundEnd],
+        benchmarks: List[Dict[str, Any]],
+        decision_round_id: str,
+    ) -> np.ndarray:
+        """Encode the data of a period into a record."""
+        record = np.zeros(1, dtype=self.dtype)
+        record["period"] = period
+        record["timestamp"] = timestamp
+        record["price"] = math.nan if price is None else price
+        record["decision"] = NO_CODE
+        if tx_hash:
+            hex_hash = tx_hash[2:] if tx_hash.startswith("0x") else tx_hash
+            record["tx_hash"] = bytes.fromhex(hex_hash)[:TX_HASH_BYTES]
+
+        record["rounds"] = NO_CODE
+        record["events"] = NO_CODE
+        kept = ended_rounds[-MAX_ROUNDS:]
+        record["n_rounds"] = len(kept)
+        for i, ended in enumerate(kept):
+            record["rounds"][0, i] = self._code(self.round_ids, ended.round_id)
+            record["events"][0, i] = self._code(self.events, ended.event)
+            if ended.round_id == decision_round_id:
+                record["decision"] = record["events"][0, i]
+        record["no_majority"] = sum(
+            ended.event == NO_MAJORITY_EVENT for ended in ended_rounds
+        )
+        record["timeouts"] = sum(
+            ended.event.endswith(TIMEOUT_EVENT_SUFFIX) for ended in ended_rounds
+        )
+
+        record["local_time"] = math.nan
+        record["consensus_time"] = math.nan
+        for benchmark in benchmarks:
+            if benchmark["behaviour"] not in self.behaviour_ids:
+                continue
+            i = self.behaviour_ids.index(benchmark["behaviour"])
+            record["local_time"][0, i] = benchmark["data"].get("local", math.nan)
+            record["consensus_time"][0, i] = benchmark["data"].get(
+                "consensus", math.nan
+            )
+        return record
+
+    def remap(self, records: np.ndarray, schema: "PeriodLogSchema") -> np.ndarray:
+        """
+        Re-encode records of another schema with the code tables of this schema.
+
+        :param records: the records.
+        :param schema: the schema the records were encoded with.
+        :return: the re-encoded records, which are the given ones if the schemas are the same.
+        """
+        if schema == self:
+            return records
+        remapped = np.zeros(len(records), dtype=self.dtype)
+        for name in REMAPPED_AS_IS:
+            remapped[name] = records[name]
+        round_codes = self._lookup(schema.round_ids, self.round_ids)
+        event_codes = self._lookup(schema.events, self.events)
+        remapped["rounds"] = round_codes[records["rounds"]]
+        remapped["events"] = event_codes[records["events"]]
+        remapped["decision"] = event_codes[records["decision"]]
+
+        remapped["local_time"] = math.nan
+        remapped["consensus_time"] = math.nan
+        for i, behaviour_id in enumerate(schema.behaviour_ids):
+            if behaviour_id not in self.behaviour_ids:
+                continue
+            j = self.behaviour_ids.index(behaviour_id)
+            remapped["local_time"][:, j] = records["local_time"][:, i]
+            remapped["consensus_time"][:, j] = records["consensus_time"][:, i]
+        return remapped
+
+    @classmethod
+    def _lookup(cls, source: Tuple[str, ...], target: Tuple[str, ...]) -> np.ndarray:
+        """Get the table translating the codes of a source table into those of a target table."""
+        lookup = np.full(NO_CODE + 1, NO_CODE, dtype="u1")
+        for code, value in enumerate(source):
+            lookup[code] = cls._code(target, value)
+        return lookup
+
+    @staticmethod
+    def _code(table: Tuple[str, ...], value: str) -> int:
+        """Get the code of a value, or the code reserved for unknown values."""
+        return table.index(value) if value in table else NO_CODE
+
+
+class PeriodLogWriter:
+    """An append-only, size-rotated writer of period records."""
+
+    def __init__(self, log_dir: Path, schema: PeriodLogSchema, max_bytes: int) -> None:
+        """Initialize the writer."""
+        self.log_dir = log_dir
+        self.schema = schema
+        self.max_bytes = max_bytes
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._segment = self._last_segment()
+
+    def _segments(self) -> List[Path]:
+        """Get the existing segments, oldest first."""
+        return sorted(self.log_dir.glob(SEGMENT_GLOB))
+
+    def _last_segment(self) -> Path:
+        """Get the segment to append to, starting a new one if the latest is not compatible."""
+        segments = self._segments()
+        if not segments:
+            return self._new_segment(0)
+        last = segments[-1]
+        try:
+            schema, offset = read_header(last)
+        except ValueError:
+            # a segment which is not readable, e.g., truncated, is not appended to
+            schema, offset = None, 0
+        if schema != self.schema:
+            return self._new_segment(len(segments))
+
+        # drop a partially written record, e.g., left behind by a crash
+        partial = (last.stat().st_size - offset) % self.schema.dtype.itemsize
+        if partial:
+            with last.open("r+b") as segment:
+                segment.truncate(last.stat().st_size - partial)
+        return last
+
+    def _new_segment(self, index: int) -> Path:
+        """Start a new segment."""
+        segment = self.log_dir / SEGMENT_NAME.format(index=index)
+        segment.write_bytes(self.schema.header())
+        return segment
+
+    def append(self, record: np.ndarray) -> None:
+        """Append a record, rotating the segment if it would grow beyond the limit."""
+        data = record.astype(self.schema.dtype).tobytes()
+        if self._segment.stat().st_size + len(data) > self.max_bytes:
+            index = int(self._segment.stem.rsplit("-", 1)[-1]) + 1
+            self._segment = self._new_segment(index)
+        with self._segment.open("ab") as segment:
+            segment.write(data)
+
+
+def read_header(segment: Path) -> Tuple[PeriodLogSchema, int]:
+    """Read the header of a segment, returning its schema and the offset of the records."""
+    length_size = struct.calcsize(HEADER_LEN_FORMAT)
+    with segment.open("rb") as file:
+        magic = file.read(len(MAGIC))
+        if not MAGIC.startswith(magic):
+            raise ValueError(f"{segment} is not a period log segment.")
+        length_bytes = file.read(length_size)
+        if len(magic) < len(MAGIC) or len(length_bytes) < length_size:
+            raise TruncatedSegmentError(f"The header of {segment} is truncated.")
+        (length,) = struct.unpack(HEADER_LEN_FORMAT, length_bytes)
+        encoded = file.read(length)
+        if len(encoded) < length:
+            raise TruncatedSegmentError(f"The header of {segment} is truncated.")
+        schema = PeriodLogSchema.from_json(json.loads(encoded))
+    return schema, len(MAGIC) + length_size + length
+
+
+def read_period_log(log_dir: Path) -> List[Tuple[PeriodLogSchema, np.ndarray]]:
+    """
+    Memory map every segment of a period log.
+
+    :param log_dir: the directory of the period log.
+    :return: the schema and the read-only structured array of every segment, oldest first.
+    """
+    segments = []
+    for segment in sorted(log_dir.glob(SEGMENT_GLOB)):
+        try:
+            schema, offset = read_header(segment)
+        except TruncatedSegmentError:
+            # the segment holds no records
+            continue
+        n_records = (segment.stat().st_size - offset) // schema.dtype.itemsize
+        records = (
+            np.memmap(
+                segment, dtype=schema.dtype, mode="r", offset=offset, shape=(n_records,)
+            )
+            if n_records
+            else np.zeros(0, dtype=schema.dtype)
+        )
+        segments.append((schema, records))
+    return segments
+
+
+def load_period_log(log_dir: Path) -> Tuple[Optional[PeriodLogSchema], np.ndarray]:
+    """
+    Load a period log into a single structured array.
+
+    The records of segments with different schemas are re-encoded with the union of the schemas.
+    A log with a single segment is returned memory mapped, without copying.
+
+    :param log_dir: the directory of the period log.
+    :return: the schema of the records and the records.
+    """
+    segments = read_period_log(log_dir)
+    if not segments:
+        return None, np.zeros(0)
+    schema = PeriodLogSchema.union(segment_schema for segment_schema, _ in segments)
+    arrays = [
+        schema.remap(records, segment_schema)
+        for segment_schema, records in segments
+        if len(records)
+    ]
+    if len(arrays) == 1:
+        return schema, arrays[0]
+    if not arrays:
+        return schema, np.zeros(0, dtype=schema.dtype)
+    return schema, np.concatenate(arrays)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the policy deciding when to reset Tendermint.
+
+A reset stalls the service for about `reset_cost` seconds, while not resetting lets the block
+store and the history kept in memory grow, which slows the periods down. The policy resets once
+the time lost to the slowdown since the last reset adds up to the cost of a reset, i.e., the
+rent-or-buy rule, which never loses more than twice the time an oracle would. The slowdown of a
+period is its duration over the baseline, i.e., the mean duration of the first periods after a
+reset. Regardless of the slowdown, the policy resets when the estimated size of the block store
+or the number of rounds since the last reset reach their limits.
+
+The inputs are measured from what every agent agrees on: the durations are in block time, and
+the block store is estimated from the blocks and the transactions the app has processed. All of
+them are counted from the last reset, i.e., from the start of the chain of Tendermint, so an
+agent which restarts rebuilds the same inputs from the blocks Tendermint replays, and every agent
+takes the same decision in the same period. The number of rounds kept in the history of the app
+is not an input, as an agent which restarts does not rebuild the history kept across the reset.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class ResetPolicy:  # pylint: disable=too-many-instance-attributes
+    """Measures the growth since the last reset of Tendermint and decides when to reset it."""
+
+    reset_cost: float
+    baseline_periods: int
+    max_block_store_bytes: int
+    block_overhead_bytes: int
+    max_history_rounds: int
+    blocks: int = 0
+    transaction_bytes: int = 0
+    rounds: int = 0
+    durations: List[float] = field(default_factory=list)
+
+    def record_block(self) -> None:
+        """Record a block."""
+        self.blocks += 1
+
+    def record_transaction(self, size: int) -> None:
+        """Record a transaction delivered in a block, of the given size in bytes."""
+        self.transaction_bytes += size
+
+    def record_round(self) -> None:
+        """Record a round which has ended."""
+        self.rounds += 1
+
+    def record_period(self, duration: float) -> None:
+        """Record the duration of a period, in block time."""
+        self.durations.append(duration)
+
+    @property
+    def block_store_bytes(self) -> int:
+        """Estimate the size of the block store."""
+        return self.blocks * self.block_overhead_bytes + self.transaction_bytes
+
+    @property
+    def baseline(self) -> Optional[float]:
+        """Get the baseline duration of a period, once enough periods have been recorded."""
+        if len(self.durations) < self.baseline_periods:
+            return None
+        return sum(self.durations[: self.baseline_periods]) / self.baseline_periods
+
+    @property
+    def slowdown(self) -> float:
+        """Get the time lost to the slowdown of the periods since the baseline."""
+        baseline = self.baseline
+        if baseline is None:
+            return 0.0
+        return sum(
+            max(duration - baseline, 0.0)
+            for duration in self.durations[self.baseline_periods :]
+        )
+
+    def decide(self) -> Optional[str]:
+        """
+        Decide whether to reset at the end of the current period.
+
+        :return: the reason to reset, or `None` if a reset does not pay off yet.
+        """
+        if self.block_store_bytes >= self.max_block_store_bytes:
+            return f"the block store is estimated at {self.block_store_bytes} bytes"
+        if self.rounds >= self.max_history_rounds:
+            return f"{self.rounds} rounds have ended since the last reset"
+        slowdown = self.slowdown
+        if slowdown >= self.reset_cost:
+            return f"the periods have slowed down by {slowdown:.1f}s in total"
+        return None
+
+    def reset(self) -> None:
+        """Clear the measurements, after a reset."""
+        self.blocks = 0
+        self.transaction_bytes = 0
+        self.rounds = 0
+        self.durations.clear()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the precompiled transition table."""
+
+from pathlib import Path
+
+import pytest
+
+from packages.valory.skills.learning_chained_abci.composition import (
+    LearningChainedSkillAbciApp,
+)
+from packages.valory.skills.learning_chained_abci.fsm_table import (
+    MAIN_MODE,
+    TABLE_FILE_GLOB,
+    TransitionTableError,
+    compile_transition_table,
+    load_transition_table,
+    validate,
+)
+
+
+APP = LearningChainedSkillAbciApp
+BG_APPS = [app for app in APP.background_apps if app.transition_function]
+
+
+def test_equivalence(tmp_path: Path) -> None:
+    """The table resolves every transition of the app and of its background apps as they do."""
+    table = load_transition_table(APP, tmp_path)
+    transition_functions = [APP.transition_function] + [
+        app.transition_function for app in BG_APPS
+    ]
+    for mode, transition_function in enumerate(transition_functions):
+        for round_cls, transitions in transition_function.items():
+            for event, next_round_cls in transitions.items():
+                assert table.next_round(round_cls, event, mode) is next_round_cls
+
+    n_transitions = sum(
+        len(transitions) for transitions in APP.transition_function.values()
+    )
+    background = [
+        key
+        for key in table.transitions(MAIN_MODE)
+        if key[1] in table.background_start_events
+    ]
+    assert len(table.transitions(MAIN_MODE)) - len(background) == n_transitions
+
+
+def test_no_transition(tmp_path: Path) -> None:
+    """An event without a transition from a round resolves to no round."""
+    table = load_transition_table(APP, tmp_path)
+    events = {event for t in APP.transition_function.values() for event in t}
+    for round_cls, transitions in APP.transition_function.items():
+        # the events are encoded by name, as those of different skills share their names
+        names = {event.name for event in transitions} | set(
+            table.background_start_events
+        )
+        for event in events:
+            if event.name not in names:
+                assert table.next_round(round_cls, event) is None
+
+
+def test_background_start_events(tmp_path: Path) -> None:
+    """The start events of the background apps are resolved from every round of the main app."""
+    table = load_transition_table(APP, tmp_path)
+    start_apps = [app for app in BG_APPS if app.start_event is not None]
+    assert start_apps
+    for app in start_apps:
+        expected = app.transition_function[app.round_cls][app.start_event]
+        for round_cls in APP.transition_function:
+            assert table.next_round(round_cls, app.start_event) is expected
+
+
+def test_cache(tmp_path: Path) -> None:
+    """A table is compiled once, and recompiled if its cache is not readable."""
+    load_transition_table(APP, tmp_path)
+    (cached,) = tmp_path.glob(TABLE_FILE_GLOB)
+    content = cached.read_text()
+    load_transition_table(APP, tmp_path)
+    assert cached.read_text() == content
+
+    cached.write_text("{")
+    table = load_transition_table(APP, tmp_path)
+    assert cached.read_text() == content
+    initial_event, next_round_cls = next(
+        iter(APP.transition_function[APP.initial_round_cls].items())
+    )
+    assert table.next_round(APP.initial_round_cls, initial_event) is next_round_cls
+
+
+def test_validation(tmp_path: Path) -> None:
+    """A table which does not match the FSM specification is rejected."""
+    table = compile_transition_table(APP, "digest")
+    specification = tmp_path / "fsm_specification.yaml"
+    specification.write_text(
+        "alphabet_in: []\ndefault_start_state: A\nfinal_states: []\n"
+        "label: App\nstart_states: []\nstates: [A]\ntransition_func: {}\n"
+    )
+    with pytest.raises(TransitionTableError):
+        validate(table, specification)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the columnar event log of the periods."""
+
+import math
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from packages.valory.skills.learning_chained_abci.period_log import (
+    MAX_ROUNDS,
+    NO_CODE,
+    PeriodLogSchema,
+    PeriodLogWriter,
+    RoundEnd,
+    SEGMENT_NAME,
+    TruncatedSegmentError,
+    load_period_log,
+    read_header,
+)
+
+
+SCHEMA = PeriodLogSchema(
+    round_ids=("decision_making", "reset_and_pause", "tx_preparation"),
+    events=("DONE", "NO_MAJORITY", "ROUND_TIMEOUT", "TRANSACT"),
+    behaviour_ids=("decision_making", "tx_preparation"),
+)
+TX_HASH = "0x" + "ab" * 32
+
+
+def encode(period: int) -> np.ndarray:
+    """Encode a period which transacts, after a round without a majority."""
+    return SCHEMA.encode(
+        period=period,
+        timestamp=1000.0 + period,
+        price=1.5,
+        tx_hash=TX_HASH,
+        ended_rounds=[
+            RoundEnd("decision_making", "NO_MAJORITY"),
+            RoundEnd("decision_making", "TRANSACT"),
+            RoundEnd("tx_preparation", "ROUND_TIMEOUT"),
+            RoundEnd("unknown", "DONE"),
+        ],
+        benchmarks=[
+            {"behaviour": "tx_preparation", "data": {"local": 0.25, "consensus": 2.0}},
+            {"behaviour": "unknown", "data": {"local": 1.0}},
+        ],
+        decision_round_id="decision_making",
+    )
+
+
+def decode(schema: PeriodLogSchema, record: np.void) -> List[Tuple[Optional[str], str]]:
+    """Decode the rounds which have ended in a period, and their events."""
+    rounds = record["rounds"][: record["n_rounds"]]
+    events = record["events"][: record["n_rounds"]]
+    return [
+        (
+            None if round_code == NO_CODE else schema.round_ids[round_code],
+            schema.events[event_code],
+        )
+        for round_code, event_code in zip(rounds, events)
+    ]
+
+
+def write(log_dir: Path, periods: range, max_bytes: int = 10**6) -> PeriodLogWriter:
+    """Write the records of some periods to a log."""
+    writer = PeriodLogWriter(log_dir, SCHEMA, max_bytes)
+    for period in periods:
+        writer.append(encode(period))
+    return writer
+
+
+def test_encode() -> None:
+    """A period is encoded with codes for its rounds, events and behaviours."""
+    record = encode(7)[0]
+    assert record["period"] == 7
+    assert record["price"] == 1.5
+    assert record["tx_hash"] == bytes.fromhex(TX_HASH[2:])
+    assert record["n_rounds"] == 4
+    assert record["rounds"][:4].tolist() == [0, 0, 2, NO_CODE]
+    assert record["events"][:4].tolist() == [1, 3, 2, 0]
+    assert (record["rounds"][4:] == NO_CODE).all()
+    # the decision is the event of the last decision round
+    assert record["decision"] == SCHEMA.events.index("TRANSACT")
+    assert record["no_majority"] == 1
+    assert record["timeouts"] == 1
+    assert math.isnan(record["local_time"][0])
+    assert record["local_time"][1] == 0.25
+    assert record["consensus_time"][1] == 2.0
+
+
+def test_encode_missing_data() -> None:
+    """A period without a price, a transaction or a decision is encoded with placeholders."""
+    ended_rounds = [RoundEnd("reset_and_pause", "DONE")] * (MAX_ROUNDS + 1)
+    record = SCHEMA.encode(1, 0.0, None, None, ended_rounds, [], "decision_making")[0]
+    assert math.isnan(record["price"])
+    assert record["tx_hash"] == b""
+    assert record["decision"] == NO_CODE
+    assert record["n_rounds"] == MAX_ROUNDS
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    """The records read back are the ones written, with the schema of the log."""
+    write(tmp_path, range(5))
+    schema, records = load_period_log(tmp_path)
+    assert schema == SCHEMA
+    assert records["period"].tolist() == list(range(5))
+    assert records[2:3].tobytes() == encode(2).tobytes()
+
+
+def test_rotation(tmp_path: Path) -> None:
+    """Segments are rotated once full, and are read back as a single log."""
+    max_bytes = len(SCHEMA.header()) + 2 * SCHEMA.dtype.itemsize
+    write(tmp_path, range(5), max_bytes)
+    assert len(list(tmp_path.iterdir())) == 3
+    _, records = load_period_log(tmp_path)
+    assert records["period"].tolist() == list(range(5))
+
+
+def test_schema_change(tmp_path: Path) -> None:
+    """A writer with a different schema starts a new segment, and the log is loaded with the union of the schemas."""
+    write(tmp_path, range(2))
+    other = PeriodLogSchema(
+        round_ids=("decision_making", "reset_and_pause", "settlements"),
+        events=("DONE", "NONE", "TRANSACT"),
+        behaviour_ids=("decision_making", "settlements"),
+    )
+    writer = PeriodLogWriter(tmp_path, other, 10**6)
+    ended_rounds = [
+        RoundEnd("decision_making", "TRANSACT"),
+        RoundEnd("settlements", "NONE"),
+    ]
+    benchmarks = [{"behaviour": "settlements", "data": {"local": 0.5}}]
+    writer.append(
+        other.encode(2, 0.0, 1.0, None, ended_rounds, benchmarks, "decision_making")
+    )
+    assert len(list(tmp_path.iterdir())) == 2
+
+    schema, records = load_period_log(tmp_path)
+    assert schema == PeriodLogSchema.union([SCHEMA, other])
+    assert schema is not None
+    assert records["period"].tolist() == [0, 1, 2]
+    assert decode(schema, records[0]) == [
+        ("decision_making", "NO_MAJORITY"),
+        ("decision_making", "TRANSACT"),
+        ("tx_preparation", "ROUND_TIMEOUT"),
+        (None, "DONE"),
+    ]
+    assert decode(schema, records[2]) == [
+        ("decision_making", "TRANSACT"),
+        ("settlements", "NONE"),
+    ]
+    assert [schema.events[record["decision"]] for record in records] == ["TRANSACT"] * 3
+    # the behaviours are decision_making, settlements and tx_preparation
+    np.testing.assert_array_equal(records[0]["local_time"], [math.nan, math.nan, 0.25])
+    np.testing.assert_array_equal(records[2]["local_time"], [math.nan, 0.5, math.nan])
+
+
+def test_truncated_record(tmp_path: Path) -> None:
+    """A partially written record is dropped by the next writer."""
+    write(tmp_path, range(3))
+    segment = tmp_path / SEGMENT_NAME.format(index=0)
+    with segment.open("r+b") as file:
+        file.truncate(segment.stat().st_size - 5)
+
+    _, records = load_period_log(tmp_path)
+    assert records["period"].tolist() == [0, 1]
+    write(tmp_path, range(3, 4))
+    _, records = load_period_log(tmp_path)
+    assert records["period"].tolist() == [0, 1, 3]
+
+
+@pytest.mark.parametrize("header_bytes", [0, 3, 8, 20])
+def test_truncated_header(tmp_path: Path, header_bytes: int) -> None:
+    """A segment with a truncated header is skipped by readers and not appended to."""
+    write(tmp_path, range(2))
+    segment = tmp_path / SEGMENT_NAME.format(index=1)
+    segment.write_bytes(SCHEMA.header()[:header_bytes])
+    with pytest.raises(TruncatedSegmentError):
+        read_header(segment)
+
+    _, records = load_period_log(tmp_path)
+    assert records["period"].tolist() == [0, 1]
+    write(tmp_path, range(2, 3))
+    _, records = load_period_log(tmp_path)
+    assert records["period"].tolist() == [0, 1, 2]
+
+
+def test_not_a_segment(tmp_path: Path) -> None:
+    """A file which is not a segment is rejected."""
+    segment = tmp_path / SEGMENT_NAME.format(index=0)
+    segment.write_bytes(b"not a period log")
+    with pytest.raises(ValueError, match="not a period log segment"):
+        read_header(segment)
+    with pytest.raises(ValueError):
+        load_period_log(tmp_path)
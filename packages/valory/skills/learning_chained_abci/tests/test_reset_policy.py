@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the policy deciding when to reset Tendermint."""
+
+from typing import List, Optional, Tuple
+
+from packages.valory.skills.learning_chained_abci.reset_policy import ResetPolicy
+
+
+# a period, as the blocks it takes, the size of its transactions and its rounds
+Period = Tuple[int, List[int], int]
+
+
+def make_policy(reset_cost: float = 10.0) -> ResetPolicy:
+    """Make a policy with limits which are not reached by the tests, unless configured."""
+    return ResetPolicy(
+        reset_cost=reset_cost,
+        baseline_periods=2,
+        max_block_store_bytes=10**9,
+        block_overhead_bytes=100,
+        max_history_rounds=10**6,
+    )
+
+
+def run_period(policy: ResetPolicy, period: Period, block_time: float) -> Optional[str]:
+    """Feed a period to the policy, as the app does, returning its decision."""
+    blocks, transactions, rounds = period
+    for _ in range(blocks):
+        policy.record_block()
+    for size in transactions:
+        policy.record_transaction(size)
+    for _ in range(rounds):
+        policy.record_round()
+    policy.record_period(blocks * block_time)
+    return policy.decide()
+
+
+def test_rent_or_buy() -> None:
+    """The policy resets once the time lost to the slowdown adds up to the cost of a reset."""
+    policy = make_policy(reset_cost=10.0)
+    decisions = [
+        run_period(policy, (blocks, [], 5), block_time=1.0)
+        for blocks in (10, 10, 14, 14, 13)
+    ]
+    # the first two periods are the baseline of 10s, then 4s, 8s and 11s are lost
+    assert decisions[:4] == [None] * 4
+    assert decisions[4] is not None and "slowed down" in decisions[4]
+
+
+def test_limits() -> None:
+    """The policy resets when the block store or the rounds since the last reset reach their limits."""
+    policy = make_policy()
+    policy.max_block_store_bytes = 1000
+    assert run_period(policy, (5, [400], 1), block_time=1.0) is None
+    assert "block store" in str(run_period(policy, (1, [100], 1), block_time=1.0))
+
+    policy = make_policy()
+    policy.max_history_rounds = 10
+    assert run_period(policy, (1, [], 9), block_time=1.0) is None
+    assert "rounds" in str(run_period(policy, (1, [], 1), block_time=1.0))
+
+
+def test_restarted_agent_takes_the_same_decisions() -> None:
+    """An agent which restarts on the chain of the last reset decides as the agents which went through the reset."""
+    before_reset: List[Period] = [(10, [200] * 4, 6), (12, [300] * 4, 6), (15, [], 8)]
+    after_reset: List[Period] = [
+        (10, [200] * 4, 6),
+        (11, [250] * 4, 6),
+        (17, [200], 9),
+        (19, [200], 9),
+    ]
+
+    peer = make_policy(reset_cost=7.0)
+    for period in before_reset:
+        run_period(peer, period, block_time=0.5)
+    # the app clears the policy once Tendermint has been reset
+    peer.reset()
+    peer_decisions = [
+        run_period(peer, period, block_time=0.5) for period in after_reset
+    ]
+
+    # the restarted agent only processes the blocks Tendermint replays, i.e., the new chain
+    restarted = make_policy(reset_cost=7.0)
+    restarted_decisions = [
+        run_period(restarted, period, block_time=0.5) for period in after_reset
+    ]
+
+    assert peer_decisions[-1] is not None
+    assert restarted_decisions == peer_decisions
+    assert restarted == peer
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the autotuning of the round timeouts."""
+
+import datetime
+import logging
+from typing import Any, Dict, Type
+from unittest.mock import MagicMock
+
+import pytest
+
+import packages.valory.skills.reset_pause_abci.rounds as ResetAndPauseAbci
+from packages.valory.skills.abstract_round_abci.base import (
+    AbciAppDB,
+    BaseSynchronizedData,
+)
+from packages.valory.skills.learning_abci.rounds import (
+    APICheckRound,
+    DecisionMakingRound,
+    Event,
+)
+from packages.valory.skills.learning_chained_abci.composition import (
+    LearningChainedSkillAbciApp,
+)
+from packages.valory.skills.learning_chained_abci.timeouts import (
+    ROUND_DURATIONS_KEY,
+    TimeoutAutotuner,
+)
+
+
+DEFAULT_TIMEOUT = 30.0
+TRANSITION_FUNCTION: Dict[Type[Any], Dict[Event, Type[Any]]] = {
+    APICheckRound: {
+        Event.DONE: DecisionMakingRound,
+        Event.ROUND_TIMEOUT: APICheckRound,
+    },
+    DecisionMakingRound: {
+        Event.DONE: APICheckRound,
+        Event.ROUND_TIMEOUT: DecisionMakingRound,
+    },
+}
+
+
+def make_autotuner(apply: bool = False) -> TimeoutAutotuner:
+    """Make an autotuner proposing the 90th percentile of the last 10 durations."""
+    return TimeoutAutotuner(
+        events=("ROUND_TIMEOUT",),
+        percentile=90.0,
+        margin=2.0,
+        min_timeout=5.0,
+        min_samples=5,
+        window=10,
+        apply=apply,
+    )
+
+
+def record(autotuner: TimeoutAutotuner, *durations: float) -> None:
+    """Record the same durations for both rounds."""
+    for duration in durations:
+        for round_cls in TRANSITION_FUNCTION:
+            autotuner.record(round_cls, Event.DONE, duration)
+
+
+def propose(autotuner: TimeoutAutotuner) -> Dict[Event, float]:
+    """Propose a timeout, starting from the default one."""
+    return autotuner.propose(
+        TRANSITION_FUNCTION, {Event.ROUND_TIMEOUT: DEFAULT_TIMEOUT}
+    )
+
+
+def test_record() -> None:
+    """Durations are rounded and kept within the window, and negative ones are ignored."""
+    autotuner = make_autotuner()
+    autotuner.record(APICheckRound, Event.DONE, -1.0)
+    assert autotuner.durations == {}
+    for duration in range(12):
+        autotuner.record(APICheckRound, Event.DONE, duration + 0.12345)
+    autotuner.record(APICheckRound, Event.ROUND_TIMEOUT, DEFAULT_TIMEOUT)
+    samples = list(autotuner.durations[APICheckRound])
+    assert samples[0] == 3.123
+    assert samples[-1] is None
+    assert len(samples) == 10
+
+
+def test_propose() -> None:
+    """The timeout is the percentile of the durations plus the margin, within the bounds."""
+    autotuner = make_autotuner()
+    record(autotuner, 1.0, 2.0, 3.0, 4.0)
+    # not enough samples yet
+    assert propose(autotuner) == {}
+
+    # the slowest round is above the percentile, and the proposal is rounded up
+    record(autotuner, *[5.5] * 5, 10.5)
+    assert propose(autotuner) == {Event.ROUND_TIMEOUT: 8.0}
+    record(autotuner, *[0.5] * 10)
+    assert propose(autotuner) == {Event.ROUND_TIMEOUT: 5.0}
+    record(autotuner, *[100.0] * 10)
+    assert propose(autotuner) == {Event.ROUND_TIMEOUT: DEFAULT_TIMEOUT}
+
+
+def test_propose_fits_every_round() -> None:
+    """The timeout of an event fits the slowest of the rounds which may end on it."""
+    autotuner = make_autotuner()
+    for _ in range(10):
+        autotuner.record(APICheckRound, Event.DONE, 1.0)
+        autotuner.record(DecisionMakingRound, Event.DONE, 12.0)
+    assert propose(autotuner) == {Event.ROUND_TIMEOUT: 14.0}
+
+
+def test_censored_samples() -> None:
+    """Rounds which time out are not left out, and back the event off to its default timeout."""
+    autotuner = make_autotuner()
+    record(autotuner, *[3.0] * 10)
+    assert propose(autotuner) == {Event.ROUND_TIMEOUT: 5.0}
+
+    # a timeout within the tail of the percentile does not change the proposal
+    autotuner.record(DecisionMakingRound, Event.ROUND_TIMEOUT, 5.0)
+    assert propose(autotuner) == {Event.ROUND_TIMEOUT: 5.0}
+    # the rounds which are cut off by the tuned timeout back it off
+    autotuner.record(DecisionMakingRound, Event.ROUND_TIMEOUT, 5.0)
+    assert propose(autotuner) == {Event.ROUND_TIMEOUT: DEFAULT_TIMEOUT}
+
+    # and the timeout is tuned again once the rounds end in time
+    for _ in range(9):
+        autotuner.record(DecisionMakingRound, Event.DONE, 20.0)
+    assert propose(autotuner) == {Event.ROUND_TIMEOUT: 22.0}
+
+
+@pytest.mark.parametrize("apply", [True, False])
+def test_tune(apply: bool) -> None:
+    """The changed timeouts are returned, and applied only if configured to."""
+    autotuner = make_autotuner(apply)
+    event_to_timeout = {Event.ROUND_TIMEOUT: DEFAULT_TIMEOUT}
+    assert autotuner.tune(TRANSITION_FUNCTION, event_to_timeout) is None
+
+    record(autotuner, *[3.0] * 10)
+    changes = autotuner.tune(TRANSITION_FUNCTION, event_to_timeout)
+    assert changes == {Event.ROUND_TIMEOUT: 5.0}
+    assert event_to_timeout[Event.ROUND_TIMEOUT] == (5.0 if apply else DEFAULT_TIMEOUT)
+    # the default timeout is the one the autotuner started from
+    assert autotuner.defaults[Event.ROUND_TIMEOUT] == DEFAULT_TIMEOUT
+    assert (autotuner.tune(TRANSITION_FUNCTION, event_to_timeout) is None) is apply
+
+
+def test_serialization() -> None:
+    """The durations survive their serialization, censored samples included."""
+    autotuner = make_autotuner()
+    record(autotuner, 1.5, 2.25)
+    autotuner.record(APICheckRound, Event.ROUND_TIMEOUT, DEFAULT_TIMEOUT)
+    serialized = autotuner.serialize_durations()
+
+    restored = make_autotuner()
+    restored.load_durations(serialized, [APICheckRound])
+    assert restored.durations == {APICheckRound: autotuner.durations[APICheckRound]}
+    restored.load_durations(serialized, TRANSITION_FUNCTION)
+    assert restored.serialize_durations() == serialized
+    restored.load_durations("", TRANSITION_FUNCTION)
+    assert restored.durations == {}
+
+
+def make_app(monkeypatch: pytest.MonkeyPatch) -> LearningChainedSkillAbciApp:
+    """Make the chained app of an agent, with an autotuner of its own."""
+    monkeypatch.setattr(
+        LearningChainedSkillAbciApp, "timeout_autotuner", make_autotuner()
+    )
+    keys = LearningChainedSkillAbciApp.cross_period_persisted_keys
+    db = AbciAppDB(
+        setup_data=AbciAppDB.data_to_lists(
+            {key: "" for key in keys | AbciAppDB.default_cross_period_keys}
+        ),
+        cross_period_persisted_keys=keys,
+    )
+    app = LearningChainedSkillAbciApp(
+        BaseSynchronizedData(db), logging.getLogger(), MagicMock()
+    )
+    app.setup()
+    return app
+
+
+def test_durations_are_stored_by_the_reset_round(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The durations are stored when the reset round ends the period, and loaded by a restarted agent."""
+    app = make_app(monkeypatch)
+    start = datetime.datetime(2024, 1, 1)
+    app.update_time(start)
+    app.schedule_round(DecisionMakingRound)
+    app.update_time(start + datetime.timedelta(seconds=3))
+    app.process_event(Event.DONE, app.synchronized_data)
+    db = app.synchronized_data.db
+    assert db.get(ROUND_DURATIONS_KEY, None) == ""
+
+    app.process_event(ResetAndPauseAbci.Event.DONE, app.synchronized_data.create())
+    stored = db.get(ROUND_DURATIONS_KEY, None)
+    assert stored == app.timeout_autotuner.serialize_durations()
+    assert '"decision_making_round":[3.0]' in stored
+
+    # an agent which restarts loads the durations at the start of the next period
+    restarted = make_app(monkeypatch)
+    restarted.synchronized_data.db.update(**{ROUND_DURATIONS_KEY: stored})
+    restarted.schedule_round(APICheckRound)
+    assert restarted.timeout_autotuner.serialize_durations() == stored
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+This module contains the autotuning of the timeouts of LearningChainedSkillAbciApp.
+
+Round durations are measured in block time, i.e., from the timestamp of the block in which
+a round was scheduled to the timestamp of the block in which it ended. As every agent
+processes the same blocks, every agent observes the same durations and proposes the same
+timeouts, which are only applied at the start of a period.
+
+The durations are stored in the synchronized data once per period, as part of the update of
+the round which ends the period, under a key persisted across periods, so that they survive
+the resets of Tendermint, and an agent which restarts loads the same durations as the other
+agents before it tunes any timeout.
+
+A round which ends on a timeout is recorded as a censored sample, i.e., a duration which is
+known to be at least the timeout, but not how much longer. Censored samples rank above every
+measured duration, so that the timeouts which cut rounds off are not tuned from the rounds
+which survived them only, and an event is backed off to its configured timeout if its
+percentile falls on a censored sample.
+"""
+
+import json
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Type, cast
+
+
+TIMEOUT_EVENT_SUFFIX = "TIMEOUT"
+ROUND_DURATIONS_KEY = "round_durations"
+# the durations are rounded, so that they survive their serialization unchanged
+DURATION_DECIMALS = 3
+
+# a duration, or None for a round which ended on a timeout
+Sample = Optional[float]
+
+
+@dataclass
+class TimeoutAutotuner:  # pylint: disable=too-many-instance-attributes
+    """Records the durations of the rounds and proposes timeouts for their timeout events."""
+
+    events: Tuple[str, ...]
+    percentile: float
+    margin: float
+    min_timeout: float
+    min_samples: int
+    window: int
+    apply: bool
+    durations: Dict[Type[Any], Deque[Sample]] = field(default_factory=dict)
+    defaults: Dict[Enum, float] = field(default_factory=dict)
+
+    def record(self, round_cls: Type[Any], event: Enum, duration: float) -> None:
+        """Record the duration of a round, censored if it ended on a timeout."""
+        if duration < 0:
+            return
+        samples = self.durations.setdefault(round_cls, deque(maxlen=self.window))
+        if event.name.endswith(TIMEOUT_EVENT_SUFFIX):
+            # the duration of a round which timed out is the timeout itself, not a latency
+            samples.append(None)
+            return
+        samples.append(round(duration, DURATION_DECIMALS))
+
+    def serialize_durations(self) -> str:
+        """Serialize the recorded durations, by round id, to a deterministic JSON string."""
+        return json.dumps(
+            {
+                round_cls.auto_round_id(): list(samples)
+                for round_cls, samples in self.durations.items()
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+
+    def load_durations(
+        self, serialized: Optional[str], round_classes: Iterable[Type[Any]]
+    ) -> None:
+        """Replace the recorded durations with serialized ones, ignoring the rounds which are not known."""
+        data = json.loads(serialized) if serialized else {}
+        self.durations = {
+            round_cls: deque(data[round_cls.auto_round_id()], maxlen=self.window)
+            for round_cls in round_classes
+            if round_cls.auto_round_id() in data
+        }
+
+    def quantile(self, samples: Iterable[Sample]) -> Sample:
+        """Get the configured percentile of the samples, using the nearest-rank method, or None if it is censored."""
+        samples = list(samples)
+        ordered: List[Sample] = sorted(
+            sample for sample in samples if sample is not None
+        )
+        ordered += [None] * (len(samples) - len(ordered))
+        rank = math.ceil(self.percentile / 100 * len(ordered))
+        return ordered[max(rank, 1) - 1]
+
+    def propose(
+        self,
+        transition_function: Dict[Type[Any], Dict[Enum, Type[Any]]],
+        event_to_timeout: Dict[Enum, float],
+    ) -> Dict[Enum, float]:
+        """
+        Propose timeouts for the tuned events, based on the recorded durations.
+
+        An event's timeout has to fit every round which may end on it. Events of rounds
+        which have not been observed enough times are left out. The proposals are rounded
+        up to whole seconds and never exceed the configured timeouts, to which the events are
+        backed off if any of their rounds times out too often.
+
+        :param transition_function: the transition function of the app.
+        :param event_to_timeout: the current timeouts.
+        :return: the proposed timeouts.
+        """
+        for event, timeout in event_to_timeout.items():
+            self.defaults.setdefault(event, timeout)
+
+        rounds_per_event: Dict[Enum, list] = {}
+        for round_cls, transitions in transition_function.items():
+            for event in transitions:
+                if event.name in self.events and event in self.defaults:
+                    rounds_per_event.setdefault(event, []).append(round_cls)
+
+        proposals = {}
+        for event, rounds in rounds_per_event.items():
+            latencies = []
+            for round_cls in rounds:
+                samples = self.durations.get(round_cls, ())
+                if len(samples) < self.min_samples:
+                    break
+                latencies.append(self.quantile(samples))
+            else:
+                if None in latencies:
+                    proposals[event] = self.defaults[event]
+                    continue
+                timeout = math.ceil(max(cast(List[float], latencies)) + self.margin)
+                proposals[event] = float(
+                    min(max(timeout, self.min_timeout), self.defaults[event])
+                )
+        return proposals
+
+    def tune(
+        self,
+        transition_function: Dict[Type[Any], Dict[Enum, Type[Any]]],
+        event_to_timeout: Dict[Enum, float],
+    ) -> Optional[Dict[Enum, float]]:
+        """Propose timeouts, applying them to `event_to_timeout` if configured to."""
+        proposals = self.propose(transition_function, event_to_timeout)
+        changes = {
+            event: timeout
+            for event, timeout in proposals.items()
+            if event_to_timeout.get(event) != timeout
+        }
+        if not changes:
+            return None
+        if self.apply:
+            event_to_timeout.update(changes)
+        return changes
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Benchmark reading AMM pool prices with one call per pool against a single multicall.
+
+The script needs an RPC endpoint of a chain with Multicall3 and the pools deployed.
+A local fork of Gnosis stands in for it, e.g.:
+
+    anvil --fork-url https://rpc.gnosischain.com
+
+The pools are read from a JSON file, in the format of the `dex_pools` param of `learning_abci`,
+and are repeated as needed to reach the benchmarked pool counts.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.benchmark_dex_reads`.
+"""
+
+import json
+import statistics
+import time
+from functools import partial
+from itertools import cycle, islice
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import click
+from eth_typing import HexStr
+from web3 import Web3
+
+from packages.valory.skills.learning_abci.dex_prices import Pool, pool_prices
+
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI_PATH = Path("packages/valory/contracts/multicall3/build/Multicall3.json")
+
+
+def _time(read: Callable[[], object], repeats: int) -> float:
+    """Get the median latency of a read."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        read()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _per_pool(w3: Web3, pools: List[Pool]) -> List[Tuple[bool, str]]:
+    """Read every pool with an `eth_call` of its own."""
+    results = []
+    for pool in pools:
+        address, call_data = pool.call
+        return_data = w3.eth.call(
+            {"to": Web3.to_checksum_address(address), "data": HexStr(call_data)}
+        )
+        results.append((True, "0x" + bytes(return_data).hex()))
+    return results
+
+
+def _batched(multicall: Any, pools: List[Pool]) -> List[Tuple[bool, str]]:
+    """Read every pool with a single multicall."""
+    calls = [
+        (Web3.to_checksum_address(address), bytes.fromhex(call_data[2:]))
+        for address, call_data in (pool.call for pool in pools)
+    ]
+    _, _, results = multicall.functions.tryBlockAndAggregate(False, calls).call()
+    return [(success, "0x" + bytes(data).hex()) for success, data in results]
+
+
+@click.command()
+@click.argument(
+    "pools_file", type=click.Path(exists=True, dir_okay=False, path_type=Path)
+)
+@click.option("--rpc", default="http://localhost:8545", help="RPC endpoint.")
+@click.option("--multicall", default=MULTICALL3_ADDRESS, help="Multicall3 address.")
+@click.option(
+    "--counts",
+    "counts",
+    type=int,
+    multiple=True,
+    default=(1, 5, 10, 25, 50),
+    help="Pool counts to benchmark.",
+)
+@click.option("--repeats", type=int, default=10, help="Reads per measurement.")
+def main(
+    pools_file: Path,
+    rpc: str,
+    multicall: str,
+    counts: Tuple[int, ...],
+    repeats: int,
+) -> None:
+    """Benchmark per-pool against batched reads."""
+    configured = [Pool.from_config(pool) for pool in json.loads(pools_file.read_text())]
+    if not configured:
+        raise click.ClickException("No pools configured.")
+    w3 = Web3(Web3.HTTPProvider(rpc))
+    if not w3.is_connected():
+        raise click.ClickException(f"Cannot connect to {rpc}.")
+    abi = json.loads(MULTICALL3_ABI_PATH.read_text())["abi"]
+    multicall_contract = w3.eth.contract(
+        address=Web3.to_checksum_address(multicall), abi=abi
+    )
+
+    # read the prices once, to check that the pools are configured correctly
+    results = _batched(multicall_contract, configured)
+    prices = pool_prices(
+        configured,
+        [{"success": success, "return_data": data} for success, data in results],
+    )
+    click.echo(f"Prices: {prices}")
+
+    click.echo(f"{'pools':>6}{'per pool (ms)':>16}{'batched (ms)':>16}{'speedup':>10}")
+    for count in counts:
+        pools = list(islice(cycle(configured), count))
+        per_pool = _time(partial(_per_pool, w3, pools), repeats)
+        batched = _time(partial(_batched, multicall_contract, pools), repeats)
+        click.echo(
+            f"{count:>6}{per_pool * 1e3:>16.1f}{batched * 1e3:>16.1f}"
+            f"{per_pool / batched:>10.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
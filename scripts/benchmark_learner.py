@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Benchmark the update latency of the online learner of `learning_abci`.
+
+For every number of lags, the script trains a learner on a synthetic price series and
+measures the latency of a period's work, i.e., deserializing the learner, observing the
+price and serializing it again, along with the size of the serialized state. The latency
+of refitting a batch least squares regression on the whole history is shown for comparison,
+as it grows with the history while the online update does not.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.benchmark_learner`.
+"""
+
+import statistics
+import time
+from typing import List, Tuple
+
+import click
+import numpy as np
+
+from packages.valory.skills.learning_abci.learner import OnlineLearner
+
+
+FORGETTING = 0.99
+PRIOR_VARIANCE = 1000.0
+
+
+def _prices(n_prices: int, seed: int) -> np.ndarray:
+    """Generate a random walk of prices."""
+    rng = np.random.default_rng(seed)
+    return np.exp(np.cumsum(rng.normal(0, 0.01, n_prices)))
+
+
+def _online(lags: int, prices: np.ndarray) -> Tuple[List[float], int]:
+    """Time every period's update of the online learner."""
+    state = ""
+    timings = []
+    for price in prices:
+        start = time.perf_counter()
+        learner = OnlineLearner.deserialize(state, lags, FORGETTING, PRIOR_VARIANCE)
+        learner.observe(float(price))
+        state = learner.serialize()
+        timings.append(time.perf_counter() - start)
+    return timings, len(state)
+
+
+def _batch(lags: int, prices: np.ndarray) -> float:
+    """Time a batch least squares refit on the whole history."""
+    returns = np.diff(np.log(prices))
+    start = time.perf_counter()
+    features = np.column_stack(
+        [np.ones(len(returns) - lags)]
+        + [returns[lags - lag - 1 : len(returns) - lag - 1] for lag in range(lags)]
+    )
+    np.linalg.lstsq(features, returns[lags:], rcond=None)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option(
+    "--lags",
+    "lags_list",
+    type=int,
+    multiple=True,
+    default=(1, 4, 16, 64, 256),
+    help="Numbers of lags to benchmark.",
+)
+@click.option("--periods", type=int, default=2_000, help="Periods to train for.")
+@click.option("--seed", type=int, default=0, help="Seed of the price series.")
+def main(lags_list: Tuple[int, ...], periods: int, seed: int) -> None:
+    """Benchmark the online learner."""
+    prices = _prices(periods, seed)
+    click.echo(
+        f"{'lags':>6}{'mean (us)':>12}{'p99 (us)':>12}"
+        f"{'state (B)':>12}{'batch refit (us)':>20}"
+    )
+    for lags in lags_list:
+        timings, state_size = _online(lags, prices)
+        # skip the warm-up periods, in which there are not enough prices to train on
+        timings = sorted(timings[lags + 1 :])
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        click.echo(
+            f"{lags:>6}{statistics.fmean(timings) * 1e6:>12.1f}{p99 * 1e6:>12.1f}"
+            f"{state_size:>12}{_batch(lags, prices) * 1e6:>20.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Benchmark the main-loop stall time caused by logging.
+
+The script reproduces the agent's logging setup, i.e., a file handler and a stream handler
+attached to the `aea` logger, and measures how long each logging call blocks the caller,
+first with the synchronous handlers and then with the queue-based setup of `learning_abci`.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.benchmark_logging`.
+"""
+
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import click
+
+from packages.valory.skills.learning_abci.log_queue import (
+    AEA_LOGGER_NAME,
+    OverflowPolicy,
+    QueueLogging,
+)
+
+
+FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+
+
+class SlowFileHandler(logging.FileHandler):
+    """A file handler which emulates a slow disk or a slow stdout consumer."""
+
+    def __init__(self, filename: str, stall: float) -> None:
+        """Initialize the handler."""
+        super().__init__(filename)
+        self.stall = stall
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Emit a record, stalling first."""
+        if self.stall:
+            time.sleep(self.stall)
+        super().emit(record)
+
+
+def _configure(log_dir: Path, stall: float) -> logging.Logger:
+    """Configure the `aea` logger the same way `aea-config.yaml` does."""
+    logger = logging.getLogger(AEA_LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    formatter = logging.Formatter(FORMAT)
+    handlers: List[logging.Handler] = [
+        SlowFileHandler(str(log_dir / "log.txt"), stall),
+        SlowFileHandler(str(log_dir / "stdout.txt"), stall),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+def _measure(logger: logging.Logger, n_records: int, debug_ratio: float) -> List[float]:
+    """Log `n_records` records and return the time each call blocked the caller."""
+    skill_logger = logger.getChild("learning_agent.packages.valory.skills")
+    n_debug = int(n_records * debug_ratio)
+    timings = []
+    for i in range(n_records):
+        log: Callable = skill_logger.debug if i < n_debug else skill_logger.info
+        start = time.perf_counter()
+        log("Price is %s for period %s", 1.0 + i, i)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _summary(timings: List[float]) -> Dict[str, float]:
+    """Summarize the timings, in microseconds."""
+    ordered = sorted(timings)
+    return {
+        "total_ms": sum(ordered) * 1e3,
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p99_us": ordered[int(len(ordered) * 0.99) - 1] * 1e6,
+        "max_us": ordered[-1] * 1e6,
+    }
+
+
+@click.command()
+@click.option("--records", type=int, default=20_000, help="Records to log per run.")
+@click.option(
+    "--stall-us",
+    type=int,
+    default=50,
+    help="Emulated I/O latency per record and handler, in microseconds.",
+)
+@click.option("--debug-ratio", type=float, default=0.8, help="Share of debug records.")
+@click.option("--queue-size", type=int, default=10_000, help="Log queue size.")
+@click.option(
+    "--policy",
+    type=click.Choice([policy.value for policy in OverflowPolicy]),
+    default=OverflowPolicy.DROP_OLDEST.value,
+    help="Overflow policy of the log queue.",
+)
+@click.option("--sample-rate", type=int, default=10, help="Debug sample rate.")
+def main(  # pylint: disable=too-many-arguments
+    records: int,
+    stall_us: int,
+    debug_ratio: float,
+    queue_size: int,
+    policy: str,
+    sample_rate: int,
+) -> None:
+    """Compare synchronous and queue-based logging."""
+    stall = stall_us / 1e6
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_dir = Path(tmp_dir)
+
+        logger = _configure(log_dir, stall)
+        sync_timings = _measure(logger, records, debug_ratio)
+
+        logger = _configure(log_dir, stall)
+        queue_logging = QueueLogging(queue_size, OverflowPolicy(policy), sample_rate)
+        queue_logging.start()
+        queue_timings = _measure(logger, records, debug_ratio)
+        handler = queue_logging.handler
+        dropped = 0 if handler is None else handler.dropped
+        sampled_out = 0 if handler is None else handler.sampled_out
+        queue_logging.stop()
+
+    click.echo(
+        f"{'setup':<8}{'total ms':>12}{'mean us':>12}{'p99 us':>12}{'max us':>12}"
+    )
+    for name, timings in (("sync", sync_timings), ("queue", queue_timings)):
+        summary = _summary(timings)
+        click.echo(
+            f"{name:<8}{summary['total_ms']:>12.1f}{summary['mean_us']:>12.1f}"
+            f"{summary['p99_us']:>12.1f}{summary['max_us']:>12.1f}"
+        )
+    click.echo(f"queue: dropped={dropped}, sampled out={sampled_out}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Benchmark the cost of resetting Tendermint against the number of periods between the resets.
+
+For every reset interval, an agent runs `learning_chained_abci` for a number of periods, loaded
+like `scripts.replay_abci` does, with the blocks produced by the stand-in of Tendermint of
+`scripts.benchmark_scale`. Every `reset_every` periods, i.e., never for 0, the agent goes through
+its side of a reset at the end of the period, as `reset_tendermint_with_wait` does: it serializes
+its db for the recovery, resets its blockchain, cleans up the history of the app and handles the
+start of the new chain. The side of Tendermint, i.e., the restart of the node and the pauses
+around it, cannot be measured here, it is passed as `--tm-reset-seconds`.
+
+For every interval, the CPU time the agent spends on a period at the start and at the end of the
+run shows how the periods slow down as the history grows, and the cost per period adds the
+periods and the resets up, so that the interval with the lowest cost, and the `reset_cost_seconds`
+of the adaptive policy, can be tuned. For the run without resets, the period at which the adaptive
+policy, with its default parameters, would first reset is reported too.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.benchmark_reset`.
+"""
+
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, NamedTuple, Optional, Tuple
+
+import click
+import numpy as np
+from aea.multiplexer import AsyncMultiplexer
+from aea.skills.base import SkillContext
+
+from scripts.benchmark_scale import (
+    AgentState,
+    ConsensusStandIn,
+    KB_PER_MB,
+    MS_PER_S,
+    rss_mb,
+)
+from scripts.replay_abci import ReplayOutBox, load_skill
+
+from packages.valory.connections.abci.connection import PUBLIC_ID as ABCI_PUBLIC_ID
+from packages.valory.protocols.abci import AbciMessage
+from packages.valory.skills.learning_chained_abci.reset_policy import ResetPolicy
+from packages.valory.skills.reset_pause_abci.rounds import ResetAndPauseRound
+
+
+BYTES_PER_KB = 1024
+# the share of the periods at the start and at the end of a run which are compared
+EDGE_SHARE = 0.1
+
+
+class RunResult(NamedTuple):
+    """The costs measured in a run."""
+
+    period_times: List[float]
+    reset_times: List[float]
+    max_blocks: int
+    db_bytes: int
+    peak_rss_mb: float
+    rss_growth_mb: float
+    policy_reset: Optional[Tuple[int, str]]
+
+
+def _handle(context: SkillContext, requests: List[bytes]) -> AgentState:
+    """Handle ABCI requests, returning the state of the app."""
+    handler = context.handlers.abci
+    for request in requests:
+        message = AbciMessage.serializer.decode(request)
+        message.sender = str(ABCI_PUBLIC_ID)
+        message.to = str(context.skill_id)
+        handler.handle(message)
+    round_sequence = context.state.round_sequence
+    synchronized_data = round_sequence.latest_synchronized_data
+    return AgentState(
+        str(round_sequence.current_round_id),
+        synchronized_data.period_count,
+        synchronized_data.round_count,
+    )
+
+
+def _reset(context: SkillContext, stand_in: ConsensusStandIn) -> AgentState:
+    """Go through the side of the agent of a reset of Tendermint."""
+    round_sequence = context.state.round_sequence
+    params = context.params
+    # the db is stored in the recovery params of the reset
+    context.state.synchronized_data.db.serialize()
+    round_sequence.reset_blockchain()
+    round_sequence.abci_app.cleanup(
+        params.cleanup_history_depth, params.cleanup_history_depth_current
+    )
+    return _handle(context, stand_in.restart())
+
+
+def run(agents: int, periods: int, reset_every: int) -> RunResult:
+    """Run the periods of an agent, resetting every `reset_every` periods."""
+    stand_in = ConsensusStandIn(agents)
+    outbox = ReplayOutBox(AsyncMultiplexer())
+    period_times: List[float] = []
+    reset_times: List[float] = []
+    max_blocks, blocks = 0, 0
+    policy_reset: Optional[Tuple[int, str]] = None
+    with TemporaryDirectory() as store_path:
+        header = {"agent_address": stand_in.cryptos[0].address, "setup": stand_in.setup}
+        context = load_skill(header, Path(store_path), outbox).skill_context
+        abci_app = context.state.round_sequence.abci_app
+        params = context.params
+        # the adaptive policy is off by default, it is enabled to report when it would reset
+        type(abci_app).reset_policy = ResetPolicy(
+            reset_cost=params.reset_cost_seconds,
+            baseline_periods=params.reset_baseline_periods,
+            max_block_store_bytes=params.reset_max_block_store_bytes,
+            block_overhead_bytes=params.reset_block_overhead_bytes,
+            max_history_rounds=params.reset_max_history_rounds,
+        )
+        # the registration sends the db the agent starts with
+        stand_in.initialisation = context.state.synchronized_data.db.serialize()
+        rss_start = rss_mb()
+        state = _handle(context, stand_in.genesis())
+        period_time, reset_period = 0.0, None
+        while len(period_times) < periods:
+            if (
+                reset_every
+                and state.round_id == ResetAndPauseRound.auto_round_id()
+                and (state.period_count + 1) % reset_every == 0
+                and state.period_count != reset_period
+            ):
+                reset_period = state.period_count
+                start = time.process_time()
+                state = _reset(context, stand_in)
+                reset_times.append(time.process_time() - start)
+                max_blocks, blocks = max(max_blocks, blocks), 0
+            requests = stand_in.block(state)
+            start = time.process_time()
+            next_state = _handle(context, requests)
+            period_time += time.process_time() - start
+            blocks += 1
+            if next_state.period_count != state.period_count:
+                # the first period includes the registration, it is not measured
+                if state.period_count > 0:
+                    period_times.append(period_time)
+                if policy_reset is None and abci_app.reset_reason is not None:
+                    policy_reset = (state.period_count, abci_app.reset_reason)
+                period_time = 0.0
+            state = next_state
+        result = RunResult(
+            period_times=period_times,
+            reset_times=reset_times,
+            max_blocks=max(max_blocks, blocks),
+            db_bytes=len(context.state.synchronized_data.db.serialize()),
+            peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / KB_PER_MB,
+            rss_growth_mb=rss_mb() - rss_start,
+            policy_reset=policy_reset,
+        )
+        context.state.teardown()
+    return result
+
+
+@click.command()
+@click.option(
+    "--reset-every",
+    "intervals",
+    type=click.IntRange(min=0),
+    multiple=True,
+    default=(0, 10, 50, 100),
+    help="Periods between the resets to benchmark, 0 for no resets.",
+)
+@click.option("--periods", type=click.IntRange(min=1), default=200)
+@click.option("--agents", type=click.IntRange(min=1), default=4)
+@click.option(
+    "--tm-reset-seconds",
+    type=float,
+    default=60.0,
+    help="The time Tendermint stalls the service for on a reset.",
+)
+def main(
+    intervals: Tuple[int, ...], periods: int, agents: int, tm_reset_seconds: float
+) -> None:
+    """Benchmark the cost of resetting Tendermint against the periods between the resets."""
+    click.echo(
+        f"{'reset every':>11}{'period cpu start (ms)':>23}{'period cpu end (ms)':>21}"
+        f"{'reset cpu (ms)':>16}{'cost/period (ms)':>18}{'max blocks':>12}"
+        f"{'db (KB)':>10}{'peak rss (MB)':>15}{'rss growth (MB)':>17}"
+    )
+    edge = max(int(periods * EDGE_SHARE), 1)
+    context = multiprocessing.get_context("spawn")
+    for reset_every in intervals:
+        # every run loads the skill in a fresh process
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            result = executor.submit(run, agents, periods, reset_every).result()
+        period_ms = np.array(result.period_times) * MS_PER_S
+        reset_ms = np.array(result.reset_times) * MS_PER_S
+        stalls_ms = len(result.reset_times) * tm_reset_seconds * MS_PER_S
+        cost_ms = (period_ms.sum() + reset_ms.sum() + stalls_ms) / periods
+        click.echo(
+            f"{reset_every or 'never':>11}{period_ms[:edge].mean():>23.1f}"
+            f"{period_ms[-edge:].mean():>21.1f}"
+            f"{reset_ms.mean() if len(reset_ms) else 0.0:>16.1f}{cost_ms:>18.1f}"
+            f"{result.max_blocks:>12}{result.db_bytes / BYTES_PER_KB:>10.1f}"
+            f"{result.peak_rss_mb:>15.1f}{result.rss_growth_mb:>17.1f}"
+        )
+        if not reset_every and result.policy_reset is not None:
+            period, reason = result.policy_reset
+            click.echo(
+                f"The adaptive policy would first reset after period {period}, as {reason}."
+            )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
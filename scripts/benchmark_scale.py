@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Benchmark how the learning app scales with the number of agents.
+
+For every number of agents, every agent runs an instance of `learning_chained_abci` in a process
+of its own, loaded like `scripts.replay_abci` does, and a local stand-in of Tendermint produces
+the blocks: it sends the same ABCI requests to every agent, with the signed payloads of all the
+agents for the current round, and waits for every agent to commit the block before producing the
+next one. The payloads take the periods through the registration, the price check, the decision
+not to transact and the reset, so the benchmark measures the handling of the requests, i.e., the
+verification of the signatures, the processing of the payloads and the end of the blocks, which
+grows with the number of agents.
+
+The latency of a period is the wall time of its blocks, the first period, i.e., the registration,
+excluded. The agents share the CPUs of the host, so it includes their contention; the CPU time
+and the memory of every agent are reported too, as they carry over to one agent per host.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.benchmark_scale`.
+"""
+
+import multiprocessing
+import resource
+import time
+from multiprocessing.connection import Connection
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import click
+import numpy as np
+from aea.crypto.registries import make_crypto
+from aea.multiplexer import AsyncMultiplexer
+
+from scripts.replay_abci import LEDGER_ID, ReplayOutBox, load_skill
+
+from packages.valory.connections.abci.connection import PUBLIC_ID as ABCI_PUBLIC_ID
+from packages.valory.protocols.abci import AbciMessage
+from packages.valory.protocols.abci.custom_types import (
+    BlockID,
+    ConsensusVersion,
+    Evidences,
+    Header,
+    LastCommitInfo,
+    PartSetHeader,
+    Timestamp,
+    ValidatorUpdates,
+)
+from packages.valory.skills.abstract_round_abci.base import BaseTxPayload, Transaction
+from packages.valory.skills.learning_abci.payloads import (
+    APICheckPayload,
+    DecisionMakingPayload,
+)
+from packages.valory.skills.learning_abci.rounds import (
+    APICheckRound,
+    DecisionMakingRound,
+    Event,
+)
+from packages.valory.skills.registration_abci.payloads import RegistrationPayload
+from packages.valory.skills.registration_abci.rounds import RegistrationStartupRound
+from packages.valory.skills.reset_pause_abci.payloads import ResetPausePayload
+from packages.valory.skills.reset_pause_abci.rounds import ResetAndPauseRound
+
+
+CHAIN_ID = "learning-scale"
+SAFE_ADDRESS = f"0x{1:040x}"
+# a price of 1.0, in fixed point with 8 decimals
+PRICE = 10**8
+BLOCK_TIME = 1
+MS_PER_S = 1e3
+KB_PER_MB = 1024
+
+
+class AgentState(NamedTuple):
+    """The state of the app of an agent, after a block."""
+
+    round_id: str
+    period_count: int
+    round_count: int
+
+
+class AgentUsage(NamedTuple):
+    """The resources an agent has used, while handling the blocks."""
+
+    cpu_time: float
+    peak_rss_mb: float
+    rss_growth_mb: float
+    rejected: int
+
+
+def rss_mb() -> float:
+    """Get the current resident memory of the process, in MB."""
+    with open("/proc/self/statm", encoding="utf-8") as file:
+        pages = int(file.read().split()[1])
+    return pages * resource.getpagesize() / KB_PER_MB / KB_PER_MB
+
+
+def run_agent(connection: Connection, address: str, setup: Dict[str, Any]) -> None:
+    """Handle the blocks sent by the stand-in, until it sends `None`."""
+    outbox = ReplayOutBox(AsyncMultiplexer())
+    with TemporaryDirectory() as store_path:
+        header = {"agent_address": address, "setup": setup}
+        skill = load_skill(header, Path(store_path), outbox)
+        context = skill.skill_context
+        handler = context.handlers.abci
+        skill_id = str(context.skill_id)
+        # the registration sends the db the agent starts with
+        connection.send(context.state.synchronized_data.db.serialize())
+        rss_start = rss_mb()
+        cpu_start = time.process_time()
+        while True:
+            requests = connection.recv()
+            if requests is None:
+                break
+            for request in requests:
+                message = AbciMessage.serializer.decode(request)
+                message.sender = str(ABCI_PUBLIC_ID)
+                message.to = skill_id
+                handler.handle(message)
+            round_sequence = context.state.round_sequence
+            synchronized_data = round_sequence.latest_synchronized_data
+            connection.send(
+                AgentState(
+                    str(round_sequence.current_round_id),
+                    synchronized_data.period_count,
+                    synchronized_data.round_count,
+                )
+            )
+        usage = AgentUsage(
+            cpu_time=time.process_time() - cpu_start,
+            peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / KB_PER_MB,
+            rss_growth_mb=rss_mb() - rss_start,
+            rejected=outbox.rejected,
+        )
+        context.state.teardown()
+    connection.send(usage)
+
+
+class ConsensusStandIn:
+    """Produces the blocks of a number of agents, with the payloads they would send."""
+
+    def __init__(self, agents: int) -> None:
+        """Initialize the stand-in."""
+        self.cryptos = sorted(
+            (make_crypto(LEDGER_ID) for _ in range(agents)),
+            key=lambda crypto: crypto.address,
+        )
+        self.setup = {
+            "all_participants": [crypto.address for crypto in self.cryptos],
+            "safe_contract_address": SAFE_ADDRESS,
+            "consensus_threshold": None,
+        }
+        self.initialisation = ""
+        self.height = 0
+        self.start = int(time.time())
+        self._nonce = 0
+        self._sent_round_count: Optional[int] = None
+
+    def _request(self, performative: AbciMessage.Performative, **kwargs: Any) -> bytes:
+        """Encode an ABCI request."""
+        self._nonce += 1
+        message = AbciMessage(
+            performative=performative,
+            dialogue_reference=(str(self._nonce), ""),
+            **kwargs,
+        )
+        return AbciMessage.serializer.encode(message)
+
+    def genesis(self) -> List[bytes]:
+        """Get the requests which start the chain."""
+        return [
+            self._request(
+                AbciMessage.Performative.REQUEST_INFO,
+                version="",
+                block_version=0,
+                p2p_version=0,
+            ),
+            self._request(
+                AbciMessage.Performative.REQUEST_INIT_CHAIN,
+                time=Timestamp(self.start, 0),
+                chain_id=CHAIN_ID,
+                validators=ValidatorUpdates([]),
+                app_state_bytes=b"",
+                initial_height=1,
+            ),
+        ]
+
+    def restart(self) -> List[bytes]:
+        """Restart the chain from the current time, as Tendermint does once reset."""
+        self.start += self.height * BLOCK_TIME
+        self.height = 0
+        return self.genesis()
+
+    def payload(self, address: str, state: AgentState) -> BaseTxPayload:
+        """Make the payload which an agent sends in a round."""
+        if state.round_id == RegistrationStartupRound.auto_round_id():
+            payload: BaseTxPayload = RegistrationPayload(address, self.initialisation)
+        elif state.round_id == APICheckRound.auto_round_id():
+            payload = APICheckPayload(address, PRICE)
+        elif state.round_id == DecisionMakingRound.auto_round_id():
+            payload = DecisionMakingPayload(address, Event.DONE.value)
+        elif state.round_id == ResetAndPauseRound.auto_round_id():
+            payload = ResetPausePayload(address, state.period_count)
+        else:
+            raise click.ClickException(f"No payloads for the round {state.round_id}.")
+        # like the behaviours, the payload is bound to the round it is sent in
+        object.__setattr__(payload, "round_count", state.round_count)
+        return payload
+
+    def block(self, state: AgentState) -> List[bytes]:
+        """Get the requests of the next block, with the payloads of the round if not sent yet."""
+        self.height += 1
+        header = Header(
+            ConsensusVersion(0, 0),
+            CHAIN_ID,
+            self.height,
+            Timestamp(self.start + self.height * BLOCK_TIME, 0),
+            BlockID(b"", PartSetHeader(0, b"")),
+            *(b"",) * 9,
+        )
+        requests = [
+            self._request(
+                AbciMessage.Performative.REQUEST_BEGIN_BLOCK,
+                hash=b"",
+                header=header,
+                last_commit_info=LastCommitInfo(0, []),
+                byzantine_validators=Evidences([]),
+            )
+        ]
+        if state.round_count != self._sent_round_count:
+            self._sent_round_count = state.round_count
+            for crypto in self.cryptos:
+                payload = self.payload(crypto.address, state)
+                signature = crypto.sign_message(payload.encode())
+                requests.append(
+                    self._request(
+                        AbciMessage.Performative.REQUEST_DELIVER_TX,
+                        tx=Transaction(payload, signature).encode(),
+                    )
+                )
+        requests.append(
+            self._request(
+                AbciMessage.Performative.REQUEST_END_BLOCK, height=self.height
+            )
+        )
+        requests.append(self._request(AbciMessage.Performative.REQUEST_COMMIT))
+        return requests
+
+
+def _broadcast(connections: List[Connection], requests: List[bytes]) -> AgentState:
+    """Send requests to every agent, returning their state once all have handled them."""
+    for connection in connections:
+        connection.send(requests)
+    states = {connection.recv() for connection in connections}
+    if len(states) != 1:
+        raise click.ClickException(f"The agents diverged: {sorted(states)}.")
+    return states.pop()
+
+
+def run(agents: int, periods: int) -> Tuple[List[float], List[int], List[AgentUsage]]:
+    """Run the periods with a number of agents, returning their latencies, blocks and usage."""
+    stand_in = ConsensusStandIn(agents)
+    context = multiprocessing.get_context("spawn")
+    connections, processes = [], []
+    for crypto in stand_in.cryptos:
+        connection, agent_connection = context.Pipe()
+        process = context.Process(
+            target=run_agent,
+            args=(agent_connection, crypto.address, stand_in.setup),
+            daemon=True,
+        )
+        process.start()
+        connections.append(connection)
+        processes.append(process)
+
+    latencies: List[float] = []
+    blocks: List[int] = []
+    try:
+        initialisations = {connection.recv() for connection in connections}
+        if len(initialisations) != 1:
+            raise click.ClickException("The agents start with different dbs.")
+        stand_in.initialisation = initialisations.pop()
+        state = _broadcast(connections, stand_in.genesis())
+        period_time, period_blocks = 0.0, 0
+        while len(latencies) < periods:
+            requests = stand_in.block(state)
+            start = time.perf_counter()
+            next_state = _broadcast(connections, requests)
+            period_time += time.perf_counter() - start
+            period_blocks += 1
+            if next_state.period_count != state.period_count:
+                # the first period includes the registration, it is not measured
+                if state.period_count > 0:
+                    latencies.append(period_time)
+                    blocks.append(period_blocks)
+                period_time, period_blocks = 0.0, 0
+            state = next_state
+        for connection in connections:
+            connection.send(None)
+        usages = [connection.recv() for connection in connections]
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+    return latencies, blocks, usages
+
+
+@click.command()
+@click.option(
+    "--agents",
+    "agents_list",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=(4, 8, 16, 32),
+    help="Numbers of agents to benchmark.",
+)
+@click.option("--periods", type=int, default=20, help="Periods to measure.")
+def main(agents_list: Tuple[int, ...], periods: int) -> None:
+    """Benchmark the learning app with a number of agents."""
+    click.echo(
+        f"{'agents':>6}{'blocks':>8}{'period p50 (ms)':>17}{'period p95 (ms)':>17}"
+        f"{'agent cpu/period (ms)':>23}{'agent peak rss (MB)':>21}"
+        f"{'agent rss growth (MB)':>23}{'rejected':>10}"
+    )
+    for agents in agents_list:
+        latencies, blocks, usages = run(agents, periods)
+        latencies_ms = np.array(latencies) * MS_PER_S
+        cpu_ms = np.array([usage.cpu_time for usage in usages]) * MS_PER_S
+        click.echo(
+            f"{agents:>6}{np.mean(blocks):>8.1f}{np.median(latencies_ms):>17.1f}"
+            f"{np.percentile(latencies_ms, 95):>17.1f}"
+            # the cpu time of the first period is included, so it is spread on all the periods
+            f"{cpu_ms.mean() / (periods + 1):>23.1f}"
+            f"{max(usage.peak_rss_mb for usage in usages):>21.1f}"
+            f"{np.mean([usage.rss_growth_mb for usage in usages]):>23.1f}"
+            f"{sum(usage.rejected for usage in usages):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Measure how the rounds of `learning_abci` degrade under injected faults.
+
+Every scenario runs the rounds of `LearningAbciApp` for a number of periods, with a simulated
+service: the blocks are produced at a fixed interval, and every agent sends its payload for a
+round after a random latency, which the round processes in the first block after its arrival.
+The faults are injected per agent:
+
+- `delays`: an extra delay of the payloads of an agent, in seconds,
+- `drop_rate`: the probability that a payload is lost,
+- `crashed`: the agents which send no payloads,
+- `byzantine`: the agents which send random prices in `APICheckRound`,
+- `price_divergence`: the probability that an honest agent reads a different price than the others.
+
+For every scenario, the time to consensus, i.e., from the start of a round until it is done, including
+the rounds repeated after a `NO_MAJORITY` or a timeout, the `NO_MAJORITY` and timeout rates, and the
+throughput in periods per hour are reported in a comparison table. A period which does not finish
+within `max_period_rounds` rounds is counted as stalled.
+
+The scenarios are declared in a YAML file, with `defaults` applied to all of them, e.g.,
+`scripts/fault_scenarios.yaml`.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.fault_injection`.
+"""
+
+import datetime
+import hashlib
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type, cast
+
+import click
+import numpy as np
+import yaml
+
+from packages.valory.skills.abstract_round_abci.base import (
+    AbciAppDB,
+    AbstractRound,
+    BaseSynchronizedData,
+    BaseTxPayload,
+    Transaction,
+)
+from packages.valory.skills.learning_abci.chains import (
+    Settlement,
+    serialize_settlements,
+)
+from packages.valory.skills.learning_abci.fixed_point import price_to_fixed
+from packages.valory.skills.learning_abci.payloads import (
+    APICheckPayload,
+    DecisionMakingPayload,
+    TxPreparationPayload,
+)
+from packages.valory.skills.learning_abci.rounds import (
+    APICheckRound,
+    DecisionMakingRound,
+    Event,
+    LearningAbciApp,
+    SynchronizedData,
+    TxPreparationRound,
+)
+
+
+DEFAULT_SCENARIOS = Path("scripts", "fault_scenarios.yaml")
+START = datetime.datetime(2024, 1, 1)
+SAFE_ADDRESS = f"0x{1:040x}"
+CHAIN_ID = "gnosis"
+PRICE = 1.0
+PRICE_DECIMALS = 8
+REPORTED_ROUNDS: Tuple[Type[AbstractRound], ...] = (
+    APICheckRound,
+    TxPreparationRound,
+)
+
+
+@dataclass(frozen=True)
+class Scenario:  # pylint: disable=too-many-instance-attributes
+    """The faults injected into a run, and the settings of the simulated service."""
+
+    name: str
+    agents: int = 4
+    periods: int = 100
+    block_time: float = 1.0
+    round_timeout: float = 300.0
+    reset_pause: float = 300.0
+    latency: Tuple[float, float] = (0.5, 2.0)
+    delays: Dict[int, float] = field(default_factory=dict)
+    drop_rate: float = 0.0
+    crashed: Tuple[int, ...] = ()
+    byzantine: Tuple[int, ...] = ()
+    price_divergence: float = 0.0
+    max_period_rounds: int = 50
+    seed: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        """Create a scenario from its declaration."""
+        known = {field_.name for field_ in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise click.ClickException(
+                f"Unknown settings {sorted(unknown)} in scenario {data.get('name')!r}."
+            )
+        data = dict(data)
+        for key in ("latency", "crashed", "byzantine"):
+            if key in data:
+                data[key] = tuple(data[key])
+        return cls(**data)
+
+
+@dataclass
+class RoundStats:
+    """The outcomes of the attempts of a round."""
+
+    attempts: int = 0
+    no_majority: int = 0
+    timeouts: int = 0
+    times_to_consensus: List[float] = field(default_factory=list)
+
+
+@dataclass
+class ScenarioResult:
+    """The results of a scenario."""
+
+    periods: int = 0
+    stalled: int = 0
+    elapsed: float = 0.0
+    rounds: Dict[str, RoundStats] = field(
+        default_factory=lambda: defaultdict(RoundStats)
+    )
+
+
+class FaultInjectionApp(LearningAbciApp):
+    """The app of the learning rounds, with the timeouts of a scenario."""
+
+
+class Simulation:  # pylint: disable=too-few-public-methods
+    """Runs the periods of a scenario."""
+
+    def __init__(self, scenario: Scenario) -> None:
+        """Initialize the simulation."""
+        self.scenario = scenario
+        self.rng = np.random.default_rng(scenario.seed)
+        self.agents = [f"0x{i + 2:040x}" for i in range(scenario.agents)]
+        self.logger = logging.getLogger("fault_injection")
+        self.result = ScenarioResult()
+        self.time = 0.0
+
+    def payload(self, index: int, round_: AbstractRound) -> BaseTxPayload:
+        """Make the payload of an agent for a round."""
+        sender = self.agents[index]
+        synchronized_data = round_.synchronized_data
+        if isinstance(round_, APICheckRound):
+            price = PRICE
+            if index in self.scenario.byzantine:
+                price = float(self.rng.uniform(0.5, 1.5))
+            elif self.rng.random() < self.scenario.price_divergence:
+                # the price has ticked between the reads of the agents
+                price = PRICE * (1 + float(self.rng.choice((-1e-4, 1e-4))))
+            payload: BaseTxPayload = APICheckPayload(
+                sender, price_to_fixed(price, PRICE_DECIMALS)
+            )
+        elif isinstance(round_, DecisionMakingRound):
+            payload = DecisionMakingPayload(
+                sender,
+                Event.TRANSACT.value,
+                learner_state=f"{SynchronizedData(synchronized_data.db).price}",
+            )
+        else:
+            period = synchronized_data.period_count
+            payload = TxPreparationPayload(
+                sender,
+                tx_submitter=TxPreparationRound.auto_round_id(),
+                settlements=serialize_settlements(
+                    [
+                        Settlement(
+                            CHAIN_ID,
+                            SAFE_ADDRESS,
+                            hashlib.sha256(f"{period}".encode()).hexdigest(),
+                        )
+                    ]
+                ),
+                pending_transfers="",
+            )
+        # like the behaviours, the payload is bound to the round it is sent in
+        object.__setattr__(payload, "round_count", synchronized_data.round_count)
+        return payload
+
+    def send_payloads(self, round_: AbstractRound) -> List[Tuple[float, int, Any]]:
+        """Schedule the arrivals of the payloads of the agents for a round."""
+        arrivals = []
+        for index in range(self.scenario.agents):
+            if index in self.scenario.crashed:
+                continue
+            if self.rng.random() < self.scenario.drop_rate:
+                continue
+            latency = self.rng.uniform(*self.scenario.latency)
+            delay = self.scenario.delays.get(index, 0.0)
+            arrival = self.time + latency + delay
+            arrivals.append((arrival, index, self.payload(index, round_)))
+        return arrivals
+
+    def make_app(self) -> FaultInjectionApp:
+        """Make the app of a period."""
+        setup_data = {
+            "all_participants": self.agents,
+            # as set by the registration of the agents
+            "participants": self.agents,
+            "safe_contract_address": SAFE_ADDRESS,
+            "consensus_threshold": None,
+        }
+        synchronized_data = BaseSynchronizedData(
+            AbciAppDB(setup_data=AbciAppDB.data_to_lists(setup_data))
+        )
+        app = FaultInjectionApp(synchronized_data, self.logger, None)  # type: ignore
+        app.update_time(self.timestamp)
+        app.setup()
+        return app
+
+    @property
+    def timestamp(self) -> datetime.datetime:
+        """Get the simulated time as a timestamp."""
+        return START + datetime.timedelta(seconds=self.time)
+
+    def run_period(self) -> None:
+        """Run a period, until a final round or until it stalls."""
+        app = self.make_app()
+        round_ = app.current_round
+        started_at = {type(round_): self.time}
+        deadline = self.time + self.scenario.round_timeout
+        pending = self.send_payloads(round_)
+        attempts = 1
+        while not self.is_finished(app):
+            if attempts > self.scenario.max_period_rounds:
+                self.result.stalled += 1
+                return
+            # the blocks in which no payload arrives and no timeout expires change nothing, skip them
+            next_arrival = min((item[0] for item in pending), default=deadline)
+            blocks = math.ceil(
+                (min(next_arrival, deadline) - self.time) / self.scenario.block_time
+            )
+            self.time += max(blocks, 1) * self.scenario.block_time
+            app.update_time(self.timestamp)
+            event = Event.ROUND_TIMEOUT
+            if app.current_round is round_:
+                delivered = [item for item in pending if item[0] <= self.time]
+                pending = [item for item in pending if item[0] > self.time]
+                for _, _, payload in sorted(delivered, key=lambda item: item[0]):
+                    transaction = Transaction(payload, "")
+                    app.check_transaction(transaction)
+                    app.process_transaction(transaction)
+                outcome = app.current_round.end_block()
+                if outcome is None:
+                    continue
+                synchronized_data, event = outcome[0], cast(Event, outcome[1])
+                app.process_event(event, synchronized_data)
+
+            stats = self.result.rounds[round_.auto_round_id()]
+            stats.attempts += 1
+            if event == Event.NO_MAJORITY:
+                stats.no_majority += 1
+            elif event == Event.ROUND_TIMEOUT:
+                stats.timeouts += 1
+            else:
+                stats.times_to_consensus.append(self.time - started_at[type(round_)])
+            if self.is_finished(app):
+                break
+            round_ = app.current_round
+            started_at.setdefault(type(round_), self.time)
+            deadline = self.time + self.scenario.round_timeout
+            # the payloads sent for the previous round are rejected, the agents send new ones
+            pending = self.send_payloads(round_)
+            attempts += 1
+        self.result.periods += 1
+
+    @staticmethod
+    def is_finished(app: FaultInjectionApp) -> bool:
+        """Whether the app has reached a final round, i.e., the period has finished."""
+        return type(app.current_round) in app.final_states
+
+    def run(self) -> ScenarioResult:
+        """Run the periods of the scenario."""
+        FaultInjectionApp.event_to_timeout = {
+            Event.ROUND_TIMEOUT: self.scenario.round_timeout
+        }
+        for _ in range(self.scenario.periods):
+            self.run_period()
+            self.time += self.scenario.reset_pause
+        self.result.elapsed = self.time
+        return self.result
+
+
+def load_scenarios(path: Path) -> List[Scenario]:
+    """Load the scenarios of a YAML file."""
+    with open(path, encoding="utf-8") as file:
+        declaration = yaml.safe_load(file)
+    defaults = declaration.get("defaults", {})
+    return [
+        Scenario.from_dict({**defaults, **scenario})
+        for scenario in declaration["scenarios"]
+    ]
+
+
+def _times(stats: Optional[RoundStats]) -> str:
+    """Format the median and the 95th percentile of the times to consensus of a round."""
+    if stats is None or not stats.times_to_consensus:
+        return "-"
+    times = np.array(stats.times_to_consensus)
+    return f"{np.median(times):.1f}/{np.percentile(times, 95):.1f}"
+
+
+def _rate(stats: Optional[RoundStats], count: int) -> str:
+    """Format a rate of the attempts of a round."""
+    if stats is None or not stats.attempts:
+        return "-"
+    return f"{count / stats.attempts:.1%}"
+
+
+@click.command()
+@click.argument(
+    "path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=DEFAULT_SCENARIOS,
+)
+@click.option("--only", multiple=True, help="Run only the scenarios of these names.")
+def main(path: Path, only: Tuple[str, ...]) -> None:
+    """Run the fault injection scenarios and compare their results."""
+    logging.basicConfig(level=logging.ERROR)
+    scenarios = [
+        scenario
+        for scenario in load_scenarios(path)
+        if not only or scenario.name in only
+    ]
+    if not scenarios:
+        raise click.ClickException("No scenarios to run.")
+
+    columns = ["scenario", "periods/h", "stalled"]
+    for round_cls in REPORTED_ROUNDS:
+        name = round_cls.__name__.replace("Round", "")
+        columns += [f"{name} s p50/p95", f"{name} no-maj", f"{name} timeout"]
+    rows = []
+    for scenario in scenarios:
+        result = Simulation(scenario).run()
+        row = [
+            scenario.name,
+            f"{result.periods / result.elapsed * 3600:.2f}",
+            str(result.stalled),
+        ]
+        for round_cls in REPORTED_ROUNDS:
+            stats = result.rounds.get(round_cls.auto_round_id())
+            row += [
+                _times(stats),
+                _rate(stats, stats.no_majority if stats else 0),
+                _rate(stats, stats.timeouts if stats else 0),
+            ]
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in [columns, *rows]) for i in range(len(columns))]
+    for row in [columns, *rows]:
+        click.echo("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Generate the per-agent overrides and the port layout of the learning service for a number of agents.
+
+The overrides of the `learning_chained_abci` skill of the first agent are the template of the
+overrides of every agent, with the values which differ per agent, i.e., the Tendermint P2P
+address, rendered for its index. The setup and the genesis config stay shared by all the agents,
+and agent `i` gets the port `base_port + i`. The other overrides of the service are kept as they
+are. With `--check`, the service is not written, and the script fails if it is not up to date.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.generate_service`.
+"""
+
+import copy
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import click
+import yaml
+
+
+SERVICE_PATH = Path(
+    "packages", "valory", "services", "learning_service", "service.yaml"
+)
+SKILL_PUBLIC_ID = "valory/learning_chained_abci:0.1.0"
+AGENT_PORT = 8000
+# the params which differ per agent, formatted with its index
+PER_AGENT_PARAMS = {
+    "tendermint_p2p_url": "${{TENDERMINT_P2P_URL_{index}:str:learning_tm_{index}:26656}}",
+}
+
+
+def _skill_override(config: List[Dict[str, Any]]) -> Dict[Any, Any]:
+    """Get the overrides of the chained skill."""
+    for override in config[1:]:
+        if override.get("public_id") == SKILL_PUBLIC_ID:
+            return override
+    raise click.ClickException(f"The service has no overrides of {SKILL_PUBLIC_ID}.")
+
+
+def generate(
+    config: List[Dict[str, Any]], agents: int, base_port: int
+) -> List[Dict[str, Any]]:
+    """Generate the service for a number of agents, from its current configuration."""
+    config = copy.deepcopy(config)
+    service, skill_override = config[0], _skill_override(config)
+    template = skill_override.get(0)
+    if template is None:
+        raise click.ClickException("The service has no overrides of the first agent.")
+    params = template["models"]["params"]["args"]
+    # the values shared by all the agents stay anchored in the extra section
+    shared = {id(params[key]): params[key] for key in ("setup", "genesis_config")}
+
+    for index in [key for key in skill_override if isinstance(key, int)]:
+        del skill_override[index]
+    for index in range(agents):
+        agent_override = copy.deepcopy(template, memo=dict(shared))
+        for key, value in PER_AGENT_PARAMS.items():
+            agent_override["models"]["params"]["args"][key] = value.format(index=index)
+        skill_override[index] = agent_override
+
+    service["number_of_agents"] = agents
+    service["deployment"]["agent"]["ports"] = {
+        index: {base_port + index: AGENT_PORT} for index in range(agents)
+    }
+    return config
+
+
+@click.command()
+@click.option(
+    "--agents",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of agents, the current one by default.",
+)
+@click.option("--base-port", type=int, default=8000, help="Host port of the agent 0.")
+@click.option(
+    "--path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=SERVICE_PATH,
+    help="The service configuration.",
+)
+@click.option(
+    "--check", is_flag=True, help="Only check that the service is up to date."
+)
+def main(agents: Optional[int], base_port: int, path: Path, check: bool) -> None:
+    """Generate the overrides of the learning service for a number of agents."""
+    current = path.read_text(encoding="utf-8")
+    config = list(yaml.safe_load_all(current))
+    if agents is None:
+        agents = int(config[0]["number_of_agents"])
+    generated = yaml.dump_all(generate(config, agents, base_port), sort_keys=False)
+    if check:
+        if generated != current:
+            raise click.ClickException(
+                f"{path} is not up to date, run `python -m scripts.generate_service`."
+            )
+        click.echo(f"{path} is up to date.")
+        return
+    path.write_text(generated, encoding="utf-8")
+    click.echo(f"Generated {path} for {agents} agents.")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
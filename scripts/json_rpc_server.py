@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+A local stand-in for a ledger's JSON-RPC endpoint, which counts the requests it serves.
+
+The server answers the reads made by `learning_abci`'s ledger reader from an in-memory state,
+with a block number which advances at a configurable block time. It counts the HTTP requests,
+the JSON-RPC calls and the connections it has served, which are exposed by the `counters` method.
+The `bench` command compares unbatched reads against the ledger reader's batches.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.json_rpc_server`.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+import click
+from aiohttp import web
+
+from packages.valory.skills.learning_abci.ledger_reads import LATEST_BLOCK, LedgerReader
+
+
+DEFAULT_HOST = "localhost"
+DEFAULT_PORT = 8545
+DEFAULT_BALANCE = 10**18
+SAFE_CODE = "0x6080"
+BASE_FEE = 10**9
+PRIORITY_FEE = 10**9
+METHOD_NOT_FOUND = -32601
+
+
+class JsonRpcStandIn:
+    """An in-memory ledger, answering JSON-RPC reads and counting them."""
+
+    def __init__(self, block_time: float) -> None:
+        """Initialize the ledger."""
+        self.block_time = block_time
+        self.started_at = time.time()
+        self.http_requests = 0
+        self.calls = 0
+        self.connections: Set[Tuple[Any, ...]] = set()
+
+    @property
+    def block_number(self) -> int:
+        """Get the current block number."""
+        return int((time.time() - self.started_at) / self.block_time)
+
+    def counters(self) -> Dict[str, int]:
+        """Get the counters."""
+        return {
+            "http_requests": self.http_requests,
+            "calls": self.calls,
+            "connections": len(self.connections),
+        }
+
+    def call(self, method: str, params: List[Any]) -> Any:
+        """Answer a call, raising a `KeyError` if its method is not supported."""
+        if method == "counters":
+            return self.counters()
+        results = {
+            "eth_blockNumber": lambda: hex(self.block_number),
+            "eth_chainId": lambda: hex(100),
+            "eth_gasPrice": lambda: hex(BASE_FEE + PRIORITY_FEE),
+            "eth_getBalance": lambda: hex(DEFAULT_BALANCE),
+            "eth_getCode": lambda: SAFE_CODE,
+            "eth_getTransactionCount": lambda: hex(self.block_number // 10),
+            "eth_feeHistory": lambda: self.fee_history(int(params[0], 16), params[2]),
+        }
+        return results[method]()
+
+    def fee_history(self, block_count: int, percentiles: List[float]) -> Dict[str, Any]:
+        """Get the fee history of the latest blocks, with a constant base fee and tips growing by percentile."""
+        newest = self.block_number
+        oldest = max(newest - block_count + 1, 0)
+        blocks = newest - oldest + 1
+        return {
+            "oldestBlock": hex(oldest),
+            "baseFeePerGas": [hex(BASE_FEE)] * (blocks + 1),
+            "gasUsedRatio": [0.5] * blocks,
+            "reward": [
+                [hex(int(PRIORITY_FEE * percentile / 50)) for percentile in percentiles]
+            ]
+            * blocks,
+        }
+
+    def answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a JSON-RPC request."""
+        self.calls += 1
+        response: Dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            response["result"] = self.call(request["method"], request.get("params", []))
+        except KeyError:
+            response["error"] = {
+                "code": METHOD_NOT_FOUND,
+                "message": f"Method {request.get('method')} not found",
+            }
+        return response
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Handle an HTTP request, holding a single JSON-RPC request or a batch of them."""
+        self.http_requests += 1
+        if request.transport is not None:
+            self.connections.add(request.transport.get_extra_info("peername"))
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([self.answer(item) for item in body])
+        return web.json_response(self.answer(body))
+
+    def make_app(self) -> web.Application:
+        """Make the app serving the endpoint."""
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        return app
+
+
+@click.group()
+def cli() -> None:
+    """Local stand-in for a ledger's JSON-RPC endpoint."""
+
+
+@cli.command()
+@click.option("--host", default=DEFAULT_HOST, help="Host to listen on.")
+@click.option("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+@click.option("--block-time", type=float, default=5.0, help="Seconds per block.")
+def serve(host: str, port: int, block_time: float) -> None:
+    """Serve the endpoint."""
+    click.echo(f"Serving JSON-RPC on http://{host}:{port}/")
+    app = JsonRpcStandIn(block_time).make_app()
+    web.run_app(app, host=host, port=port, print=None)
+
+
+def _run_ticks(
+    reader: LedgerReader, ticks: int, reads_per_tick: int, batched: bool
+) -> float:
+    """Make the reads of every tick, batched or flushed one by one, returning the mean tick latency."""
+    reads = [
+        ("eth_getBalance", [f"0x{i:040x}", LATEST_BLOCK]) for i in range(reads_per_tick)
+    ]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        futures = []
+        for method, params in reads:
+            futures.append(reader.read(method, params))
+            if not batched:
+                reader.flush()
+        reader.flush()
+        for future in futures:
+            future.result()
+    return (time.perf_counter() - start) / ticks
+
+
+async def _serve_in_background(
+    stand_in: JsonRpcStandIn, port: int, stop: asyncio.Event
+) -> None:
+    """Serve the endpoint until stopped."""
+    runner = web.AppRunner(stand_in.make_app())
+    await runner.setup()
+    await web.TCPSite(runner, DEFAULT_HOST, port).start()
+    await stop.wait()
+    await runner.cleanup()
+
+
+@cli.command()
+@click.option("--port", type=int, default=DEFAULT_PORT + 1, help="Port to use.")
+@click.option("--ticks", type=int, default=100, help="Behaviour ticks to simulate.")
+@click.option("--reads", "reads_per_tick", type=int, default=4, help="Reads per tick.")
+@click.option("--block-time", type=float, default=5.0, help="Seconds per block.")
+def bench(port: int, ticks: int, reads_per_tick: int, block_time: float) -> None:
+    """Compare unbatched reads against batched and cached ones."""
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+    stand_in = JsonRpcStandIn(block_time)
+    server = loop.create_task(_serve_in_background(stand_in, port, stop))
+    loop.run_until_complete(asyncio.sleep(0.1))
+
+    async def run(batched: bool, block_ttl: float) -> Tuple[float, Dict[str, int]]:
+        before = stand_in.counters()
+        reader = LedgerReader(f"http://{DEFAULT_HOST}:{port}/", 4, block_ttl, 10.0)
+        reader.start()
+        latency = await asyncio.get_running_loop().run_in_executor(
+            None, _run_ticks, reader, ticks, reads_per_tick, batched
+        )
+        reader.stop()
+        after = stand_in.counters()
+        return latency, {name: after[name] - before[name] for name in after}
+
+    click.echo(
+        f"{'mode':<24}{'tick (ms)':>12}{'requests':>10}{'calls':>10}{'conns':>8}"
+    )
+    for mode, batched, block_ttl in (
+        ("unbatched", False, 0.0),
+        ("batched", True, 0.0),
+        ("batched + block cache", True, block_time),
+    ):
+        latency, counters = loop.run_until_complete(run(batched, block_ttl))
+        click.echo(
+            f"{mode:<24}{latency * 1e3:>12.2f}{counters['http_requests']:>10}"
+            f"{counters['calls']:>10}{counters['connections']:>8}"
+        )
+    stop.set()
+    loop.run_until_complete(server)
+    loop.close()
+
+
+if __name__ == "__main__":
+    cli()
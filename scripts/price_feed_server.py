@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+A local stand-in for a streaming price feed.
+
+The server replays a recorded tick stream, one JSON object per line, over a WebSocket,
+in the format consumed by `learning_abci`'s price stream. Recordings can be generated
+with the `generate` command, and the consumer can be benchmarked against the server
+with the `bench` command.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.price_feed_server`.
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import List, Optional, Set
+
+import click
+from aiohttp import WSCloseCode, web
+
+from packages.valory.skills.learning_abci.price_stream import (
+    PRICE_KEY,
+    PriceStream,
+    TIMESTAMP_KEY,
+)
+
+
+DEFAULT_HOST = "localhost"
+DEFAULT_PORT = 8765
+DEFAULT_PATH = "/prices"
+
+
+def load_ticks(path: Path) -> List[dict]:
+    """Load a recorded tick stream."""
+    with path.open(encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def synthetic_ticks(n_ticks: int, seed: int, start_price: float = 1.0) -> List[dict]:
+    """Generate a random walk of ticks, one per second."""
+    rng = random.Random(seed)
+    price = start_price
+    ticks = []
+    for i in range(n_ticks):
+        price = max(price * (1 + rng.gauss(0, 0.001)), 1e-9)
+        ticks.append({TIMESTAMP_KEY: float(i), PRICE_KEY: round(price, 8)})
+    return ticks
+
+
+def make_app(ticks: List[dict], rate: float, loop_forever: bool) -> web.Application:
+    """Make an app replaying the ticks to every client, restamped with the current time."""
+    websockets: Set[web.WebSocketResponse] = set()
+
+    async def prices(request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        websockets.add(websocket)
+        interval = 1 / rate if rate > 0 else 0
+        try:
+            while not websocket.closed:
+                for tick in ticks:
+                    await websocket.send_str(
+                        json.dumps({**tick, TIMESTAMP_KEY: time.time()})
+                    )
+                    await asyncio.sleep(interval)
+                if not loop_forever:
+                    break
+        except ConnectionResetError:
+            # the client went away
+            pass
+        finally:
+            websockets.discard(websocket)
+        await websocket.close()
+        return websocket
+
+    async def close_websockets(_app: web.Application) -> None:
+        for websocket in set(websockets):
+            await websocket.close(code=WSCloseCode.GOING_AWAY)
+
+    app = web.Application()
+    app.router.add_get(DEFAULT_PATH, prices)
+    app.on_shutdown.append(close_websockets)
+    return app
+
+
+@click.group()
+def cli() -> None:
+    """Local stand-in for a streaming price feed."""
+
+
+@cli.command()
+@click.argument("output", type=click.Path(dir_okay=False, path_type=Path))
+@click.option("--ticks", "n_ticks", type=int, default=3600, help="Ticks to generate.")
+@click.option("--seed", type=int, default=0, help="Seed of the random walk.")
+def generate(output: Path, n_ticks: int, seed: int) -> None:
+    """Generate a synthetic recording."""
+    with output.open("w", encoding="utf-8") as file:
+        for tick in synthetic_ticks(n_ticks, seed):
+            file.write(json.dumps(tick) + "\n")
+    click.echo(f"Wrote {n_ticks} ticks to {output}")
+
+
+@cli.command()
+@click.option(
+    "--recording",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Recorded ticks to replay, a synthetic stream is used if not given.",
+)
+@click.option("--host", default=DEFAULT_HOST, help="Host to listen on.")
+@click.option("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+@click.option("--rate", type=float, default=10.0, help="Ticks per second, 0 for max.")
+@click.option("--once", is_flag=True, help="Close the stream after one replay.")
+def serve(
+    recording: Optional[Path], host: str, port: int, rate: float, once: bool
+) -> None:
+    """Replay a tick stream to every connecting client."""
+    ticks = load_ticks(recording) if recording else synthetic_ticks(3600, 0)
+    click.echo(f"Serving {len(ticks)} ticks on ws://{host}:{port}{DEFAULT_PATH}")
+    web.run_app(make_app(ticks, rate, not once), host=host, port=port, print=None)
+
+
+async def _bench(port: int, rate: float, duration: float, queue_size: int) -> dict:
+    """Run the server and the consumer side by side, sampling the staleness of the price."""
+    runner = web.AppRunner(make_app(synthetic_ticks(10_000, 0), rate, True))
+    await runner.setup()
+    await web.TCPSite(runner, DEFAULT_HOST, port).start()
+
+    stream = PriceStream(
+        f"ws://{DEFAULT_HOST}:{port}{DEFAULT_PATH}", 1000, queue_size, 0.1, 1.0
+    )
+    stream.start()
+    staleness = []
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        await asyncio.sleep(0.01)
+        ticks = stream.window.ticks()
+        if ticks:
+            staleness.append(time.time() - ticks[-1][0])
+    stream.stop()
+    await runner.cleanup()
+
+    ordered = sorted(staleness) or [float("nan")]
+    return {
+        "received": stream.received,
+        "dropped": stream.dropped,
+        "malformed": stream.malformed,
+        "reconnections": stream.reconnections,
+        "staleness_mean_ms": statistics.fmean(ordered) * 1e3,
+        "staleness_p99_ms": ordered[int(len(ordered) * 0.99) - 1] * 1e3,
+    }
+
+
+@cli.command()
+@click.option("--port", type=int, default=DEFAULT_PORT + 1, help="Port to use.")
+@click.option("--rate", type=float, default=100.0, help="Ticks per second.")
+@click.option("--duration", type=float, default=5.0, help="Seconds to run for.")
+@click.option("--queue-size", type=int, default=1000, help="Consumer queue size.")
+def bench(port: int, rate: float, duration: float, queue_size: int) -> None:
+    """Benchmark the price stream consumer against the stand-in server."""
+    results = asyncio.run(_bench(port, rate, duration, queue_size))
+    for name, value in results.items():
+        formatted = f"{value:.2f}" if isinstance(value, float) else str(value)
+        click.echo(f"{name:<20}{formatted:>12}")
+
+
+if __name__ == "__main__":
+    cli()
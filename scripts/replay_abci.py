@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Replay a recording of the ABCI requests of an agent against a fresh instance of `learning_chained_abci`.
+
+The skill is loaded out of an agent, with the setup of the recorded agent, and its ABCI handler is
+driven with the recorded requests as fast as possible, without Tendermint. The behaviours do not
+run, so the replay measures the handling of the requests, i.e., the verification of the
+transactions, the processing of their payloads by the rounds and the end of the blocks. The
+features of the skill which reach out of the process are disabled, and the skill stores its data in
+a temporary directory. When a recording continues after a reset of Tendermint, the cleanup of the
+application which the reset behaviour does is done before the new chain is initialized.
+
+The throughput is reported in blocks per second, with the time spent per type of request, and
+with `--profile` the replay is profiled with `cProfile`.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.replay_abci`.
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import time
+from collections import defaultdict
+from pathlib import Path
+from queue import Queue
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, cast
+
+import click
+import numpy as np
+from aea.configurations.base import PackageType, SkillConfig
+from aea.configurations.loader import ConfigLoaders
+from aea.context.base import AgentContext
+from aea.crypto.ledger_apis import DEFAULT_CURRENCY_DENOMINATIONS
+from aea.identity.base import Identity
+from aea.mail.base import Envelope
+from aea.multiplexer import AsyncMultiplexer, OutBox
+from aea.skills.base import Skill
+from aea.skills.tasks import TaskManager
+
+from packages.valory.connections.abci.connection import PUBLIC_ID as ABCI_PUBLIC_ID
+from packages.valory.protocols.abci import AbciMessage
+from packages.valory.skills.abstract_round_abci.base import OK_CODE
+from packages.valory.skills.learning_abci.abci_recording import read_recording
+
+
+SKILL_DIR = Path("packages", "valory", "skills", "learning_chained_abci")
+LEDGER_ID = "ethereum"
+# the features which reach out of the process, or which would write to the store of the agent
+DISABLED_FEATURES = (
+    "use_abci_recorder",
+    "use_ledger_reader",
+    "use_log_queue",
+    "use_period_log",
+    "use_price_stream",
+    "use_profiler",
+    "use_snapshots",
+    "use_tracing",
+)
+NS_PER_MS = 1e6
+
+
+class ReplayOutBox(OutBox):
+    """An outbox which drops the responses of the skill, counting the rejected transactions."""
+
+    def __init__(self, multiplexer: AsyncMultiplexer) -> None:
+        """Initialize the outbox."""
+        super().__init__(multiplexer)
+        self.responses = 0
+        self.rejected = 0
+
+    def put(self, envelope: Envelope) -> None:
+        """Drop an envelope, counting it."""
+        message = cast(AbciMessage, envelope.message)
+        self.responses += 1
+        if (
+            message.performative == AbciMessage.Performative.RESPONSE_DELIVER_TX
+            and message.code != OK_CODE
+        ):
+            self.rejected += 1
+
+
+def load_skill(header: Dict[str, Any], store_path: Path, outbox: OutBox) -> Skill:
+    """Load the skill out of an agent, with the setup of the recorded agent."""
+    # the replay does not sign, the public key of the agent is not needed
+    identity = Identity(
+        "replay",
+        address=header["agent_address"],
+        public_key="",
+        default_address_key=LEDGER_ID,
+    )
+    agent_context = AgentContext(
+        identity=identity,
+        connection_status=AsyncMultiplexer().connection_status,
+        outbox=outbox,
+        decision_maker_message_queue=Queue(),
+        decision_maker_handler_context=SimpleNamespace(),
+        task_manager=TaskManager(),
+        default_ledger_id=LEDGER_ID,
+        currency_denominations=DEFAULT_CURRENCY_DENOMINATIONS,
+        default_connection=None,
+        default_routing={},
+        search_service_address="",
+        decision_maker_address="",
+        data_dir=os.getcwd(),
+    )
+    loader = ConfigLoaders.from_package_type(PackageType.SKILL)
+    with open(SKILL_DIR / "skill.yaml", encoding="utf-8") as file:
+        skill_config = cast(SkillConfig, loader.load(file))
+    args: Dict[str, Any] = {feature: False for feature in DISABLED_FEATURES}
+    args.update(setup=header["setup"], store_path=str(store_path))
+    skill_config.update({"models": {"params": {"args": args}}})
+    skill_config.directory = SKILL_DIR
+    skill = Skill.from_config(skill_config, agent_context)
+    skill.skill_context.state.setup()
+    return skill
+
+
+def replay(skill: Skill, records: Any, limit: Optional[int]) -> Dict[str, List[int]]:
+    """Replay the records, returning the time spent handling every request, by type."""
+    context = skill.skill_context
+    handler = context.handlers.abci
+    skill_id = str(context.skill_id)
+    durations: Dict[str, List[int]] = defaultdict(list)
+    blocks = 0
+    for _, message in records:
+        if message.performative == AbciMessage.Performative.REQUEST_INIT_CHAIN:
+            round_sequence = context.state.round_sequence
+            if round_sequence.height > 0:
+                # the chain continues after a reset of Tendermint, clean up like the reset behaviour
+                round_sequence.abci_app.cleanup(
+                    context.params.cleanup_history_depth,
+                    context.params.cleanup_history_depth_current,
+                )
+                context.abci_dialogues.cleanup()
+        message.sender = str(ABCI_PUBLIC_ID)
+        message.to = skill_id
+        start = time.perf_counter_ns()
+        handler.handle(message)
+        durations[message.performative.value].append(time.perf_counter_ns() - start)
+        if message.performative == AbciMessage.Performative.REQUEST_COMMIT:
+            blocks += 1
+            if limit is not None and blocks >= limit:
+                break
+    return durations
+
+
+@click.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--limit", type=int, default=None, help="Blocks to replay at most.")
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the cProfile stats of the replay to this file.",
+)
+@click.option("--verbose", is_flag=True, help="Show the logs of the skill.")
+def main(
+    path: Path, limit: Optional[int], profile: Optional[Path], verbose: bool
+) -> None:
+    """Replay a recording of ABCI requests."""
+    logging.basicConfig(level=logging.INFO if verbose else logging.WARNING)
+    header, records = read_recording(path)
+    outbox = ReplayOutBox(AsyncMultiplexer())
+    with TemporaryDirectory() as store_path:
+        skill = load_skill(header, Path(store_path), outbox)
+        profiler = cProfile.Profile() if profile is not None else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        durations = replay(skill, records, limit)
+        if profiler is not None:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        skill.skill_context.state.teardown()
+
+    blocks = len(durations.get(AbciMessage.Performative.REQUEST_COMMIT.value, []))
+    round_sequence = skill.skill_context.state.round_sequence
+    click.echo(
+        f"replayed {blocks} blocks in {elapsed:.2f}s: {blocks / elapsed:.1f} blocks/s, "
+        f"{outbox.rejected} rejected transactions, ended in {round_sequence.current_round_id} "
+        f"of period {round_sequence.latest_synchronized_data.period_count}"
+    )
+    click.echo(
+        f"{'request':<24}{'count':>8}{'total (ms)':>13}{'mean (ms)':>12}{'p95 (ms)':>11}"
+    )
+    for request, values in sorted(
+        durations.items(), key=lambda item: sum(item[1]), reverse=True
+    ):
+        ms = np.array(values) / NS_PER_MS
+        click.echo(
+            f"{request:<24}{len(ms):>8}{ms.sum():>13.1f}{ms.mean():>12.3f}"
+            f"{np.percentile(ms, 95):>11.3f}"
+        )
+    if profiler is not None and profile is not None:
+        profiler.dump_stats(profile)
+        click.echo(f"wrote the profile to {profile}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Soak the dialogues of `learning_abci`, reporting the memory of the process over many periods.
+
+Every simulated period makes the exchanges of a period of the agent: the ABCI requests of a few
+blocks, answered by the agent, the HTTP requests of the price sources, and a Tendermint request
+to every other agent, all answered. The resident memory and the dialogue counters are reported
+at regular intervals; with `--baseline`, the dialogues of `abstract_round_abci` are soaked instead.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.soak_dialogues`.
+"""
+
+import gc
+import resource
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import click
+from aea.configurations.data_types import PublicId
+from aea.protocols.base import Message
+from aea.protocols.dialogue.base import Dialogues
+from aea.skills.base import SkillContext
+
+from packages.valory.protocols.abci import AbciMessage
+from packages.valory.protocols.http import HttpMessage
+from packages.valory.protocols.tendermint import TendermintMessage
+from packages.valory.skills.abstract_round_abci import dialogues as base_dialogues
+from packages.valory.skills.learning_abci import dialogues as learning_dialogues
+
+
+ABCI_COUNTERPARTY = "valory/abci:0.1.0"
+HTTP_COUNTERPARTY = "valory/http_client:0.23.0"
+AGENT_ADDRESS = f"0x{0:040x}"
+PEERS = [f"0x{i:040x}" for i in range(1, 4)]
+SKILL_ID = PublicId.from_str("valory/learning_abci:0.1.0")
+BLOCKS_PER_PERIOD = 4
+REQUESTS_PER_PERIOD = 3
+STATM_PATH = Path("/proc/self/statm")
+
+
+def rss_mb() -> float:
+    """Get the resident memory of the process in MB, or its peak where the current one is unavailable."""
+    if STATM_PATH.exists():
+        pages = int(STATM_PATH.read_text().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+class SoakSkillContext(SkillContext):
+    """The context of a skill out of an agent."""
+
+    @property
+    def agent_address(self) -> str:
+        """Get the address of the agent."""
+        return AGENT_ADDRESS
+
+    @property
+    def skill_id(self) -> PublicId:
+        """Get the id of the skill."""
+        return SKILL_ID
+
+    @property
+    def storage(self) -> None:
+        """Get the storage of the agent, which is disabled."""
+        return None
+
+
+def make_dialogues(baseline: bool) -> Dict[str, Any]:
+    """Make the dialogues models of a skill, out of an agent."""
+    module = base_dialogues if baseline else learning_dialogues
+    context = SoakSkillContext()
+    return {
+        "abci": module.AbciDialogues(name="abci_dialogues", skill_context=context),
+        "http": module.HttpDialogues(name="http_dialogues", skill_context=context),
+        "tendermint": module.TendermintDialogues(
+            name="tendermint_dialogues", skill_context=context
+        ),
+    }
+
+
+def reply_to(message: Message, sender: str, **kwargs: Any) -> Message:
+    """Make the counterparty's reply to a message."""
+    reply = type(message)(
+        dialogue_reference=(message.dialogue_reference[0], f"{sender}-{id(message)}"),
+        # the messages of the counterparty are numbered negatively
+        message_id=-message.message_id,
+        target=message.message_id,
+        **kwargs,
+    )
+    reply.sender = sender
+    reply.to = message.sender
+    return reply
+
+
+def receive(dialogues: Dialogues, counterparty: str, nonce: int) -> None:
+    """Receive an ABCI request and answer it."""
+    request = AbciMessage(
+        performative=AbciMessage.Performative.REQUEST_ECHO,
+        dialogue_reference=(str(nonce), ""),
+        message="echo",
+    )
+    request.sender = counterparty
+    request.to = dialogues.self_address
+    dialogue = dialogues.update(request)
+    if dialogue is None:
+        raise click.ClickException(f"Could not receive {request}.")
+    dialogue.reply(
+        performative=AbciMessage.Performative.RESPONSE_ECHO,
+        target_message=request,
+        message="echo",
+    )
+
+
+def request(dialogues: Dialogues, counterparty: str, **kwargs: Any) -> None:
+    """Send a request and receive its response."""
+    message, _ = dialogues.create(counterparty=counterparty, **kwargs)
+    if message.performative == HttpMessage.Performative.REQUEST:
+        response = reply_to(
+            message,
+            counterparty,
+            performative=HttpMessage.Performative.RESPONSE,
+            version="",
+            status_code=200,
+            status_text="",
+            headers="",
+            body=b"{}",
+        )
+    else:
+        response = reply_to(
+            message,
+            counterparty,
+            performative=TendermintMessage.Performative.GENESIS_INFO,
+            info="{}",
+        )
+    if dialogues.update(response) is None:
+        raise click.ClickException(f"Could not receive {response}.")
+
+
+def run_period(models: Dict[str, Any], period: int) -> None:
+    """Make the exchanges of a period."""
+    for block in range(BLOCKS_PER_PERIOD):
+        receive(models["abci"], ABCI_COUNTERPARTY, period * BLOCKS_PER_PERIOD + block)
+    for _ in range(REQUESTS_PER_PERIOD):
+        request(
+            models["http"],
+            HTTP_COUNTERPARTY,
+            performative=HttpMessage.Performative.REQUEST,
+            method="GET",
+            url="https://api.coingecko.com/api/v3/simple/price",
+            headers="",
+            version="",
+            body=b"",
+        )
+    for peer in PEERS:
+        request(
+            models["tendermint"],
+            peer,
+            performative=TendermintMessage.Performative.GET_GENESIS_INFO,
+        )
+
+
+def counters(models: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Get the dialogue counters of the models, as the stored dialogues where the counters are unavailable."""
+    result = []
+    for name, model in models.items():
+        model_counters = getattr(model, "counters", None)
+        if model_counters is None:
+            storage = model._dialogues_storage  # pylint: disable=protected-access
+            stored = len(
+                storage._dialogues_by_dialogue_label
+            )  # pylint: disable=protected-access
+            result.append((name, f"stored={stored}"))
+        else:
+            result.append(
+                (
+                    name,
+                    f"live={model_counters.live} terminal={model_counters.terminal} "
+                    f"evicted={model_counters.evicted}",
+                )
+            )
+    return result
+
+
+@click.command()
+@click.option("--periods", type=int, default=100_000, help="Periods to simulate.")
+@click.option("--report-every", type=int, default=10_000, help="Periods per report.")
+@click.option(
+    "--baseline", is_flag=True, help="Soak the dialogues of abstract_round_abci."
+)
+def main(periods: int, report_every: int, baseline: bool) -> None:
+    """Soak the dialogues over many periods."""
+    models = make_dialogues(baseline)
+    gc.collect()
+    start = rss_mb()
+    click.echo(f"{'period':>8}{'rss (MB)':>10}{'growth':>9}  dialogues")
+    for period in range(1, periods + 1):
+        run_period(models, period)
+        if period % report_every == 0 or period == periods:
+            gc.collect()
+            rss = rss_mb()
+            details = ", ".join(f"{name}: {value}" for name, value in counters(models))
+            click.echo(f"{period:>8}{rss:>10.1f}{rss - start:>+9.1f}  {details}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
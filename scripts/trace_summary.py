@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Summarize the spans exported by the tracing of `learning_abci`.
+
+The spans are read from the OTLP/JSON lines file of an agent, i.e., `<store_path>/traces/spans.jsonl`.
+For every span name, the summary reports the number of spans, their total and self time, i.e., the time
+not spent in their child spans, and the share of the self time in the time of the root spans, i.e.,
+of the acts of the behaviours. The self time of `sign` is the time spent signing, that of
+`wait_until_round_end` the time spent waiting for the other agents, and that of `http`,
+`contract_api` and `ledger_read` the time spent on the network.
+
+It is assumed the script is run from the repository root, i.e., `python -m scripts.trace_summary`.
+"""
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import click
+import numpy as np
+
+
+NS_PER_MS = 1e6
+
+
+def read_spans(path: Path) -> Iterator[Dict[str, Any]]:
+    """Read the spans of an OTLP/JSON lines file."""
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            for resource_spans in json.loads(line)["resourceSpans"]:
+                for scope_spans in resource_spans["scopeSpans"]:
+                    yield from scope_spans["spans"]
+
+
+def _duration(span: Dict[str, Any]) -> int:
+    """Get the duration of a span, in nanoseconds."""
+    return int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])
+
+
+@click.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--root", default=None, help="Only the spans under roots of this name.")
+def main(path: Path, root: Optional[str]) -> None:
+    """Summarize the spans of a trace file."""
+    spans = {span["spanId"]: span for span in read_spans(path)}
+    children_time: Dict[str, int] = defaultdict(int)
+    for span in spans.values():
+        parent_id = span.get("parentSpanId")
+        if parent_id is not None:
+            children_time[parent_id] += _duration(span)
+
+    def root_of(span: Dict[str, Any]) -> Dict[str, Any]:
+        while span.get("parentSpanId") in spans:
+            span = spans[span["parentSpanId"]]
+        return span
+
+    durations: Dict[str, List[int]] = defaultdict(list)
+    self_times: Dict[str, int] = defaultdict(int)
+    root_time = 0
+    for span in spans.values():
+        if root is not None and root_of(span)["name"] != root:
+            continue
+        duration = _duration(span)
+        name = span["name"] if "parentSpanId" in span else "(behaviour act)"
+        durations[name].append(duration)
+        self_times[name] += max(duration - children_time[span["spanId"]], 0)
+        if "parentSpanId" not in span:
+            root_time += duration
+    if not durations:
+        raise click.ClickException("No spans found.")
+
+    click.echo(
+        f"{'span':<24}{'count':>8}{'total (ms)':>13}{'p95 (ms)':>11}"
+        f"{'self (ms)':>12}{'self share':>12}"
+    )
+    for name in sorted(self_times, key=self_times.__getitem__, reverse=True):
+        values = np.array(durations[name]) / NS_PER_MS
+        share = self_times[name] / root_time if root_time else 0.0
+        click.echo(
+            f"{name:<24}{len(values):>8}{values.sum():>13.1f}"
+            f"{np.percentile(values, 95):>11.1f}{self_times[name] / NS_PER_MS:>12.1f}"
+            f"{share:>12.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the price stream consumer, against the stand-in price feed server."""
+
+# pylint: disable=protected-access
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+
+from scripts.price_feed_server import DEFAULT_PATH, make_app, synthetic_ticks
+
+from packages.valory.skills.learning_abci import price_stream
+from packages.valory.skills.learning_abci.price_stream import PriceStream, parse_tick
+
+
+HOST = "127.0.0.1"
+TIMEOUT = 10.0
+RECONNECT_MIN = 0.1
+RECONNECT_MAX = 0.4
+
+
+@contextmanager
+def serve(n_ticks: int, loop_forever: bool) -> Iterator[str]:
+    """Serve the ticks at the maximum rate from a thread, yielding the url of the feed."""
+    port = unused_port()
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(make_app(synthetic_ticks(n_ticks, 0), 0, loop_forever))
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, HOST, port).start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"ws://{HOST}:{port}{DEFAULT_PATH}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+
+@contextmanager
+def consume(stream: PriceStream) -> Iterator[PriceStream]:
+    """Run the stream for the duration of the context."""
+    stream.start()
+    try:
+        yield stream
+    finally:
+        stream.stop()
+
+
+def wait_until(condition: Callable[[], bool]) -> None:
+    """Wait until the condition holds, failing on timeout."""
+    deadline = time.time() + TIMEOUT
+    while not condition():
+        assert time.time() < deadline, "Timed out waiting for the price stream."
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def delays(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """Record the reconnection delays, without the jitter and without waiting for them."""
+    recorded: List[float] = []
+
+    async def wait(_stopped: asyncio.Event, delay: float) -> None:
+        recorded.append(delay)
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(price_stream.random, "uniform", lambda _low, high: high)
+    monkeypatch.setattr(PriceStream, "_wait", staticmethod(wait))
+    return recorded
+
+
+def test_parse_tick() -> None:
+    """Test parsing the ticks."""
+    assert parse_tick('{"price": 2, "timestamp": 1}') == (1.0, 2.0)
+    for malformed in ('{"timestamp": 1}', "[1]", '{"price": null}'):
+        with pytest.raises(ValueError, match="Malformed tick"):
+            parse_tick(malformed)
+
+
+def test_receive() -> None:
+    """Test that the ticks of the feed reach the window."""
+    with serve(10, loop_forever=False) as url:
+        stream = PriceStream(url, 5, 100, TIMEOUT, TIMEOUT)
+        with consume(stream):
+            wait_until(lambda: len(stream.window.ticks()) == 5)
+            assert stream.window.latest(TIMEOUT) is not None
+    assert not stream.is_running
+    assert stream.malformed == 0
+
+
+def test_queue_drop(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the oldest ticks are dropped while the parser is behind."""
+
+    async def stall(_self: PriceStream, _queue: "asyncio.Queue[str]") -> None:
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(PriceStream, "_parse", stall)
+    n_ticks, queue_size = 50, 10
+    with serve(n_ticks, loop_forever=False) as url:
+        # the first reconnection outlasts the test, so that the counts are of a single connection
+        stream = PriceStream(url, 5, queue_size, TIMEOUT, TIMEOUT)
+        with consume(stream):
+            wait_until(lambda: stream.reconnections == 1)
+    assert stream.received == n_ticks
+    assert stream.dropped == n_ticks - queue_size
+    assert stream.window.ticks() == []
+
+
+def test_reconnect_backoff(delays: List[float]) -> None:
+    """Test that the reconnection delay doubles up to the maximum while the feed is down."""
+    stream = PriceStream(
+        f"ws://{HOST}:{unused_port()}{DEFAULT_PATH}",
+        5,
+        100,
+        RECONNECT_MIN,
+        RECONNECT_MAX,
+    )
+    with consume(stream):
+        wait_until(lambda: len(delays) >= 5)
+    assert delays[:5] == [0.1, 0.2, 0.4, 0.4, 0.4]
+    assert stream.reconnections >= 5
+    assert stream.received == 0
+
+
+def test_reconnect_backoff_reset(delays: List[float]) -> None:
+    """Test that the reconnection delay is reset once connected, when the feed closes the stream."""
+    with serve(3, loop_forever=False) as url:
+        stream = PriceStream(url, 5, 100, RECONNECT_MIN, RECONNECT_MAX)
+        with consume(stream):
+            wait_until(lambda: stream.received >= 9)
+    assert stream.reconnections >= 3
+    assert set(delays) == {RECONNECT_MIN}
+    assert stream.window.ticks()
+
+
+def test_stop_while_running(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that stopping leaves the loop open if its thread does not stop in time."""
+    release = threading.Event()
+
+    async def run(_self: PriceStream) -> None:
+        # blocks the loop, so that the stop request is not served
+        release.wait(TIMEOUT)
+
+    monkeypatch.setattr(PriceStream, "_run", run)
+    monkeypatch.setattr(price_stream, "JOIN_TIMEOUT", 0.01)
+    stream = PriceStream("ws://unused", 5, 100, RECONNECT_MIN, RECONNECT_MAX)
+    stream.start()
+    loop, thread = stream._loop, stream._thread
+    assert loop is not None and thread is not None
+    stream.stop()
+    assert thread.is_alive()
+    assert not loop.is_closed()
+    assert not stream.is_running
+
+    release.set()
+    thread.join(TIMEOUT)
+    loop.close()